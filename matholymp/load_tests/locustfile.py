@@ -141,6 +141,9 @@ class EstudianteEvaluacion(HttpUser):
         for pregunta, opcion in pares:
             self.opciones[pregunta].append(opcion)
 
+        secuencia = re.search(r"window\.secuenciaGuardado = (\d+);", respuesta.text)
+        self.secuencia = int(secuencia.group(1)) if secuencia else 0
+
         self.respuestas = {}
         self.preguntas_pendientes = list(self.opciones)
         random.shuffle(self.preguntas_pendientes)
@@ -149,23 +152,29 @@ class EstudianteEvaluacion(HttpUser):
             MIN_FINALIZACION_SEGUNDOS, MAX_FINALIZACION_SEGUNDOS
         )
         self.ciclo = 0
+        self.etag_estado = None
 
     def registrar_respuestas(self, cantidad):
         """Responde algunas preguntas para que los guardados sean progresivos."""
+        nuevas = {}
         for _ in range(min(cantidad, len(self.preguntas_pendientes))):
             pregunta = self.preguntas_pendientes.pop()
-            self.respuestas[pregunta] = random.choice(self.opciones[pregunta])
+            nuevas[pregunta] = random.choice(self.opciones[pregunta])
+        self.respuestas.update(nuevas)
+        return nuevas
 
     def tiempo_restante(self):
         transcurrido = int(time.monotonic() - self.inicio)
         return max(0, DURACION_MINUTOS * 60 - transcurrido)
 
     def guardar_progreso(self):
-        self.registrar_respuestas(random.randint(1, 2))
+        # Igual que el navegador: solo las respuestas nuevas y el siguiente número de secuencia
+        cambios = self.registrar_respuestas(random.randint(1, 2))
+        self.secuencia += 1
         csrf = self.client.cookies.get("csrftoken", "")
         self.client.post(
             f"/quiz/{EVALUACION_ID}/guardar/",
-            json={"respuestas": self.respuestas},
+            json={"cambios": cambios, "secuencia": self.secuencia},
             headers={
                 "X-CSRFToken": csrf,
                 "Referer": f"{self.host}/quiz/{EVALUACION_ID}/",
@@ -206,10 +215,13 @@ class EstudianteEvaluacion(HttpUser):
 
         self.ciclo += 1
         if self.ciclo % 3 == 0:
-            self.client.get(
-                f"/quiz/{EVALUACION_ID}/verificar-estado/",
-                name="GET /quiz/[id]/verificar-estado/",
+            headers = {"If-None-Match": self.etag_estado} if self.etag_estado else {}
+            respuesta = self.client.get(
+                f"/quiz/{EVALUACION_ID}/heartbeat/",
+                headers=headers,
+                name="GET /quiz/[id]/heartbeat/",
             )
+            self.etag_estado = respuesta.headers.get("ETag", self.etag_estado)
 
         if self.ciclo % 6 == 0:
             self.guardar_progreso()
@@ -5,6 +5,7 @@ from django.conf import settings
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.http import JsonResponse
+from django.contrib.sessions.middleware import SessionMiddleware
 
 _thread_locals = threading.local()
 
@@ -44,6 +45,29 @@ class AuditMiddleware:
             del _thread_locals.request
         return response
 
+def sin_guardar_sesion(view_func):
+    """
+    Marca una vista de sondeo frecuente para que su respuesta no reescriba la sesión.
+    Con SESSION_SAVE_EVERY_REQUEST cada petición guarda la sesión en la base de datos.
+    """
+    view_func.omitir_guardado_sesion = True
+    return view_func
+
+class ConditionalSessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware que omite el guardado de la sesión en las vistas marcadas con
+    sin_guardar_sesion. La sesión se sigue leyendo para autenticar la petición.
+    """
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'omitir_guardado_sesion', False):
+            request._omitir_guardado_sesion = True
+        return None
+
+    def process_response(self, request, response):
+        if getattr(request, '_omitir_guardado_sesion', False):
+            return response
+        return super().process_response(request, response)
+
 class SessionTimeoutMiddleware:
     """
     Middleware que controla la expiración de sesión por inactividad.
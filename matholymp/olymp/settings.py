@@ -27,6 +27,7 @@ CSRF_TRUSTED_ORIGINS = config(
 )
 
 INSTALLED_APPS = [
+    "daphne",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -38,7 +39,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "olymp.middleware.ConditionalSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -68,6 +69,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "olymp.wsgi.application"
+ASGI_APPLICATION = "olymp.asgi.application"
 
 
 DATABASES = {
@@ -81,6 +83,32 @@ DATABASES = {
     }
 }
 
+# Caché compartida entre workers (estado de intentos, rosters, clave de respuestas).
+# Sin REDIS_URL se usa la caché local de cada proceso, válida solo con un worker:
+# WEB_WORKERS indica cuántos procesos atienden peticiones (ver quizzes/checks.py).
+WEB_WORKERS = config("WEB_WORKERS", default=1, cast=int)
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
+# Capa de canales del monitoreo en tiempo real: en memoria para un solo proceso
+# (desarrollo y pruebas) o Redis cuando hay varios workers.
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+    }
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -137,5 +165,19 @@ MESSAGE_TAGS = {
 # Renovar la sesión con cada request
 SESSION_SAVE_EVERY_REQUEST = True
 
+# Guardado automático con escritura diferida (write-behind): los guardados se acumulan
+# en la caché compartida (requiere REDIS_URL) y se vacían en lote cada AUTOSAVE_FLUSH_SEGUNDOS
+# segundos. Ventanas de pérdida: ver quizzes/diario_respuestas.py
+AUTOSAVE_WRITE_BEHIND = config("AUTOSAVE_WRITE_BEHIND", default=False, cast=bool)
+AUTOSAVE_FLUSH_SEGUNDOS = config("AUTOSAVE_FLUSH_SEGUNDOS", default=5, cast=int)
+
+# Entrega asíncrona: take_quiz solo registra las respuestas y marca el intento como entregado;
+# la calificación y el snapshot los realiza `python manage.py procesar_entregas`.
+CALIFICACION_ASINCRONA = config("CALIFICACION_ASINCRONA", default=False, cast=bool)
+
+# Snapshot compartido del monitoreo: cada vista de la tabla de una evaluación se calcula como
+# máximo una vez cada MONITOREO_SNAPSHOT_SEGUNDOS para todos los administradores (0 lo desactiva).
+MONITOREO_SNAPSHOT_SEGUNDOS = config("MONITOREO_SNAPSHOT_SEGUNDOS", default=3, cast=int)
+
 # Configuración para páginas de error personalizadas
 ENABLE_CUSTOM_ERROR_PAGES = True
@@ -0,0 +1,257 @@
+"""
+Acciones administrativas masivas del panel de monitoreo.
+
+Finalizar, otorgar intentos, reducir cambios de pestaña y agregar alertas a una lista de
+participantes en una sola transacción: la lista de autorizados se resuelve una vez, los intentos
+se bloquean y se escriben con bulk_update y las alertas se insertan con bulk_create. Como las
+operaciones en bloque no disparan post_save, los efectos de los receptores de signals.py
+(contadores, estado cacheado del intento, entradas del ranking, versión de las estadísticas de
+resultados y notificaciones) se aplican una vez por lote.
+
+Cada función retorna el resultado de cada participante: {'participante_id', 'estado', 'mensaje'},
+con estado 'aplicado' u 'omitido'.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import diario_respuestas
+from .contadores_monitoreo import con_actividad_reciente, registrar_alerta, registrar_finalizaciones_admin
+from .estado_intento import invalidar_estados_intento
+from .models import AlertaIntento, EntregaPendiente, Evaluacion, IntentosParticipante, Participantes, ResultadoEvaluacion
+from .monitoreo_utils import obtener_ids_autorizados
+from .notificaciones_estudiante import notificar_estudiantes
+from .notificaciones_monitoreo import notificar_participantes
+from .ranking import actualizar_participantes
+
+
+ACCIONES_MASIVAS = ('finalizar', 'otorgar_intentos', 'reducir_pestanas', 'alerta')
+LIMITE_ACCION_MASIVA = 500
+
+
+def aplicar_accion_masiva(evaluacion, admin_user, accion, participante_ids, parametros):
+    """Ejecuta la acción indicada sobre los participantes y retorna el resultado de cada uno"""
+    participante_ids = list(dict.fromkeys(participante_ids))
+    autorizados = obtener_ids_autorizados(evaluacion)
+    resultados = {
+        participante_id: _resultado(participante_id, 'omitido', 'Participante no autorizado para esta evaluación')
+        for participante_id in participante_ids if participante_id not in autorizados
+    }
+    ids = [participante_id for participante_id in participante_ids if participante_id not in resultados]
+
+    if ids:
+        with transaction.atomic():
+            if accion == 'finalizar':
+                resultados.update(finalizar_intentos(evaluacion, admin_user, ids, parametros['motivo']))
+            elif accion == 'otorgar_intentos':
+                resultados.update(otorgar_intentos(evaluacion, admin_user, ids, parametros['cantidad']))
+            elif accion == 'reducir_pestanas':
+                resultados.update(reducir_cambios_pestana(evaluacion, admin_user, ids, parametros['cantidad']))
+            else:
+                resultados.update(agregar_alertas(
+                    evaluacion, ids, parametros['tipo'], parametros['descripcion'], parametros['severidad']
+                ))
+    return [resultados[participante_id] for participante_id in participante_ids]
+
+
+def finalizar_intentos(evaluacion, admin_user, participante_ids, motivo):
+    """Finaliza por decisión administrativa el último intento de cada participante (puntaje 0/10)"""
+    ahora = timezone.now()
+    ultimos = _ultimos_intentos(evaluacion, participante_ids, bloquear=True)
+    if diario_respuestas.write_behind_activo():
+        # Los últimos guardados quedan en el intento para la revisión posterior
+        diario_respuestas.diario.vaciar_antes_de_cerrar([resultado for resultado in ultimos.values() if not resultado.completada])
+    resultados = {}
+    finalizados = []
+    alertas = []
+    abiertos = entregados = activos = 0
+    for participante_id in participante_ids:
+        resultado = ultimos.get(participante_id)
+        if resultado is None:
+            resultados[participante_id] = _resultado(participante_id, 'omitido', 'No tiene un intento para finalizar')
+            continue
+        if resultado.finalizado_por_admin_id:
+            resultados[participante_id] = _resultado(participante_id, 'omitido', 'El intento ya fue finalizado por administración')
+            continue
+
+        if resultado.completada:
+            entregados += 1
+        else:
+            abiertos += 1
+            activos += con_actividad_reciente(resultado.ultima_actividad, ahora)
+        resultado.puntos_obtenidos = 0
+        resultado.puntos_totales = 10
+        resultado.completada = True
+        resultado.fecha_fin = ahora
+        resultado.tiempo_restante = 0
+        resultado.finalizado_por_admin = admin_user
+        resultado.motivo_finalizacion = motivo
+        resultado.fecha_finalizacion_admin = ahora
+        resultado.ultima_actividad = ahora
+        resultado.calificacion_pendiente = False
+        finalizados.append(resultado)
+        alertas.append(AlertaIntento(
+            resultado=resultado,
+            tipo='finalizado_por_admin',
+            descripcion=f'Evaluación finalizada administrativamente por {admin_user.username}. Motivo: {motivo}',
+            severidad='alta',
+            timestamp=ahora,
+        ))
+        resultados[participante_id] = _resultado(participante_id, 'aplicado', 'Evaluación finalizada')
+
+    if finalizados:
+        ResultadoEvaluacion.objects.bulk_update(finalizados, [
+            'puntos_obtenidos', 'puntos_totales', 'completada', 'fecha_fin', 'tiempo_restante',
+            'finalizado_por_admin', 'motivo_finalizacion', 'fecha_finalizacion_admin', 'ultima_actividad',
+            'calificacion_pendiente',
+        ])
+        # Las entregas en cola de calificación no deben sobrescribir el 0/10 administrativo
+        EntregaPendiente.objects.filter(resultado__in=finalizados).delete()
+        AlertaIntento.objects.bulk_create(alertas)
+        registrar_finalizaciones_admin(evaluacion.pk, abiertos, entregados, activos)
+        registrar_alerta(evaluacion.pk, len(alertas))
+        # Un resultado completado puede cambiar los clasificados de las etapas siguientes
+        Evaluacion.invalidar_roster(anio=evaluacion.anio, etapa__gt=evaluacion.etapa)
+        actualizar_participantes(evaluacion, [r.participante_id for r in finalizados])
+        Evaluacion.invalidar_resultados(evaluacion.pk)
+        publicar_cambios_intentos(evaluacion.pk, [r.participante_id for r in finalizados], 'finalizado_admin')
+    return resultados
+
+
+def otorgar_intentos(evaluacion, admin_user, participante_ids, cantidad):
+    """Suma `cantidad` intentos al máximo de cada participante, creando su configuración si no existe"""
+    ahora = timezone.now()
+    motivo = f'{cantidad} intento(s) adicional(es) otorgado(s) por administrador'
+    configuraciones = {
+        configuracion.participante_id: configuracion
+        for configuracion in IntentosParticipante.objects.select_for_update().filter(
+            evaluacion=evaluacion, participante_id__in=participante_ids
+        )
+    }
+    por_defecto = dict(
+        Participantes.objects.filter(pk__in=participante_ids).values_list('id', 'intentos_maximos_default')
+    )
+
+    actualizadas = []
+    nuevas = []
+    for participante_id in participante_ids:
+        configuracion = configuraciones.get(participante_id)
+        if configuracion:
+            configuracion.intentos_maximos += cantidad
+            configuracion.motivo = motivo
+            configuracion.fecha_actualizacion = ahora
+            actualizadas.append(configuracion)
+        else:
+            nuevas.append(IntentosParticipante(
+                participante_id=participante_id,
+                evaluacion=evaluacion,
+                intentos_maximos=por_defecto.get(participante_id, 1) + cantidad,
+                creado_por=admin_user,
+                motivo=motivo,
+            ))
+
+    IntentosParticipante.objects.bulk_update(actualizadas, ['intentos_maximos', 'motivo', 'fecha_actualizacion'])
+    IntentosParticipante.objects.bulk_create(nuevas)
+    publicar_cambios_intentos(evaluacion.pk, participante_ids, 'intentos', estado=False)
+    return {
+        participante_id: _resultado(participante_id, 'aplicado', f'Se otorgaron {cantidad} intento(s)')
+        for participante_id in participante_ids
+    }
+
+
+def reducir_cambios_pestana(evaluacion, admin_user, participante_ids, cantidad):
+    """Reduce en `cantidad` (sin bajar de cero) los cambios de pestaña del intento activo de cada participante"""
+    ahora = timezone.now()
+    activos = {
+        resultado.participante_id: resultado
+        for resultado in ResultadoEvaluacion.objects.select_for_update().filter(
+            evaluacion=evaluacion, participante_id__in=participante_ids, completada=False
+        ).only('id', 'participante_id', 'evaluacion_id', 'cambios_pestana')
+    }
+    resultados = {}
+    reducidos = []
+    alertas = []
+    for participante_id in participante_ids:
+        resultado = activos.get(participante_id)
+        if resultado is None:
+            resultados[participante_id] = _resultado(participante_id, 'omitido', 'No tiene una evaluación activa')
+            continue
+        cambios_actuales = resultado.cambios_pestana or 0
+        if cambios_actuales == 0:
+            resultados[participante_id] = _resultado(participante_id, 'omitido', 'No ha realizado cambios de pestañas')
+            continue
+
+        resultado.cambios_pestana = max(0, cambios_actuales - cantidad)
+        reducidos.append(resultado)
+        alertas.append(AlertaIntento(
+            resultado=resultado,
+            tipo='admin_reduccion_pestanas',
+            descripcion=f'Cambios de pestaña reducidos por administrador ({admin_user.username}): {cambios_actuales} → {resultado.cambios_pestana}',
+            severidad='baja',
+            timestamp=ahora,
+        ))
+        resultados[participante_id] = _resultado(
+            participante_id, 'aplicado', f'Cambios de pestaña: {cambios_actuales} → {resultado.cambios_pestana}'
+        )
+
+    if reducidos:
+        ResultadoEvaluacion.objects.bulk_update(reducidos, ['cambios_pestana'])
+        AlertaIntento.objects.bulk_create(alertas)
+        registrar_alerta(evaluacion.pk, len(alertas))
+        publicar_cambios_intentos(evaluacion.pk, [r.participante_id for r in reducidos], 'cambio_pestana')
+    return resultados
+
+
+def agregar_alertas(evaluacion, participante_ids, tipo, descripcion, severidad):
+    """Agrega la misma alerta manual al último intento de cada participante"""
+    ahora = timezone.now()
+    ultimos = _ultimos_intentos(evaluacion, participante_ids)
+    resultados = {}
+    alertas = []
+    for participante_id in participante_ids:
+        resultado = ultimos.get(participante_id)
+        if resultado is None:
+            resultados[participante_id] = _resultado(participante_id, 'omitido', 'Aún no hay un intento para revisar')
+            continue
+        alertas.append(AlertaIntento(
+            resultado=resultado, tipo=tipo, descripcion=descripcion, severidad=severidad, timestamp=ahora
+        ))
+        resultados[participante_id] = _resultado(participante_id, 'aplicado', 'Alerta agregada')
+
+    if alertas:
+        AlertaIntento.objects.bulk_create(alertas)
+        registrar_alerta(evaluacion.pk, len(alertas))
+        publicar_cambios_intentos(evaluacion.pk, [a.resultado.participante_id for a in alertas], 'alerta', estado=False)
+    return resultados
+
+
+def publicar_cambios_intentos(evaluacion_id, participante_ids, evento, estado=True):
+    """
+    Efectos de los receptores de post_save para cambios en bloque: notifica al monitoreo y, si
+    cambió el estado de los intentos, lo invalida en la caché y lo publica a los estudiantes.
+    """
+    notificar_participantes(evaluacion_id, participante_ids, evento)
+    if not estado:
+        return
+    user_ids = [
+        user_id for user_id in Participantes.objects.filter(pk__in=participante_ids).values_list('user_id', flat=True)
+        if user_id
+    ]
+    invalidar_estados_intento(evaluacion_id, user_ids)
+    notificar_estudiantes(evaluacion_id, user_ids)
+
+
+def _ultimos_intentos(evaluacion, participante_ids, bloquear=False):
+    intentos = ResultadoEvaluacion.objects.filter(
+        evaluacion=evaluacion, participante_id__in=participante_ids
+    ).order_by('participante_id', '-numero_intento')
+    if bloquear:
+        intentos = intentos.select_for_update()
+    ultimos = {}
+    for resultado in intentos:
+        ultimos.setdefault(resultado.participante_id, resultado)
+    return ultimos
+
+
+def _resultado(participante_id, estado, mensaje):
+    return {'participante_id': participante_id, 'estado': estado, 'mensaje': mensaje}
@@ -0,0 +1,286 @@
+"""
+Análisis de ítems de los resultados de una evaluación.
+
+Las respuestas de cada intento se decodifican una sola vez a una matriz densa de enteros
+(intentos × preguntas) con el índice de la opción elegida dentro de la pregunta, SIN_RESPUESTA si
+la pregunta se mostró y quedó en blanco o NO_PRESENTADA si no formaba parte del plan del intento.
+Con la matriz y una tabla booleana de opciones correctas, los conteos por pregunta, los
+agregados por categoría y la frecuencia de cada opción (distractores) se calculan con
+operaciones de NumPy, sin recorrer pregunta por intento.
+
+Sobre los intentos completados se calculan además los indicadores psicométricos clásicos:
+    - Índice de dificultad (p): proporción de aciertos entre quienes recibieron la pregunta.
+    - Índice de discriminación (D): p del 27 % con mejor puntaje menos p del 27 % con peor puntaje.
+    - Correlación punto biserial: correlación entre el acierto en la pregunta y la proporción de
+      aciertos en el resto de preguntas del intento (corregida, sin la propia pregunta).
+
+Los intentos entregados que ya tienen sus respuestas normalizadas se leen de RespuestaIntento como
+tuplas de enteros; solo los intentos en curso (y los históricos aún sin normalizar) decodifican
+su JSON de respuestas_guardadas.
+"""
+
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+
+from .calificacion_utils import obtener_clave_respuestas
+from .models import RespuestaIntento
+from .respuestas_intento import con_respuestas_normalizadas
+
+
+NO_PRESENTADA = -2
+SIN_RESPUESTA = -1
+
+# Proporción de intentos de los grupos superior e inferior del índice de discriminación
+PROPORCION_GRUPOS = 0.27
+
+
+class MatrizRespuestas:
+    """Respuestas de un conjunto de intentos codificadas como matriz intentos × preguntas"""
+
+    def __init__(self, clave, filas):
+        """
+        Args:
+            clave: clave de respuestas de la evaluación (obtener_clave_respuestas)
+            filas: iterable de (respuestas_guardadas, plan_preguntas, completada)
+        """
+        self.pregunta_ids = list(clave)
+        self.columnas = {pregunta_id: columna for columna, pregunta_id in enumerate(self.pregunta_ids)}
+        self.opciones = [clave[pregunta_id]['opciones'] for pregunta_id in self.pregunta_ids]
+
+        # opción -> (columna, índice dentro de la pregunta); una opción ajena a la pregunta no cuenta
+        self._opciones = {}
+        maximo_opciones = max([len(opciones) for opciones in self.opciones] + [1])
+        self.correctas = np.zeros((len(self.pregunta_ids), maximo_opciones), dtype=bool)
+        for columna, opciones in enumerate(self.opciones):
+            for indice, opcion in enumerate(opciones):
+                self._opciones[opcion['id']] = (columna, indice)
+                self.correctas[columna, indice] = opcion['is_correct']
+
+        respuestas = []
+        completadas = []
+        for respuestas_guardadas, plan, completada in filas:
+            respuestas.append(self._decodificar(respuestas_guardadas, plan))
+            completadas.append(bool(completada))
+        self.respuestas = (
+            np.array(respuestas, dtype=np.int16) if respuestas
+            else np.empty((0, len(self.pregunta_ids)), dtype=np.int16)
+        )
+        self.completadas = np.array(completadas, dtype=bool)
+
+    def _decodificar(self, respuestas_guardadas, plan):
+        fila = [NO_PRESENTADA] * len(self.pregunta_ids)
+        if not isinstance(respuestas_guardadas, dict):
+            return fila
+
+        if 'preguntas_snapshot' in respuestas_guardadas:
+            # El snapshot de un intento entregado lista todas las preguntas que se le mostraron
+            for item in respuestas_guardadas['preguntas_snapshot']:
+                columna = self.columnas.get(item.get('pregunta_id'))
+                if columna is not None:
+                    fila[columna] = self._indice_opcion(columna, item.get('respuesta_estudiante_id'))
+            return fila
+
+        # Intento en curso: respuestas planas {'pregunta_102': '415'} sobre las preguntas del plan
+        presentadas = plan or self.pregunta_ids
+        for pregunta_id in presentadas:
+            columna = self.columnas.get(pregunta_id)
+            if columna is not None:
+                fila[columna] = self._indice_opcion(columna, respuestas_guardadas.get(f'pregunta_{pregunta_id}'))
+        return fila
+
+    def _indice_opcion(self, columna, opcion_id):
+        if isinstance(opcion_id, str) and opcion_id.isdigit():
+            opcion_id = int(opcion_id)
+        ubicacion = self._opciones.get(opcion_id) if isinstance(opcion_id, int) else None
+        if ubicacion is None or ubicacion[0] != columna:
+            return SIN_RESPUESTA
+        return ubicacion[1]
+
+    def aciertos(self, respuestas=None):
+        """Matriz booleana de aciertos de las respuestas indicadas (por defecto, todas)"""
+        respuestas = self.respuestas if respuestas is None else respuestas
+        respondidas = respuestas >= 0
+        columnas = np.broadcast_to(np.arange(respuestas.shape[1]), respuestas.shape)
+        return respondidas & self.correctas[columnas, np.where(respondidas, respuestas, 0)]
+
+    def conteos(self):
+        """Correctas, incorrectas y sin responder por pregunta: tres arreglos de longitud preguntas"""
+        respondidas = self.respuestas >= 0
+        aciertos = self.aciertos()
+        return (
+            aciertos.sum(axis=0),
+            (respondidas & ~aciertos).sum(axis=0),
+            (self.respuestas == SIN_RESPUESTA).sum(axis=0),
+        )
+
+    def frecuencias_opciones(self):
+        """Cantidad de intentos que eligieron cada opción: matriz preguntas × máximo de opciones"""
+        preguntas, maximo_opciones = self.correctas.shape
+        respondidas = self.respuestas >= 0
+        posiciones = (np.arange(preguntas) * maximo_opciones + self.respuestas)[respondidas]
+        return np.bincount(posiciones, minlength=preguntas * maximo_opciones).reshape(preguntas, maximo_opciones)
+
+    def psicometria(self):
+        """
+        Dificultad, discriminación y punto biserial de cada pregunta sobre los intentos completados.
+        Cada indicador es un arreglo de longitud preguntas con NaN donde no hay datos suficientes.
+        """
+        respuestas = self.respuestas[self.completadas]
+        presentadas = (respuestas != NO_PRESENTADA).astype(float)
+        aciertos = self.aciertos(respuestas).astype(float)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dificultad = aciertos.sum(axis=0) / presentadas.sum(axis=0)
+
+            # Puntaje del intento como proporción de aciertos: los planes aleatorios pueden diferir en tamaño
+            total_aciertos = aciertos.sum(axis=1)
+            total_presentadas = presentadas.sum(axis=1)
+            puntaje = np.where(total_presentadas > 0, total_aciertos / np.maximum(total_presentadas, 1), 0)
+
+            discriminacion = np.full(respuestas.shape[1], np.nan)
+            tamano_grupo = int(round(len(respuestas) * PROPORCION_GRUPOS))
+            if tamano_grupo >= 1 and len(respuestas) >= 2 * tamano_grupo:
+                orden = np.argsort(puntaje, kind='stable')
+                inferior, superior = orden[:tamano_grupo], orden[-tamano_grupo:]
+                discriminacion = (
+                    aciertos[superior].sum(axis=0) / presentadas[superior].sum(axis=0)
+                    - aciertos[inferior].sum(axis=0) / presentadas[inferior].sum(axis=0)
+                )
+
+            # Correlación ponderada por presentación entre el acierto y el resto del intento
+            resto = (total_aciertos[:, None] - aciertos) / (total_presentadas[:, None] - 1)
+            pesos = presentadas * (total_presentadas[:, None] > 1)
+            resto = np.where(pesos > 0, resto, 0)
+            n = pesos.sum(axis=0)
+            media_acierto = (pesos * aciertos).sum(axis=0) / n
+            media_resto = (pesos * resto).sum(axis=0) / n
+            desvio_acierto = aciertos - media_acierto
+            desvio_resto = resto - media_resto
+            punto_biserial = (pesos * desvio_acierto * desvio_resto).sum(axis=0) / np.sqrt(
+                (pesos * desvio_acierto ** 2).sum(axis=0) * (pesos * desvio_resto ** 2).sum(axis=0)
+            )
+
+        return dificultad, discriminacion, punto_biserial
+
+
+def analizar_items(evaluacion, resultados, preguntas):
+    """
+    Análisis por pregunta y por categoría de los intentos indicados.
+
+    Args:
+        evaluacion: Evaluación analizada
+        resultados: QuerySet de ResultadoEvaluacion a considerar
+        preguntas: Preguntas a reportar, en orden (con su categoría cargada)
+
+    Returns:
+        tuple: (analisis_preguntas, analisis_categorias)
+    """
+    clave = obtener_clave_respuestas(evaluacion)
+    matriz = MatrizRespuestas(clave, _filas_resultados(resultados))
+    correctas, incorrectas, sin_responder = matriz.conteos()
+    frecuencias = matriz.frecuencias_opciones()
+    dificultad, discriminacion, punto_biserial = matriz.psicometria()
+
+    preguntas = [pregunta for pregunta in preguntas if pregunta.id in matriz.columnas]
+    columnas = np.array([matriz.columnas[pregunta.id] for pregunta in preguntas], dtype=np.intp)
+    respondidas = correctas[columnas] + incorrectas[columnas]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        porcentajes = np.where(respondidas > 0, correctas[columnas] / respondidas * 100, 0)
+
+    analisis_preguntas = []
+    for posicion, pregunta in enumerate(preguntas):
+        columna = columnas[posicion]
+        elecciones = int(frecuencias[columna].sum())
+        porcentaje = float(porcentajes[posicion])
+        analisis_preguntas.append({
+            'pregunta': pregunta,
+            'correctas': int(correctas[columna]),
+            'incorrectas': int(incorrectas[columna]),
+            'sin_responder': int(sin_responder[columna]),
+            'porcentaje_correctas': porcentaje,
+            'dificultad': _nivel_dificultad(porcentaje),
+            'indice_dificultad': _indicador(dificultad[columna]),
+            'discriminacion': _indicador(discriminacion[columna]),
+            'punto_biserial': _indicador(punto_biserial[columna]),
+            'opciones': [
+                {
+                    'id': opcion['id'],
+                    'letra': chr(ord('A') + indice) if indice < 26 else str(indice + 1),
+                    'text': opcion['text'],
+                    'is_correct': opcion['is_correct'],
+                    'frecuencia': int(frecuencias[columna, indice]),
+                    'porcentaje': float(frecuencias[columna, indice] / elecciones * 100) if elecciones else 0.0,
+                }
+                for indice, opcion in enumerate(matriz.opciones[columna])
+            ],
+        })
+
+    return analisis_preguntas, _analizar_categorias(analisis_preguntas, correctas[columnas], incorrectas[columnas], sin_responder[columnas])
+
+
+def _filas_resultados(resultados):
+    """Filas (respuestas_guardadas, plan_preguntas, completada) de MatrizRespuestas para los intentos indicados"""
+    normalizadas = RespuestaIntento.objects.filter(
+        resultado__in=resultados.filter(con_respuestas_normalizadas())
+    ).order_by('resultado_id').values_list('resultado_id', 'pregunta_id', 'opcion_id')
+    # Cada intento normalizado se presenta como un snapshot reducido a pregunta y opción elegida
+    for _, respuestas in groupby(normalizadas.iterator(), key=itemgetter(0)):
+        snapshot = [
+            {'pregunta_id': pregunta_id, 'respuesta_estudiante_id': opcion_id}
+            for _, pregunta_id, opcion_id in respuestas
+        ]
+        yield {'preguntas_snapshot': snapshot}, None, True
+
+    yield from resultados.filter(~con_respuestas_normalizadas()).values_list(
+        'respuestas_guardadas', 'plan_preguntas', 'completada'
+    ).iterator()
+
+
+def _analizar_categorias(analisis_preguntas, correctas, incorrectas, sin_responder):
+    """Agrega los conteos de las preguntas por categoría con np.bincount"""
+    claves = []
+    categorias = {}
+    for analisis in analisis_preguntas:
+        categoria = analisis['pregunta'].categoria
+        clave = categoria.id if categoria else 'sin_categoria'
+        if clave not in categorias:
+            categorias[clave] = {'indice': len(categorias), 'categoria': categoria, 'preguntas': []}
+        categorias[clave]['preguntas'].append(analisis)
+        claves.append(categorias[clave]['indice'])
+
+    grupos = np.array(claves, dtype=np.intp)
+    total = len(categorias)
+    correctas = np.bincount(grupos, weights=correctas, minlength=total)
+    incorrectas = np.bincount(grupos, weights=incorrectas, minlength=total)
+    sin_responder = np.bincount(grupos, weights=sin_responder, minlength=total)
+
+    analisis_categorias = []
+    for datos in categorias.values():
+        indice = datos['indice']
+        total_respuestas = correctas[indice] + incorrectas[indice]
+        porcentaje_acierto = float(correctas[indice] / total_respuestas * 100) if total_respuestas > 0 else 0
+        analisis_categorias.append({
+            'categoria_nombre': datos['categoria'].nombre if datos['categoria'] else 'Sin categoría',
+            'categoria_obj': datos['categoria'],
+            'total_preguntas': len(datos['preguntas']),
+            'correctas': int(correctas[indice]),
+            'incorrectas': int(incorrectas[indice]),
+            'sin_responder': int(sin_responder[indice]),
+            'porcentaje_acierto': porcentaje_acierto,
+            'dificultad': _nivel_dificultad(porcentaje_acierto),
+            'preguntas_detalle': datos['preguntas'],
+        })
+
+    # Ordenar por porcentaje de acierto descendente
+    analisis_categorias.sort(key=lambda x: x['porcentaje_acierto'], reverse=True)
+    return analisis_categorias
+
+
+def _nivel_dificultad(porcentaje):
+    return 'Fácil' if porcentaje > 70 else 'Media' if porcentaje > 40 else 'Difícil'
+
+
+def _indicador(valor):
+    return None if np.isnan(valor) else round(float(valor), 3)
@@ -0,0 +1,211 @@
+"""
+Utilitarios de calificación de evaluaciones en el sistema TestMathUTEQ.
+
+La clave de respuestas de cada evaluación (pregunta -> opción correcta, peso y textos)
+se carga una sola vez y se cachea por versión del banco de preguntas, de modo que la
+calificación y el snapshot de un intento se calculan en memoria con un número
+constante de consultas, sin importar cuántas preguntas tenga el intento.
+
+El snapshot de un intento entregado no copia los textos: cada pregunta referencia una
+VersionPregunta inmutable identificada por el hash de su contenido y guarda solo la opción
+elegida, la corrección y los puntos. expandir_snapshot reconstruye el formato completo.
+"""
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Opcion, VersionPregunta
+
+
+TIEMPO_CACHE_CLAVE = 60 * 60
+
+
+def obtener_clave_respuestas(evaluacion):
+    """
+    Obtiene la clave de respuestas de la evaluación desde la caché o la base de datos.
+
+    Returns:
+        dict: {pregunta_id: {'text', 'puntos', 'opcion_correcta_id', 'version', 'opciones': [{'id', 'text', 'is_correct'}]}}
+    """
+    cache_key = f'evaluacion_{evaluacion.pk}_clave_versionada_v{evaluacion.version_preguntas}'
+    clave = cache.get(cache_key)
+    if clave is not None:
+        return clave
+
+    clave = {
+        pregunta_id: {'text': text, 'puntos': puntos or 1, 'opcion_correcta_id': None, 'opciones': []}
+        for pregunta_id, text, puntos in evaluacion.preguntas.values_list('id', 'text', 'puntos')
+    }
+    opciones = Opcion.objects.filter(pregunta__evaluacion=evaluacion).order_by('id').values_list(
+        'id', 'pregunta_id', 'text', 'is_correct'
+    )
+    for opcion_id, pregunta_id, text, is_correct in opciones:
+        entrada = clave.get(pregunta_id)
+        if entrada is None:
+            continue
+        entrada['opciones'].append({'id': opcion_id, 'text': text, 'is_correct': is_correct})
+        if is_correct:
+            entrada['opcion_correcta_id'] = opcion_id
+
+    # Cada pregunta queda asociada a la versión inmutable de su contenido actual
+    versiones = {}
+    for entrada in clave.values():
+        contenido = contenido_pregunta(entrada['text'], entrada['opciones'])
+        entrada['version'] = VersionPregunta.calcular_hash(contenido)
+        versiones[entrada['version']] = contenido
+    VersionPregunta.registrar(versiones)
+
+    cache.set(cache_key, clave, TIEMPO_CACHE_CLAVE)
+    return clave
+
+
+def obtener_diccionario_respuestas(resultado):
+    """
+    Extrae el diccionario plano {'pregunta_102': '415'} desde respuestas_guardadas,
+    soporta diccionarios planos y snapshots congelados.
+    """
+    if not resultado or not resultado.respuestas_guardadas:
+        return {}
+        
+    data = resultado.respuestas_guardadas
+    if isinstance(data, dict):
+        if 'preguntas_snapshot' in data:
+            resp_dict = {}
+            for item in data['preguntas_snapshot']:
+                p_id = item.get('pregunta_id')
+                o_id = item.get('respuesta_estudiante_id')
+                if p_id and o_id:
+                    resp_dict[f'pregunta_{p_id}'] = str(o_id)
+                    resp_dict[str(p_id)] = str(o_id)
+            return resp_dict
+        return data
+    return {}
+
+
+def contenido_pregunta(text, opciones):
+    """Contenido versionable de una pregunta: su texto y sus opciones, sin datos del intento"""
+    return {
+        'text': text,
+        'opciones': [{'id': o['id'], 'text': o['text'], 'is_correct': o['is_correct']} for o in opciones],
+    }
+
+
+def calificar_intento(evaluacion, preguntas_ids, respuestas_diccionario):
+    """
+    Califica un intento y genera su snapshot congelado en una sola pasada en memoria.
+
+    Args:
+        evaluacion: Evaluación a la que pertenece el intento
+        preguntas_ids: IDs de las preguntas del intento, en el orden mostrado
+        respuestas_diccionario: Respuestas con formato {'pregunta_102': '415'}
+
+    Returns:
+        dict: {'puntos_ganados', 'puntos_posibles', 'puntaje' (ponderado sobre 10), 'snapshot'}
+    """
+    clave = obtener_clave_respuestas(evaluacion)
+    respuestas_diccionario = respuestas_diccionario or {}
+
+    puntos_ganados = 0
+    puntos_posibles = 0
+    preguntas_snapshot = []
+
+    for pregunta_id in preguntas_ids:
+        entrada = clave.get(pregunta_id)
+        if entrada is None:
+            continue
+
+        opcion_seleccionada_id_raw = respuestas_diccionario.get(f'pregunta_{pregunta_id}')
+        seleccion = str(opcion_seleccionada_id_raw) if opcion_seleccionada_id_raw is not None else None
+        es_correcta = seleccion is not None and any(
+            opcion['is_correct'] and str(opcion['id']) == seleccion for opcion in entrada['opciones']
+        )
+
+        peso = entrada['puntos']
+        puntos_posibles += peso
+        if es_correcta:
+            puntos_ganados += peso
+
+        opcion_id_int = None
+        if seleccion is not None and seleccion.isdigit():
+            opcion_id_int = int(seleccion)
+
+        preguntas_snapshot.append({
+            'pregunta_id': pregunta_id,
+            'version': entrada['version'],
+            'puntos_pregunta': peso,
+            'puntos_ganados': peso if es_correcta else 0,
+            'es_correcta': es_correcta,
+            'respuesta_estudiante_id': opcion_id_int,
+        })
+
+    puntaje = round(max(0, (puntos_ganados / puntos_posibles) * 10), 3) if puntos_posibles else 0
+
+    return {
+        'puntos_ganados': puntos_ganados,
+        'puntos_posibles': puntos_posibles,
+        'puntaje': puntaje,
+        'snapshot': {
+            'completada': True,
+            'fecha_entrega': timezone.now().isoformat(),
+            'preguntas_snapshot': preguntas_snapshot
+        }
+    }
+
+
+def compactar_item_snapshot(item, versiones):
+    """
+    Convierte un item de snapshot con textos completos al formato referenciado.
+    Agrega a `versiones` el contenido congelado del item para que se registre.
+    """
+    if 'version' in item and 'opciones' not in item:
+        return item
+    contenido = contenido_pregunta(item.get('text', ''), item.get('opciones', []))
+    version = VersionPregunta.calcular_hash(contenido)
+    versiones[version] = contenido
+    return {
+        'pregunta_id': item.get('pregunta_id'),
+        'version': version,
+        'puntos_pregunta': item.get('puntos_pregunta', 1),
+        'puntos_ganados': item.get('puntos_ganados', 0),
+        'es_correcta': item.get('es_correcta', False),
+        'respuesta_estudiante_id': item.get('respuesta_estudiante_id'),
+    }
+
+
+def expandir_snapshot(preguntas_snapshot):
+    """
+    Reconstruye los items completos (texto, opciones, respuesta y opción correcta) de un snapshot.
+    Los items que ya tienen textos (snapshots anteriores a la compactación) se retornan tal cual.
+    """
+    hashes = [item['version'] for item in preguntas_snapshot if 'version' in item and 'opciones' not in item]
+    if not hashes:
+        return preguntas_snapshot
+    contenidos = VersionPregunta.obtener_contenidos(hashes)
+
+    expandido = []
+    for item in preguntas_snapshot:
+        contenido = contenidos.get(item.get('version')) if 'opciones' not in item else None
+        if contenido is None:
+            expandido.append(item)
+            continue
+
+        seleccion = item.get('respuesta_estudiante_id')
+        opciones_list = []
+        opcion_seleccionada_dict = None
+        opcion_correcta_dict = None
+        for opcion in contenido['opciones']:
+            opcion_info = {**opcion, 'seleccionada': seleccion is not None and opcion['id'] == seleccion}
+            opciones_list.append(opcion_info)
+            if opcion['is_correct']:
+                opcion_correcta_dict = opcion_info
+            if opcion_info['seleccionada']:
+                opcion_seleccionada_dict = opcion_info
+
+        expandido.append({
+            **item,
+            'text': contenido['text'],
+            'opciones': opciones_list,
+            'respuesta_estudiante': opcion_seleccionada_dict,
+            'opcion_correcta': opcion_correcta_dict,
+        })
+    return expandido
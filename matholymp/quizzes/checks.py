@@ -0,0 +1,40 @@
+"""Chequeos de configuración del sistema (python manage.py check)."""
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+CACHES_LOCALES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_compartida():
+    """Indica si la caché por defecto es compartida entre procesos (Redis, Memcached, base de datos)"""
+    return settings.CACHES['default']['BACKEND'] not in CACHES_LOCALES
+
+
+@register()
+def verificar_diario_respuestas(app_configs, **kwargs):
+    """El diario de escritura diferida vive en la caché: con una caché por proceso ningún otro worker lo ve"""
+    if getattr(settings, 'AUTOSAVE_WRITE_BEHIND', False) and not cache_compartida():
+        return [Error(
+            'AUTOSAVE_WRITE_BEHIND requiere una caché compartida entre workers.',
+            hint='Configure REDIS_URL o desactive AUTOSAVE_WRITE_BEHIND.',
+            id='quizzes.E001',
+        )]
+    return []
+
+
+@register()
+def verificar_cache_estado_intento(app_configs, **kwargs):
+    """El estado cacheado de los intentos se invalida en la caché: con varios workers debe ser compartida"""
+    if getattr(settings, 'WEB_WORKERS', 1) > 1 and not cache_compartida():
+        return [Error(
+            'Con varios workers (WEB_WORKERS > 1) el estado cacheado de los intentos requiere una caché compartida.',
+            hint='Configure REDIS_URL; con la caché local otro worker puede servir un estado de finalización '
+                 'o de cambios de pestaña desactualizado.',
+            id='quizzes.E002',
+        )]
+    return []
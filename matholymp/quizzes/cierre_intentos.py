@@ -0,0 +1,139 @@
+"""
+Cierre en segundo plano de los intentos cuyo tiempo ya venció.
+
+Sin este cierre, un intento vencido solo se califica cuando el estudiante vuelve a entrar a
+take_quiz: hasta entonces sigue con completada=False, aparece como inactivo en el monitoreo,
+queda fuera de los rankings y hace que has_students_taking_exam lo cuente como en curso.
+
+El comando cerrar_intentos_vencidos recorre las evaluaciones, busca con el índice
+(evaluacion, completada, ...) los intentos abiertos cuyo fecha_inicio + duración (más un margen
+de gracia para que la entrega automática del navegador llegue primero) ya pasó, y los califica
+por lotes con la clave de respuestas cacheada. Cada lote se reserva con SKIP LOCKED, se escribe
+con bulk_update y aplica en bloque lo que los receptores de post_save harían intento por intento:
+contadores del monitoreo, respuestas normalizadas, entradas del ranking, estado cacheado del
+intento, clasificados, versión de las estadísticas de resultados y notificaciones al monitoreo y a
+los estudiantes.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .acciones_masivas import publicar_cambios_intentos
+from .calificacion_utils import calificar_intento
+from .contadores_monitoreo import con_actividad_reciente, registrar_cierres
+from .diario_respuestas import diario, write_behind_activo
+from .models import Evaluacion, ResultadoEvaluacion
+from .ranking import actualizar_participantes
+from .respuestas_intento import registrar_respuestas
+
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 200
+GRACIA_SEGUNDOS = 30
+
+CAMPOS_CIERRE = [
+    'puntos_obtenidos', 'puntos_totales', 'tiempo_utilizado', 'fecha_fin', 'completada',
+    'respuestas_guardadas', 'tiempo_restante', 'ultima_actividad',
+]
+
+
+def cerrar_intentos_vencidos(tamano_lote=TAMANO_LOTE, gracia=GRACIA_SEGUNDOS, evaluacion_id=None):
+    """
+    Califica y cierra los intentos vencidos de todas las evaluaciones (o de la indicada).
+
+    Returns:
+        dict: métricas de la ejecución {'evaluaciones', 'lotes', 'cerrados', 'fallidos', 'segundos'}
+    """
+    inicio = time.monotonic()
+    metricas = {'evaluaciones': 0, 'lotes': 0, 'cerrados': 0, 'fallidos': 0}
+
+    evaluaciones = Evaluacion.objects.all()
+    if evaluacion_id:
+        evaluaciones = evaluaciones.filter(pk=evaluacion_id)
+    for evaluacion in evaluaciones.iterator():
+        lotes, cerrados, fallidos = cerrar_vencidos_evaluacion(evaluacion, tamano_lote, gracia)
+        if lotes:
+            metricas['evaluaciones'] += 1
+        metricas['lotes'] += lotes
+        metricas['cerrados'] += cerrados
+        metricas['fallidos'] += fallidos
+
+    metricas['segundos'] = round(time.monotonic() - inicio, 3)
+    return metricas
+
+
+def cerrar_vencidos_evaluacion(evaluacion, tamano_lote, gracia):
+    """Cierra por lotes los intentos vencidos de una evaluación. Retorna (lotes, cerrados, fallidos)."""
+    corte = timezone.now() - timedelta(minutes=evaluacion.duration_minutes, seconds=gracia)
+    vencidos = ResultadoEvaluacion.objects.filter(
+        evaluacion=evaluacion, completada=False, fecha_inicio__lte=corte
+    ).only(
+        'id', 'evaluacion_id', 'participante_id', 'numero_intento', 'fecha_inicio', 'plan_preguntas', *CAMPOS_CIERRE
+    ).order_by('pk')
+
+    lotes = cerrados = 0
+    fallidos = set()
+    while True:
+        with transaction.atomic():
+            # SKIP LOCKED deja fuera los intentos que el estudiante está entregando en este momento
+            lote = list(vencidos.select_for_update(skip_locked=True).exclude(pk__in=fallidos)[:tamano_lote])
+            if not lote:
+                break
+            if write_behind_activo():
+                # Los guardados aún en el diario compartido forman parte de la calificación
+                diario.vaciar_antes_de_cerrar(lote)
+            calificados = []
+            activos = 0
+            for resultado in lote:
+                # La actividad se lee antes de que el cierre la actualice
+                activo = con_actividad_reciente(resultado.ultima_actividad)
+                try:
+                    _calificar_vencido(evaluacion, resultado)
+                    calificados.append(resultado)
+                    activos += activo
+                except Exception:
+                    logger.exception('No se pudo cerrar el intento vencido %s', resultado.pk)
+                    fallidos.add(resultado.pk)
+            if calificados:
+                ResultadoEvaluacion.objects.bulk_update(calificados, CAMPOS_CIERRE, batch_size=tamano_lote)
+                _registrar_cierres(evaluacion, calificados, activos)
+        lotes += 1
+        cerrados += len(calificados)
+
+    if cerrados:
+        # Un resultado completado puede cambiar los clasificados de las etapas siguientes
+        Evaluacion.invalidar_roster(anio=evaluacion.anio, etapa__gt=evaluacion.etapa)
+    return lotes, cerrados, len(fallidos)
+
+
+def _calificar_vencido(evaluacion, resultado):
+    """Califica el intento como entregado al cumplirse su tiempo, igual que el cierre en take_quiz"""
+    resultado.evaluacion = evaluacion
+    calificacion = calificar_intento(evaluacion, resultado.get_plan_ids(), resultado.respuestas_guardadas or {})
+    # La entrega se registra en el momento en que venció el tiempo, no en el del barrido
+    fecha_vencimiento = resultado.fecha_inicio + timedelta(minutes=evaluacion.duration_minutes)
+    calificacion['snapshot']['fecha_entrega'] = fecha_vencimiento.isoformat()
+
+    resultado.puntos_obtenidos = calificacion['puntaje']
+    resultado.puntos_totales = 10
+    resultado.tiempo_utilizado = evaluacion.duration_minutes * 60
+    resultado.fecha_fin = fecha_vencimiento
+    resultado.completada = True
+    resultado.respuestas_guardadas = calificacion['snapshot']
+    resultado.tiempo_restante = 0
+    # bulk_update no aplica auto_now; ultima_actividad marca el cambio para el monitoreo incremental
+    resultado.ultima_actividad = timezone.now()
+
+
+def _registrar_cierres(evaluacion, resultados, activos):
+    """Efectos de los receptores de post_save, aplicados una vez por lote"""
+    registrar_cierres(evaluacion.pk, len(resultados), activos)
+    registrar_respuestas(resultados)
+    actualizar_participantes(evaluacion, [resultado.participante_id for resultado in resultados])
+    Evaluacion.invalidar_resultados(evaluacion.pk)
+    publicar_cambios_intentos(evaluacion.pk, [resultado.participante_id for resultado in resultados], 'entregado')
@@ -0,0 +1,134 @@
+"""
+Cola de calificación asíncrona de entregas, respaldada en la base de datos.
+
+Con CALIFICACION_ASINCRONA activo, take_quiz no califica la entrega dentro de la petición:
+guarda las respuestas crudas, marca el intento como completado con calificacion_pendiente y
+encola una EntregaPendiente en una sola transacción corta. El comando procesar_entregas
+reclama lotes de la cola y califica cada entrega (puntaje y snapshot congelado) en un pool
+de hilos, sin depender de un broker externo.
+
+Una entrega reclamada queda reservada durante TIEMPO_RESERVA segundos; si el worker muere
+antes de terminarla, vuelve a estar disponible al vencer la reserva. Tras MAX_INTENTOS
+fallos la entrega deja de reclamarse y queda en la cola con su último error: el comando
+procesar_entregas las lista con --fallidas y las vuelve a encolar con --reintentar.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .calificacion_utils import calificar_intento
+from .models import EntregaPendiente, ResultadoEvaluacion
+
+
+logger = logging.getLogger(__name__)
+
+TIEMPO_RESERVA = 120
+MAX_INTENTOS = 5
+
+
+def calificacion_asincrona_activa():
+    """Indica si las entregas se califican en el worker en lugar de en la petición"""
+    return getattr(settings, 'CALIFICACION_ASINCRONA', False)
+
+
+def aceptar_entrega(resultado, respuestas, tiempo_utilizado):
+    """
+    Registra la entrega de un intento activo y la encola para calificación.
+    Las respuestas crudas quedan en respuestas_guardadas hasta que el worker las reemplaza por el snapshot.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        resultado.respuestas_guardadas = respuestas
+        resultado.tiempo_utilizado = tiempo_utilizado
+        resultado.fecha_fin = ahora
+        resultado.tiempo_restante = 0
+        resultado.completada = True
+        resultado.calificacion_pendiente = True
+        resultado.save(update_fields=[
+            'respuestas_guardadas', 'tiempo_utilizado', 'fecha_fin', 'tiempo_restante',
+            'completada', 'calificacion_pendiente', 'ultima_actividad'
+        ])
+        EntregaPendiente.objects.get_or_create(resultado=resultado)
+
+
+def reclamar_entregas(limite):
+    """
+    Reserva hasta `limite` entregas disponibles para este worker y retorna sus IDs.
+    Con SKIP LOCKED varios workers pueden reclamar en paralelo sin bloquearse entre sí.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EntregaPendiente.objects.select_for_update(skip_locked=True)
+            .filter(disponible_desde__lte=ahora, intentos__lt=MAX_INTENTOS)
+            .order_by('disponible_desde', 'id')
+            .values_list('id', flat=True)[:limite]
+        )
+        if ids:
+            EntregaPendiente.objects.filter(pk__in=ids).update(
+                disponible_desde=ahora + timedelta(seconds=TIEMPO_RESERVA)
+            )
+    return ids
+
+
+def entregas_fallidas():
+    """Entregas que agotaron MAX_INTENTOS y ya no se reclaman"""
+    return EntregaPendiente.objects.filter(intentos__gte=MAX_INTENTOS)
+
+
+def entrega_fallida(resultado_id):
+    """Indica si la entrega del intento agotó sus reintentos (el estudiante no recibirá la nota sin intervención)"""
+    return entregas_fallidas().filter(resultado_id=resultado_id).exists()
+
+
+def reencolar_fallidas(entrega_ids=None):
+    """Vuelve a poner en la cola las entregas fallidas (todas o las indicadas). Retorna cuántas."""
+    entregas = entregas_fallidas()
+    if entrega_ids:
+        entregas = entregas.filter(pk__in=entrega_ids)
+    return entregas.update(intentos=0, disponible_desde=timezone.now(), ultimo_error='')
+
+
+def calificar_entrega(entrega_id):
+    """Califica una entrega reclamada, congela su snapshot y la retira de la cola. Retorna True si se calificó."""
+    try:
+        EntregaPendiente.objects.filter(pk=entrega_id).update(intentos=F('intentos') + 1)
+        entrega = EntregaPendiente.objects.select_related('resultado__evaluacion').get(pk=entrega_id)
+        evaluacion = entrega.resultado.evaluacion
+        calificacion = calificar_intento(
+            evaluacion, entrega.resultado.get_plan_ids(), entrega.resultado.respuestas_guardadas or {}
+        )
+
+        with transaction.atomic():
+            # Solo se califica si nadie lo hizo antes (p. ej. otro worker tras vencer la reserva) y si
+            # un administrador no lo finalizó mientras esperaba: su 0/10 es definitivo
+            resultado = ResultadoEvaluacion.objects.select_for_update().filter(
+                pk=entrega.resultado_id, calificacion_pendiente=True, finalizado_por_admin__isnull=True
+            ).first()
+            if resultado:
+                resultado.puntos_obtenidos = calificacion['puntaje']
+                resultado.puntos_totales = 10
+                # El snapshot registra el momento de la entrega, no el de la calificación
+                calificacion['snapshot']['fecha_entrega'] = resultado.fecha_fin.isoformat()
+                resultado.respuestas_guardadas = calificacion['snapshot']
+                resultado.calificacion_pendiente = False
+                # ultima_actividad también marca el cambio para la consulta incremental del monitoreo
+                resultado.save(update_fields=[
+                    'puntos_obtenidos', 'puntos_totales', 'respuestas_guardadas', 'calificacion_pendiente',
+                    'ultima_actividad'
+                ])
+            entrega.delete()
+        return True
+    except EntregaPendiente.DoesNotExist:
+        return False
+    except Exception as e:
+        logger.exception('No se pudo calificar la entrega %s', entrega_id)
+        EntregaPendiente.objects.filter(pk=entrega_id).update(ultimo_error=str(e))
+        return False
+    finally:
+        close_old_connections()
@@ -0,0 +1,98 @@
+"""
+Consumidores WebSocket (Django Channels) del sistema TestMathUTEQ.
+"""
+
+from asgiref.sync import async_to_sync
+from channels.generic.websocket import JsonWebsocketConsumer
+
+from .contadores_monitoreo import obtener_contadores
+from .estado_intento import obtener_estado_intento
+from .models import Evaluacion, Participantes
+from .monitoreo_utils import serializar_monitoreos
+from .notificaciones_estudiante import grupo_estudiante, grupo_estudiantes_evaluacion
+from .notificaciones_monitoreo import nombre_grupo
+from .scope_utils import filter_queryset_by_scope
+
+
+class MonitoreoEvaluacionConsumer(JsonWebsocketConsumer):
+    """
+    WebSocket del panel de monitoreo de una evaluación: reenvía al navegador los cambios
+    de estado de los participantes publicados por notificaciones_monitoreo.
+    """
+
+    grupo = None
+    evaluacion_id = None
+
+    def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated or not (user.is_superuser or hasattr(user, 'adminprofile')):
+            self.close()
+            return
+
+        evaluacion_id = self.scope['url_route']['kwargs']['pk']
+        evaluaciones = filter_queryset_by_scope(Evaluacion.objects.all(), user, model_name='Evaluacion')
+        if not evaluaciones.filter(pk=evaluacion_id).exists():
+            self.close()
+            return
+
+        self.evaluacion_id = evaluacion_id
+        self.grupo = nombre_grupo(evaluacion_id)
+        async_to_sync(self.channel_layer.group_add)(self.grupo, self.channel_name)
+        self.accept()
+
+    def disconnect(self, code):
+        if self.grupo:
+            async_to_sync(self.channel_layer.group_discard)(self.grupo, self.channel_name)
+
+    def monitoreo_mensaje(self, event):
+        self.send_json(event['mensaje'])
+
+    def monitoreo_cambios(self, event):
+        """Arma en una pasada las filas de los participantes que cambiaron y las envía con los contadores"""
+        eventos = dict(event['cambios'])
+        evaluacion = Evaluacion.objects.filter(pk=self.evaluacion_id).first()
+        if evaluacion is None:
+            return
+        participantes = list(Participantes.objects.filter(pk__in=list(eventos)))
+        filas = serializar_monitoreos(evaluacion, participantes)
+        contadores = obtener_contadores(evaluacion).como_dict()
+        for fila in filas:
+            self.send_json({
+                'tipo': 'participante',
+                'eventos': eventos[fila['participante_id']],
+                'monitoreo': fila,
+                'contadores': contadores,
+            })
+
+
+class EstudianteEvaluacionConsumer(JsonWebsocketConsumer):
+    """
+    WebSocket de la página de evaluación del estudiante: recibe el estado de su intento cuando
+    cambia por una acción administrativa y los avisos difundidos a toda la evaluación.
+    """
+
+    grupos = ()
+
+    def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            self.close()
+            return
+
+        evaluacion_id = self.scope['url_route']['kwargs']['pk']
+        estado = obtener_estado_intento(evaluacion_id, user)
+        if not estado or not estado['autorizado']:
+            self.close()
+            return
+
+        self.grupos = (grupo_estudiante(evaluacion_id, user.pk), grupo_estudiantes_evaluacion(evaluacion_id))
+        for grupo in self.grupos:
+            async_to_sync(self.channel_layer.group_add)(grupo, self.channel_name)
+        self.accept()
+
+    def disconnect(self, code):
+        for grupo in self.grupos:
+            async_to_sync(self.channel_layer.group_discard)(grupo, self.channel_name)
+
+    def estudiante_mensaje(self, event):
+        self.send_json(event['mensaje'])
@@ -0,0 +1,175 @@
+"""
+Contadores materializados del monitoreo de una evaluación (ContadoresMonitoreo).
+
+La página de monitoreo y el endpoint de sondeo leen los totales (inscritos, iniciados,
+activos, entregados, finalizados por administración y alertas) de una sola fila en lugar de
+recorrer todos los intentos de la evaluación. Los receptores de signals.py ajustan la fila con
+actualizaciones F() en la misma transacción que crea, entrega o finaliza un intento.
+
+'activos' cambia con el paso del tiempo (un intento deja de estar activo tras 5 minutos sin
+actividad), así que no puede mantenerse solo con transiciones: barrer_activos lo recalcula con
+el índice (evaluacion, ultima_actividad). Lo ejecuta el comando barrer_contadores_monitoreo y,
+si el comando no corre, la lectura cuando el último barrido supera INTERVALO_BARRIDO.
+"""
+
+from datetime import timedelta
+
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import AlertaIntento, ContadoresMonitoreo, ResultadoEvaluacion
+
+
+# Igual que ResultadoEvaluacion.esta_activo
+UMBRAL_ACTIVIDAD = timedelta(minutes=5)
+INTERVALO_BARRIDO = timedelta(seconds=30)
+
+
+def obtener_contadores(evaluacion):
+    """Retorna la fila de contadores de la evaluación, creándola o refrescándola si hace falta"""
+    contadores = ContadoresMonitoreo.objects.filter(evaluacion=evaluacion).first()
+    if contadores is None:
+        return recalcular_contadores(evaluacion)
+
+    if contadores.version_roster != evaluacion.version_roster:
+        contadores.inscritos = len(evaluacion.get_participantes_autorizados())
+        contadores.version_roster = evaluacion.version_roster
+        contadores.save(update_fields=['inscritos', 'version_roster'])
+    if timezone.now() - contadores.fecha_barrido >= INTERVALO_BARRIDO:
+        contadores.activos, contadores.fecha_barrido = barrer_activos(evaluacion.pk)
+    return contadores
+
+
+def recalcular_contadores(evaluacion):
+    """Recalcula todos los contadores de la evaluación desde los intentos y las alertas"""
+    ahora = timezone.now()
+    resultados = ResultadoEvaluacion.objects.filter(evaluacion=evaluacion)
+    ultimo_intento = resultados.filter(participante=OuterRef('participante')).order_by('-numero_intento').values('pk')[:1]
+    ultimos = resultados.filter(pk=Subquery(ultimo_intento))
+
+    valores = {
+        'inscritos': len(evaluacion.get_participantes_autorizados()),
+        'version_roster': evaluacion.version_roster,
+        'iniciados': resultados.values('participante').distinct().count(),
+        'activos': _contar_activos(evaluacion.pk, ahora),
+        'entregados': ultimos.filter(completada=True).count(),
+        'finalizados_admin': ultimos.filter(completada=True, finalizado_por_admin__isnull=False).count(),
+        'total_alertas': AlertaIntento.objects.filter(resultado__evaluacion=evaluacion).count(),
+        'fecha_barrido': ahora,
+    }
+    contadores, _ = ContadoresMonitoreo.objects.update_or_create(evaluacion=evaluacion, defaults=valores)
+    return contadores
+
+
+def barrer_activos(evaluacion_id):
+    """Recalcula 'activos' de una evaluación. Retorna (activos, fecha_barrido)."""
+    ahora = timezone.now()
+    activos = _contar_activos(evaluacion_id, ahora)
+    ContadoresMonitoreo.objects.filter(evaluacion_id=evaluacion_id).update(activos=activos, fecha_barrido=ahora)
+    return activos, ahora
+
+
+def evaluaciones_por_barrer():
+    """IDs de evaluaciones con contadores cuyo 'activos' puede haber cambiado: con activos o con actividad reciente"""
+    limite = timezone.now() - UMBRAL_ACTIVIDAD
+    con_actividad = ResultadoEvaluacion.objects.filter(
+        completada=False, ultima_actividad__gte=limite
+    ).values('evaluacion_id')
+    return list(
+        ContadoresMonitoreo.objects.filter(activos__gt=0).values_list('evaluacion_id', flat=True).union(
+            ContadoresMonitoreo.objects.filter(evaluacion_id__in=con_actividad).values_list('evaluacion_id', flat=True)
+        )
+    )
+
+
+def con_actividad_reciente(ultima_actividad, ahora=None):
+    """Indica si un intento abierto con esa última actividad cuenta en 'activos'"""
+    return ultima_actividad is not None and ultima_actividad >= (ahora or timezone.now()) - UMBRAL_ACTIVIDAD
+
+
+def _contar_activos(evaluacion_id, ahora):
+    # Un participante tiene como máximo un intento sin completar, que siempre es el último
+    return ResultadoEvaluacion.objects.filter(
+        evaluacion_id=evaluacion_id,
+        ultima_actividad__gte=ahora - UMBRAL_ACTIVIDAD,
+        completada=False
+    ).values('participante').distinct().count()
+
+
+def _ajustar(evaluacion_id, **deltas):
+    """Suma los deltas indicados a los contadores, sin bajar de cero"""
+    cambios = {
+        campo: F(campo) + delta if delta > 0 else Greatest(F(campo) + delta, 0)
+        for campo, delta in deltas.items() if delta
+    }
+    if cambios:
+        ContadoresMonitoreo.objects.filter(evaluacion_id=evaluacion_id).update(**cambios)
+
+
+def registrar_guardado_resultado(resultado, created):
+    """
+    Ajusta los contadores según la transición del intento guardado.
+    El estado previo proviene de ResultadoEvaluacion.from_db; si no se conoce, no se ajusta nada.
+    """
+    completada = resultado.completada
+    admin = resultado.finalizado_por_admin_id is not None
+
+    if created:
+        deltas = {'entregados': int(completada), 'finalizados_admin': int(completada and admin)}
+        if not completada:
+            deltas['activos'] = 1
+        anterior = None
+        if resultado.numero_intento > 1:
+            anterior = ResultadoEvaluacion.objects.filter(
+                evaluacion_id=resultado.evaluacion_id,
+                participante_id=resultado.participante_id,
+                numero_intento__lt=resultado.numero_intento
+            ).order_by('-numero_intento').values('completada', 'finalizado_por_admin_id').first()
+        if anterior is None:
+            deltas['iniciados'] = 1
+        elif anterior['completada']:
+            # El nuevo intento pasa a ser el último del participante
+            deltas['entregados'] -= 1
+            deltas['finalizados_admin'] -= int(anterior['finalizado_por_admin_id'] is not None)
+    else:
+        estado_anterior = getattr(resultado, '_estado_contadores', None)
+        if estado_anterior is None:
+            return
+        completada_antes, admin_id_antes, actividad_antes = estado_anterior
+        admin_antes = completada_antes and admin_id_antes is not None
+        deltas = {
+            'entregados': int(completada) - int(bool(completada_antes)),
+            'finalizados_admin': int(completada and admin) - int(bool(admin_antes)),
+        }
+        # Un intento inactivo ya no está en 'activos'; sin la actividad leída se asume activo
+        if completada and not completada_antes and (actividad_antes is None or con_actividad_reciente(actividad_antes)):
+            deltas['activos'] = -1
+
+    resultado._estado_contadores = (completada, resultado.finalizado_por_admin_id, resultado.ultima_actividad)
+    _ajustar(resultado.evaluacion_id, **deltas)
+
+
+def registrar_cierres(evaluacion_id, cantidad, activos):
+    """
+    Intentos abiertos cerrados en bloque (sin post_save): pasan a entregados. Solo `activos` de
+    ellos (con actividad reciente según con_actividad_reciente) se descuentan de 'activos'.
+    """
+    _ajustar(evaluacion_id, entregados=cantidad, activos=-activos)
+
+
+def registrar_finalizaciones_admin(evaluacion_id, abiertos, entregados, activos):
+    """
+    Últimos intentos finalizados en bloque por un administrador: `abiertos` estaban en curso (de
+    ellos, `activos` con actividad reciente) y `entregados` ya entregados.
+    """
+    _ajustar(evaluacion_id, entregados=abiertos, activos=-activos, finalizados_admin=abiertos + entregados)
+
+
+def registrar_alerta(evaluacion_id, cantidad=1):
+    _ajustar(evaluacion_id, total_alertas=cantidad)
+
+
+def descartar_contadores(evaluacion_id):
+    """Ante eliminaciones la fila se descarta y la siguiente lectura la recalcula completa"""
+    ContadoresMonitoreo.objects.filter(evaluacion_id=evaluacion_id).delete()
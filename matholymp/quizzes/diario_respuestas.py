@@ -0,0 +1,246 @@
+"""
+Diario de escritura diferida (write-behind) para el guardado automático de respuestas.
+
+Cuando AUTOSAVE_WRITE_BEHIND está activo, cada guardado automático se registra en un diario
+en la caché compartida (Redis) en lugar de escribir en la base de datos: una entrada por intento
+con los cambios acumulados, la secuencia y el tiempo restante. Cada worker recuerda qué intentos
+registró y un hilo de vaciado los aplica a ResultadoEvaluacion en un solo bulk_update cada
+AUTOSAVE_FLUSH_SEGUNDOS segundos. Como las entradas son compartidas, cualquier worker puede vaciar
+cualquier intento: todos los caminos que cierran un intento (entrega, finalización por cambios de
+pestaña o por tiempo en take_quiz, el barrido de intentos vencidos y la finalización
+administrativa, individual o en bloque) llaman a vaciar_antes_de_cerrar antes de calificar.
+
+El diario exige una caché compartida entre procesos; el chequeo quizzes.E001 (checks.py) falla si
+se activa con la caché local de cada proceso.
+
+Ventanas de pérdida de datos:
+    - Si la caché se reinicia o expulsa una entrada (TIEMPO_ENTRADA) antes del vaciado, se pierden
+      los guardados de ese intento desde el último vaciado.
+    - Si un worker termina abruptamente, sus entradas quedan en la caché pero nadie las vacía
+      periódicamente: el monitoreo muestra un progreso atrasado hasta que el intento se cierra o
+      el estudiante vuelve a cargar take_quiz, que las vacía.
+    - Un guardado que llega después del cierre del intento (por ejemplo, una petición en vuelo
+      durante la finalización administrativa) se descarta: el intento ya fue calificado. Los
+      descartes se registran en el log.
+    - La entrega normal no se ve afectada: el formulario envía todas las respuestas.
+    - Mientras no se vacía, el monitoreo puede mostrar un progreso atrasado hasta ese intervalo.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+TIEMPO_ENTRADA = 60 * 60 * 6
+TIEMPO_BLOQUEO = 5
+ESPERA_BLOQUEO = 2.0
+
+
+def write_behind_activo():
+    """Indica si el guardado automático usa el diario de escritura diferida"""
+    return getattr(settings, 'AUTOSAVE_WRITE_BEHIND', False)
+
+
+def _clave_entrada(resultado_id):
+    return f'diario_respuestas_{resultado_id}'
+
+
+def cambios_pendientes(resultado_id):
+    """Respuestas registradas en el diario del intento que aún no se aplicaron a la base de datos"""
+    entrada = cache.get(_clave_entrada(resultado_id))
+    return entrada['cambios'] if entrada else {}
+
+
+def _clave_bloqueo(resultado_id):
+    return f'diario_respuestas_bloqueo_{resultado_id}'
+
+
+class _Bloqueo:
+    """Bloqueo por intento en la caché compartida (cache.add es atómico en Redis)"""
+
+    def __init__(self, resultado_id):
+        self.clave = _clave_bloqueo(resultado_id)
+
+    def __enter__(self):
+        limite = time.monotonic() + ESPERA_BLOQUEO
+        while not cache.add(self.clave, 1, TIEMPO_BLOQUEO):
+            if time.monotonic() > limite:
+                raise TimeoutError(f'No se pudo bloquear la entrada {self.clave} del diario')
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        cache.delete(self.clave)
+
+
+class DiarioRespuestas:
+    """Acumula los guardados automáticos por intento en la caché y los vacía en lotes a la base de datos"""
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self._registrados = set()
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+
+    def registrar(self, resultado_id, cambios, secuencia, tiempo_restante, secuencia_bd=0):
+        """
+        Registra un guardado en el diario aplicando la misma validación de secuencia que el
+        guardado directo. Retorna (aplicado, secuencia_actual).
+        """
+        with _Bloqueo(resultado_id):
+            entrada = cache.get(_clave_entrada(resultado_id))
+            secuencia_actual = max(secuencia_bd, entrada['secuencia'] if entrada else 0)
+            if secuencia is not None and secuencia <= secuencia_actual:
+                return False, secuencia_actual
+            nueva_secuencia = secuencia if secuencia is not None else secuencia_actual + 1
+
+            if entrada is None:
+                entrada = {'cambios': {}}
+            entrada['cambios'].update(cambios)
+            entrada['secuencia'] = nueva_secuencia
+            entrada['tiempo_restante'] = tiempo_restante
+            entrada['ultima_actividad'] = timezone.now()
+            cache.set(_clave_entrada(resultado_id), entrada, TIEMPO_ENTRADA)
+
+        with self._lock:
+            self._registrados.add(resultado_id)
+        self._asegurar_hilo()
+        return True, nueva_secuencia
+
+    def vaciar(self, resultado_ids=None):
+        """
+        Aplica a la base de datos las entradas pendientes de los intentos indicados (o de todos los
+        que registró este worker). Retorna la cantidad de intentos actualizados.
+        """
+        with self._lock:
+            if resultado_ids is None:
+                resultado_ids, self._registrados = self._registrados, set()
+            else:
+                resultado_ids = set(resultado_ids)
+                self._registrados -= resultado_ids
+        entradas = {}
+        for resultado_id in resultado_ids:
+            entrada = self._extraer(resultado_id)
+            if entrada:
+                entradas[resultado_id] = entrada
+        if not entradas:
+            return 0
+
+        from .models import ResultadoEvaluacion
+
+        campos = ['respuestas_guardadas', 'secuencia_guardado', 'tiempo_restante', 'ultima_actividad']
+        try:
+            with transaction.atomic():
+                resultados = list(
+                    ResultadoEvaluacion.objects.select_for_update()
+                    .filter(pk__in=list(entradas), completada=False)
+                    .only('id', *campos)
+                )
+                for resultado in resultados:
+                    entrada = entradas[resultado.pk]
+                    respuestas = dict(resultado.respuestas_guardadas or {})
+                    if entrada['secuencia'] > resultado.secuencia_guardado:
+                        respuestas.update(entrada['cambios'])
+                        resultado.secuencia_guardado = entrada['secuencia']
+                    else:
+                        # El guardado directo ya escribió una secuencia posterior: solo se agregan respuestas nuevas
+                        respuestas = {**entrada['cambios'], **respuestas}
+                    resultado.respuestas_guardadas = respuestas
+                    resultado.tiempo_restante = entrada['tiempo_restante']
+                    resultado.ultima_actividad = max(resultado.ultima_actividad, entrada['ultima_actividad'])
+                ResultadoEvaluacion.objects.bulk_update(resultados, campos, batch_size=200)
+        except Exception:
+            logger.exception('No se pudo vaciar el diario de respuestas; se reintentará en el próximo ciclo')
+            self._reencolar(entradas)
+            return 0
+
+        descartados = set(entradas) - {resultado.pk for resultado in resultados}
+        if descartados:
+            logger.warning('Guardados descartados del diario de intentos ya cerrados: %s', sorted(descartados))
+        return len(resultados)
+
+    def vaciar_antes_de_cerrar(self, resultados):
+        """
+        Vacía las entradas de los intentos que se van a cerrar y refresca en las instancias las
+        respuestas, la secuencia y la última actividad, para calificar (y guardar) con los últimos
+        guardados.
+        """
+        if not resultados:
+            return
+        if self.vaciar([resultado.pk for resultado in resultados]):
+            from .models import ResultadoEvaluacion
+
+            frescos = {
+                fila['pk']: fila for fila in ResultadoEvaluacion.objects.filter(
+                    pk__in=[resultado.pk for resultado in resultados]
+                ).values('pk', 'respuestas_guardadas', 'secuencia_guardado', 'ultima_actividad')
+            }
+            for resultado in resultados:
+                fila = frescos.get(resultado.pk)
+                if fila:
+                    resultado.respuestas_guardadas = fila['respuestas_guardadas']
+                    resultado.secuencia_guardado = fila['secuencia_guardado']
+                    resultado.ultima_actividad = fila['ultima_actividad']
+
+    def _extraer(self, resultado_id):
+        """Retira la entrada del intento de la caché"""
+        try:
+            with _Bloqueo(resultado_id):
+                entrada = cache.get(_clave_entrada(resultado_id))
+                if entrada is not None:
+                    cache.delete(_clave_entrada(resultado_id))
+                return entrada
+        except TimeoutError:
+            # Otro worker la está escribiendo o vaciando; se retoma en el próximo ciclo
+            with self._lock:
+                self._registrados.add(resultado_id)
+            return None
+
+    def _reencolar(self, entradas):
+        """Devuelve a la caché las entradas que no se pudieron aplicar, sin pisar guardados más recientes"""
+        for resultado_id, entrada in entradas.items():
+            try:
+                with _Bloqueo(resultado_id):
+                    actual = cache.get(_clave_entrada(resultado_id))
+                    if actual is not None:
+                        actual['cambios'] = {**entrada['cambios'], **actual['cambios']}
+                        entrada = actual
+                    cache.set(_clave_entrada(resultado_id), entrada, TIEMPO_ENTRADA)
+            except TimeoutError:
+                logger.error('No se pudo reencolar la entrada del intento %s en el diario', resultado_id)
+                continue
+            with self._lock:
+                self._registrados.add(resultado_id)
+
+    def _asegurar_hilo(self):
+        """Inicia el hilo de vaciado en el proceso actual (también tras un fork del servidor)"""
+        if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._ciclo_vaciado, name='diario-respuestas', daemon=True)
+            self._hilo.start()
+
+    def _ciclo_vaciado(self):
+        evento = threading.Event()
+        while not evento.wait(self.intervalo):
+            try:
+                self.vaciar()
+            finally:
+                close_old_connections()
+
+
+diario = DiarioRespuestas(getattr(settings, 'AUTOSAVE_FLUSH_SEGUNDOS', 5))
+atexit.register(diario.vaciar)
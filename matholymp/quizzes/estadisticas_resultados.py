@@ -0,0 +1,238 @@
+"""
+Caché de las estadísticas de la página de resultados de una evaluación.
+
+Los conteos de participación, el rendimiento, la distribución de puntajes y el análisis por
+pregunta y por categoría se calculan una vez por combinación (evaluación, grupo, categoría) y se
+guardan bajo una clave que incluye las versiones de los datos de los que dependen:
+    - version_resultados: intentos iniciados, entregados, finalizados por administración o eliminados.
+    - version_preguntas: preguntas, opciones o puntos editados.
+    - version_roster: grupos e individuales de la evaluación (participantes elegibles).
+Al incrementarse una versión las entradas anteriores quedan sin uso y expiran solas.
+
+Mientras la ventana de la evaluación está abierta cada guardado automático cambia el análisis de
+los intentos en curso, por lo que solo se cachea una vez pasado end_time; por lo mismo
+version_resultados solo se incrementa en evaluaciones cerradas. La clave incluye además end_time:
+si se reabre una evaluación cerrada (se extiende end_time), los cambios durante la reapertura no
+incrementan la versión, pero la nueva end_time ya deja sin uso las entradas anteriores. El comando
+precalentar_estadisticas_resultados calcula en segundo plano las combinaciones habituales de las
+evaluaciones recién cerradas para que la primera consulta de los organizadores ya sea inmediata.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Min, Q
+from django.utils import timezone
+
+from .analisis_items import analizar_items
+from .models import Categoria, Evaluacion, GrupoParticipantes, Participantes, ResultadoEvaluacion
+
+
+TIEMPO_CACHE_ESTADISTICAS = 60 * 60 * 24
+VENTANA_PRECALENTADO_HORAS = 24
+
+RANGOS_PUNTAJE = [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10)]
+
+
+def grupos_con_resultados(evaluacion):
+    """Grupos con al menos un participante que tiene resultados en la evaluación"""
+    return GrupoParticipantes.objects.filter(
+        participantes__resultados__evaluacion=evaluacion
+    ).distinct().order_by('name')
+
+
+def categorias_evaluacion(evaluacion):
+    return Categoria.objects.filter(preguntas__in=evaluacion.preguntas.all()).distinct().order_by('nombre')
+
+
+def _cache_key(evaluacion, grupo_id, categoria_filtro):
+    return (
+        f'evaluacion_{evaluacion.pk}_estadisticas_r{evaluacion.version_resultados}'
+        f'_p{evaluacion.version_preguntas}_g{evaluacion.version_roster}_f{int(evaluacion.end_time.timestamp())}'
+        f'_grupo_{grupo_id or "todos"}_categoria_{categoria_filtro}'
+    )
+
+
+def obtener_estadisticas_resultados(evaluacion, grupo=None, categoria_filtro='todas'):
+    """
+    Estadísticas de la página de resultados, desde la caché si la evaluación ya cerró.
+
+    Args:
+        evaluacion: Evaluación consultada (con sus versiones actuales)
+        grupo: GrupoParticipantes del filtro o None para todos
+        categoria_filtro: 'todas', 'sin_categoria' o el ID de la categoría como texto
+    """
+    if not evaluacion.is_finished():
+        return calcular_estadisticas_resultados(evaluacion, grupo, categoria_filtro)
+
+    cache_key = _cache_key(evaluacion, grupo.pk if grupo else None, categoria_filtro)
+    estadisticas = cache.get(cache_key)
+    if estadisticas is None:
+        estadisticas = calcular_estadisticas_resultados(evaluacion, grupo, categoria_filtro)
+        cache.set(cache_key, estadisticas, TIEMPO_CACHE_ESTADISTICAS)
+    return estadisticas
+
+
+def calcular_estadisticas_resultados(evaluacion, grupo=None, categoria_filtro='todas'):
+    """Calcula las estadísticas de la página de resultados para el grupo y la categoría indicados"""
+    todos_resultados = ResultadoEvaluacion.objects.filter(evaluacion=evaluacion)
+    if grupo:
+        todos_resultados = todos_resultados.filter(participante__in=grupo.participantes.all())
+    # Las entregas en cola de calificación tienen puntos_obtenidos=0 hasta que el worker las califica
+    resultados_completados = todos_resultados.filter(completada=True, calificacion_pendiente=False)
+
+    if categoria_filtro == 'sin_categoria':
+        preguntas = evaluacion.preguntas.filter(categoria__isnull=True)
+    elif categoria_filtro.isdigit():
+        preguntas = evaluacion.preguntas.filter(categoria_id=int(categoria_filtro))
+    else:
+        preguntas = evaluacion.preguntas.all()
+
+    # Estadísticas de participación en una sola consulta
+    participacion = todos_resultados.aggregate(
+        con_resultados=Count('participante', distinct=True),
+        completaron=Count('participante', distinct=True, filter=Q(completada=True)),
+        en_progreso=Count('participante', distinct=True, filter=Q(completada=False)),
+    )
+
+    # Participantes elegibles para esta evaluación
+    if grupo:
+        participantes_elegibles = grupo.participantes.count()
+    elif evaluacion.etapa == 1:
+        participantes_elegibles = len(evaluacion.get_participantes_etapa1())
+    else:
+        # Para etapas superiores, usar todos los participantes registrados como referencia
+        participantes_elegibles = Participantes.objects.count()
+
+    participantes_con_resultados = participacion['con_resultados']
+    tasa_participacion = (participantes_con_resultados / participantes_elegibles * 100) if participantes_elegibles > 0 else 0
+
+    # Rendimiento y distribución de puntajes en una sola consulta
+    rango_maximo = RANGOS_PUNTAJE[-1][1]
+    rendimiento = resultados_completados.aggregate(
+        total=Count('id'),
+        promedio_puntaje=Avg('puntos_obtenidos'),
+        mejor_puntaje=Max('puntos_obtenidos'),
+        peor_puntaje=Min('puntos_obtenidos'),
+        tiempo_promedio=Avg('tiempo_utilizado'),
+        **{
+            f'rango_{indice}': Count('id', filter=Q(
+                puntos_obtenidos__gte=rango_min,
+                puntos_obtenidos__lt=rango_max if rango_max < rango_maximo else rango_maximo + 1,
+            ))
+            for indice, (rango_min, rango_max) in enumerate(RANGOS_PUNTAJE)
+        }
+    )
+    estadisticas_rendimiento = {
+        'promedio_porcentaje': (rendimiento['promedio_puntaje'] / 10 * 100) if rendimiento['promedio_puntaje'] else 0,
+        'mejor_puntaje': rendimiento['mejor_puntaje'] if rendimiento['mejor_puntaje'] else 0,
+        'peor_puntaje': rendimiento['peor_puntaje'] if rendimiento['peor_puntaje'] else 0,
+        'tiempo_promedio': int(rendimiento['tiempo_promedio']) if rendimiento['tiempo_promedio'] else 0,
+    }
+    distribucion_puntajes = [
+        {'rango': f'{rango_min}-{rango_max}', 'count': rendimiento[f'rango_{indice}']}
+        for indice, (rango_min, rango_max) in enumerate(RANGOS_PUNTAJE)
+    ] if rendimiento['total'] else []
+
+    # Análisis por pregunta y por categoría: las respuestas de cada intento se decodifican una
+    # sola vez a una matriz intentos × preguntas y los conteos se calculan con NumPy
+    resultados_con_respuestas = todos_resultados.exclude(
+        respuestas_guardadas__isnull=True
+    ).exclude(
+        respuestas_guardadas={}
+    )
+    analisis_preguntas, analisis_categorias = analizar_items(
+        evaluacion, resultados_con_respuestas, preguntas.select_related('categoria')
+    )
+
+    # Versiones serializables para json_script
+    analisis_preguntas_json = [
+        {
+            'pregunta_id': analisis['pregunta'].id,
+            'pregunta_text': analisis['pregunta'].text,
+            'correctas': analisis['correctas'],
+            'incorrectas': analisis['incorrectas'],
+            'sin_responder': analisis['sin_responder'],
+            'porcentaje_correctas': analisis['porcentaje_correctas'],
+            'dificultad': analisis['dificultad'],
+            'indice_dificultad': analisis['indice_dificultad'],
+            'discriminacion': analisis['discriminacion'],
+            'punto_biserial': analisis['punto_biserial'],
+            'opciones': [
+                {'letra': opcion['letra'], 'is_correct': opcion['is_correct'], 'frecuencia': opcion['frecuencia']}
+                for opcion in analisis['opciones']
+            ],
+        }
+        for analisis in analisis_preguntas
+    ]
+    analisis_categorias_json = [
+        {
+            'nombre': categoria['categoria_nombre'],
+            'porcentaje': float(categoria['porcentaje_acierto']),
+            'preguntas': categoria['total_preguntas'],
+            'dificultad': categoria['dificultad'],
+        }
+        for categoria in analisis_categorias
+    ]
+
+    return {
+        'participantes_count': participantes_elegibles,
+        'participantes_con_resultados': participantes_con_resultados,
+        'participantes_completaron': participacion['completaron'],
+        'participantes_en_progreso': participacion['en_progreso'],
+        'participantes_no_iniciaron': max(0, participantes_elegibles - participantes_con_resultados),
+        'tasa_participacion': round(tasa_participacion, 1),
+        'estadisticas_rendimiento': estadisticas_rendimiento,
+        'analisis_preguntas': analisis_preguntas,
+        'analisis_preguntas_json': analisis_preguntas_json,
+        'analisis_categorias': analisis_categorias,
+        'analisis_categorias_json': analisis_categorias_json,
+        'distribucion_puntajes': distribucion_puntajes,
+        'distribucion_puntajes_json': distribucion_puntajes,
+    }
+
+
+def precalentar_estadisticas(evaluacion):
+    """
+    Calcula y guarda las combinaciones habituales de una evaluación cerrada: sin filtros, cada
+    grupo con resultados y cada categoría. Retorna cuántas combinaciones se calcularon.
+    """
+    combinaciones = [(None, 'todas')]
+    combinaciones += [(grupo, 'todas') for grupo in grupos_con_resultados(evaluacion)]
+    combinaciones += [(None, str(categoria_id)) for categoria_id in categorias_evaluacion(evaluacion).values_list('id', flat=True)]
+    if evaluacion.preguntas.filter(categoria__isnull=True).exists():
+        combinaciones.append((None, 'sin_categoria'))
+
+    calculadas = 0
+    for grupo, categoria_filtro in combinaciones:
+        cache_key = _cache_key(evaluacion, grupo.pk if grupo else None, categoria_filtro)
+        if cache.get(cache_key) is None:
+            cache.set(cache_key, calcular_estadisticas_resultados(evaluacion, grupo, categoria_filtro), TIEMPO_CACHE_ESTADISTICAS)
+            calculadas += 1
+    return calculadas
+
+
+def precalentar_evaluaciones_cerradas(ventana_horas=VENTANA_PRECALENTADO_HORAS, evaluacion_id=None):
+    """
+    Precalienta las estadísticas de las evaluaciones cuyo end_time pasó dentro de la ventana.
+    Las combinaciones ya cacheadas para las versiones actuales no se recalculan.
+
+    Returns:
+        dict: métricas de la ejecución {'evaluaciones', 'combinaciones', 'segundos'}
+    """
+    inicio = time.monotonic()
+    metricas = {'evaluaciones': 0, 'combinaciones': 0}
+
+    ahora = timezone.now()
+    evaluaciones = Evaluacion.objects.filter(end_time__lte=ahora, end_time__gte=ahora - timedelta(hours=ventana_horas))
+    if evaluacion_id:
+        evaluaciones = Evaluacion.objects.filter(pk=evaluacion_id, end_time__lte=ahora)
+    for evaluacion in evaluaciones.iterator():
+        calculadas = precalentar_estadisticas(evaluacion)
+        if calculadas:
+            metricas['evaluaciones'] += 1
+            metricas['combinaciones'] += calculadas
+
+    metricas['segundos'] = round(time.monotonic() - inicio, 3)
+    return metricas
@@ -0,0 +1,145 @@
+"""
+Estado cacheado del intento activo de un estudiante en una evaluación.
+
+Los endpoints de la página de evaluación (latido, verificación de estado, progreso, cambios de
+pestaña y guardado automático) consultan este estado antes de ir a la base de datos, de modo que
+un sondeo en régimen estable no necesita resolver de nuevo el participante, la evaluación, la
+autorización ni las búsquedas del intento activo y del intento finalizado por un administrador.
+
+Cada punto de escritura invalida el estado explícitamente: take_quiz al crear, entregar, cerrar
+por tiempo o por cambios de pestaña; registrar_cambio_pestana; reducir_cambios_pestana;
+finalizar_por_admin; las acciones masivas y el barrido de intentos vencidos
+(publicar_cambios_intentos). El receptor de post_save de signals.py cubre además las escrituras
+desde el admin de Django o la consola.
+
+La invalidación solo alcanza a los demás workers si la caché es compartida: con varios workers
+(WEB_WORKERS > 1) el chequeo quizzes.E002 (checks.py) exige REDIS_URL. Con un solo proceso la
+caché local es suficiente.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Evaluacion, Participantes, ResultadoEvaluacion
+
+
+TIEMPO_CACHE_ESTADO = 30
+MAX_CAMBIOS_PESTANA = 4
+
+
+def _cache_key(evaluacion_id, user_id):
+    return f'estado_intento_{evaluacion_id}_{user_id}'
+
+
+def obtener_estado_intento(evaluacion_id, user):
+    """
+    Retorna el estado del intento del usuario en la evaluación, desde la caché o la base de datos.
+    Retorna None si el usuario no es participante o la evaluación no existe.
+    """
+    cache_key = _cache_key(evaluacion_id, user.pk)
+    estado = cache.get(cache_key)
+    if estado is None:
+        estado = construir_estado_intento(evaluacion_id, user)
+        if estado is not None:
+            cache.set(cache_key, estado, TIEMPO_CACHE_ESTADO)
+    return estado
+
+
+def refrescar_estado_intento(evaluacion_id, user):
+    """Reconstruye el estado desde la base de datos y lo deja en la caché (para publicarlo al estudiante)"""
+    estado = construir_estado_intento(evaluacion_id, user)
+    if estado is not None:
+        cache.set(_cache_key(evaluacion_id, user.pk), estado, TIEMPO_CACHE_ESTADO)
+    return estado
+
+
+def construir_estado_intento(evaluacion_id, user):
+    """Construye el estado del intento con la última fila de ResultadoEvaluacion del participante"""
+    participante_id = Participantes.objects.filter(user=user).values_list('id', flat=True).first()
+    evaluacion = Evaluacion.objects.filter(pk=evaluacion_id).first()
+    if participante_id is None or evaluacion is None:
+        return None
+
+    estado = {
+        'evaluacion_id': evaluacion.pk,
+        'participante_id': participante_id,
+        'autorizado': evaluacion.is_participante_autorizado(participante_id),
+        'duracion_segundos': evaluacion.duration_minutes * 60,
+        'resultado_id': None,
+        'numero_intento': None,
+        'fecha_inicio': None,
+        'activo': False,
+        'finalizada_admin': False,
+        'motivo': '',
+        'admin': '',
+        'cambios_pestana': 0,
+    }
+
+    resultado = ResultadoEvaluacion.objects.filter(
+        evaluacion=evaluacion,
+        participante_id=participante_id
+    ).select_related('finalizado_por_admin').only(
+        'id', 'numero_intento', 'fecha_inicio', 'completada', 'cambios_pestana',
+        'motivo_finalizacion', 'finalizado_por_admin', 'finalizado_por_admin__username',
+        'finalizado_por_admin__first_name', 'finalizado_por_admin__last_name'
+    ).order_by('-numero_intento').first()
+
+    if resultado:
+        estado.update({
+            'resultado_id': resultado.pk,
+            'numero_intento': resultado.numero_intento,
+            'fecha_inicio': resultado.fecha_inicio.timestamp() if resultado.fecha_inicio else None,
+            'activo': not resultado.completada,
+            'cambios_pestana': resultado.cambios_pestana or 0,
+        })
+        if resultado.completada and resultado.finalizado_por_admin_id:
+            admin = resultado.finalizado_por_admin
+            estado.update({
+                'finalizada_admin': True,
+                'motivo': resultado.motivo_finalizacion,
+                'admin': admin.get_full_name() or admin.username,
+            })
+
+    # La versión solo depende de datos estables: el tiempo restante se calcula en cada lectura
+    estado['version'] = hashlib.md5(json.dumps(estado, sort_keys=True).encode()).hexdigest()[:16]
+    return estado
+
+
+def invalidar_estado_intento(evaluacion_id, user_id):
+    """Descarta el estado cacheado para que la siguiente consulta lo reconstruya"""
+    cache.delete(_cache_key(evaluacion_id, user_id))
+
+
+def invalidar_estados_intento(evaluacion_id, user_ids):
+    """Descarta en una sola operación el estado cacheado de varios usuarios de la evaluación"""
+    if user_ids:
+        cache.delete_many([_cache_key(evaluacion_id, user_id) for user_id in user_ids])
+
+
+def datos_latido(estado):
+    """Cuerpo del latido de la página de evaluación; es también el mensaje que se publica por WebSocket"""
+    datos = {
+        'success': True,
+        'resultado_id': estado['resultado_id'],
+        'completada': not estado['activo'],
+        'finalizada_admin': estado['finalizada_admin'],
+        'cambios_pestana_actuales': estado['cambios_pestana'],
+        'cambios_pestana_maximo': MAX_CAMBIOS_PESTANA,
+        'version': estado['version'],
+        'tiempo_restante': tiempo_restante_estado(estado) if estado['activo'] else 0,
+    }
+    if estado['finalizada_admin']:
+        datos['motivo'] = estado['motivo']
+        datos['admin'] = estado['admin']
+    return datos
+
+
+def tiempo_restante_estado(estado):
+    """Calcula el tiempo restante del intento desde su inicio; nunca confía en el navegador."""
+    if not estado['fecha_inicio']:
+        return estado['duracion_segundos']
+    transcurrido = int(timezone.now().timestamp() - estado['fecha_inicio'])
+    return max(0, estado['duracion_segundos'] - transcurrido)
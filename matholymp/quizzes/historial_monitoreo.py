@@ -0,0 +1,123 @@
+"""
+Historial del monitoreo de las evaluaciones (MuestraMonitoreo).
+
+El comando muestrear_monitoreo registra cada cierto número de segundos, por cada evaluación con
+actividad, una fila con los participantes activos en ese momento (una lectura instantánea, no el
+pico entre muestras), los entregados, los guardados automáticos y las alertas. Los valores salen
+de ContadoresMonitoreo y de una suma de secuencia_guardado (cada guardado automático aceptado
+incrementa la secuencia del intento), sin leer las respuestas de los intentos. Los acumulados
+permiten calcular tasas por minuto restando muestras consecutivas.
+
+Las muestras más antiguas que el umbral de compactación se agrupan en intervalos más largos
+(mayor lectura de activos, último valor de los acumulados), de modo que el historial de una
+olimpiada completa ocupa pocas filas y el gráfico se sirve con una consulta por rango sobre el
+índice (evaluacion, fecha).
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .contadores_monitoreo import barrer_activos, evaluaciones_por_barrer, obtener_contadores
+from .models import Evaluacion, MuestraMonitoreo, ResultadoEvaluacion
+
+
+INTERVALO_MUESTREO = 60
+RESOLUCION_COMPACTADA = 300
+ANTIGUEDAD_COMPACTACION = timedelta(days=1)
+
+
+def tomar_muestras(intervalo=INTERVALO_MUESTREO):
+    """Registra una muestra de cada evaluación con actividad. Retorna la cantidad de muestras."""
+    ahora = timezone.now()
+    muestras = []
+    for evaluacion in Evaluacion.objects.filter(pk__in=evaluaciones_por_barrer()):
+        # 'activos' es la lectura del barrido en el momento de la muestra: un pico entre dos muestras no queda registrado
+        barrer_activos(evaluacion.pk)
+        contadores = obtener_contadores(evaluacion)
+        guardados = ResultadoEvaluacion.objects.filter(evaluacion=evaluacion).aggregate(
+            total=Sum('secuencia_guardado')
+        )['total'] or 0
+        muestras.append(MuestraMonitoreo(
+            evaluacion=evaluacion,
+            fecha=ahora,
+            intervalo=intervalo,
+            activos=contadores.activos,
+            entregados=contadores.entregados,
+            guardados=guardados,
+            alertas=contadores.total_alertas,
+        ))
+    MuestraMonitoreo.objects.bulk_create(muestras)
+    return len(muestras)
+
+
+def compactar_muestras(antiguedad=ANTIGUEDAD_COMPACTACION, resolucion=RESOLUCION_COMPACTADA):
+    """
+    Agrupa las muestras de menor resolución y más antiguas que `antiguedad` en intervalos de
+    `resolucion` segundos. Retorna (muestras_leidas, muestras_creadas).
+    """
+    # El límite se alinea a la resolución para que ningún intervalo quede compactado en dos filas
+    limite = int((timezone.now() - antiguedad).timestamp())
+    limite = datetime.fromtimestamp(limite - limite % resolucion, tz=dt_timezone.utc)
+    antiguas = MuestraMonitoreo.objects.filter(intervalo__lt=resolucion, fecha__lt=limite)
+    with transaction.atomic():
+        # Una sola lectura por el índice (intervalo, fecha), ordenada en memoria; el muestreo solo inserta muestras nuevas
+        grupos = {}
+        for muestra in sorted(antiguas, key=lambda muestra: (muestra.evaluacion_id, muestra.fecha)):
+            segundos = int(muestra.fecha.timestamp())
+            grupos.setdefault((muestra.evaluacion_id, segundos - segundos % resolucion), []).append(muestra)
+
+        compactadas = []
+        for (evaluacion_id, inicio), grupo in grupos.items():
+            ultima = grupo[-1]
+            compactadas.append(MuestraMonitoreo(
+                evaluacion_id=evaluacion_id,
+                fecha=datetime.fromtimestamp(inicio, tz=dt_timezone.utc),
+                intervalo=resolucion,
+                activos=max(muestra.activos for muestra in grupo),
+                entregados=ultima.entregados,
+                guardados=ultima.guardados,
+                alertas=ultima.alertas,
+            ))
+        leidas, _ = antiguas.delete()
+        MuestraMonitoreo.objects.bulk_create(compactadas, batch_size=500)
+    return leidas, len(compactadas)
+
+
+def serie_monitoreo(evaluacion, desde=None, hasta=None):
+    """
+    Serie del historial en el rango indicado, con una sola consulta sobre (evaluacion, fecha).
+
+    Returns:
+        list: [{'fecha', 'intervalo', 'activos', 'entregados', 'guardados_minuto', 'alertas_minuto'}]
+    """
+    muestras = MuestraMonitoreo.objects.filter(evaluacion=evaluacion)
+    if desde:
+        muestras = muestras.filter(fecha__gte=desde)
+    if hasta:
+        muestras = muestras.filter(fecha__lte=hasta)
+
+    serie = []
+    anterior = None
+    for muestra in muestras.order_by('fecha').values(
+        'fecha', 'intervalo', 'activos', 'entregados', 'guardados', 'alertas'
+    ):
+        punto = {
+            'fecha': muestra['fecha'].isoformat(),
+            'intervalo': muestra['intervalo'],
+            'activos': muestra['activos'],
+            'entregados': muestra['entregados'],
+            'guardados_minuto': None,
+            'alertas_minuto': None,
+        }
+        if anterior is not None:
+            minutos = (muestra['fecha'] - anterior['fecha']).total_seconds() / 60
+            if minutos > 0:
+                # Los acumulados bajan si se eliminan intentos; esa caída no es una tasa negativa
+                punto['guardados_minuto'] = round(max(0, muestra['guardados'] - anterior['guardados']) / minutos, 2)
+                punto['alertas_minuto'] = round(max(0, muestra['alertas'] - anterior['alertas']) / minutos, 2)
+        serie.append(punto)
+        anterior = muestra
+    return serie
@@ -0,0 +1,46 @@
+"""Barrido periódico de los participantes activos en los contadores del monitoreo."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from quizzes.contadores_monitoreo import barrer_activos, evaluaciones_por_barrer, recalcular_contadores
+from quizzes.models import Evaluacion
+
+
+class Command(BaseCommand):
+    help = "Recalcula 'activos' de ContadoresMonitoreo desde la última actividad de los intentos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--intervalo", type=float, default=15.0, help="Segundos entre barridos.")
+        parser.add_argument(
+            "--una-vez", action="store_true",
+            help="Ejecuta un solo barrido y termina.",
+        )
+        parser.add_argument(
+            "--completo", action="store_true",
+            help="Recalcula todos los contadores de cada evaluación (o de --evaluation) y termina.",
+        )
+        parser.add_argument("--evaluation", type=int, help="ID de la evaluación a recalcular con --completo.")
+
+    def handle(self, *args, **options):
+        if options["completo"]:
+            evaluaciones = Evaluacion.objects.all()
+            if options["evaluation"]:
+                evaluaciones = evaluaciones.filter(pk=options["evaluation"])
+            for evaluacion in evaluaciones.iterator():
+                contadores = recalcular_contadores(evaluacion)
+                self.stdout.write(f"Evaluación {evaluacion.pk}: {contadores.como_dict()}")
+            return
+
+        try:
+            while True:
+                ids = evaluaciones_por_barrer()
+                for evaluacion_id in ids:
+                    barrer_activos(evaluacion_id)
+                if options["una_vez"]:
+                    self.stdout.write(self.style.SUCCESS(f"Evaluaciones barridas: {len(ids)}"))
+                    break
+                time.sleep(options["intervalo"])
+        except KeyboardInterrupt:
+            self.stdout.write("Deteniendo el barrido...")
@@ -0,0 +1,53 @@
+"""Worker que califica y cierra por lotes los intentos cuyo tiempo ya venció."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from quizzes.cierre_intentos import GRACIA_SEGUNDOS, TAMANO_LOTE, cerrar_intentos_vencidos
+
+
+class Command(BaseCommand):
+    help = "Califica y cierra por lotes los intentos abiertos cuyo tiempo ya venció, sin esperar a que el estudiante vuelva."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Intentos calificados por lote.")
+        parser.add_argument(
+            "--gracia", type=int, default=GRACIA_SEGUNDOS,
+            help="Segundos tras el vencimiento antes de cerrar, para que llegue la entrega automática del navegador.",
+        )
+        parser.add_argument("--intervalo", type=float, default=30.0, help="Segundos entre barridos.")
+        parser.add_argument(
+            "--una-vez", action="store_true",
+            help="Ejecuta un solo barrido y termina.",
+        )
+        parser.add_argument("--evaluation", type=int, help="ID de la evaluación a barrer (por defecto todas).")
+
+    def handle(self, *args, **options):
+        lote = max(1, options["lote"])
+        gracia = max(0, options["gracia"])
+        total = 0
+
+        try:
+            while True:
+                metricas = cerrar_intentos_vencidos(lote, gracia, options["evaluation"])
+                total += metricas["cerrados"]
+                if metricas["cerrados"] or metricas["fallidos"] or options["una_vez"]:
+                    self.stdout.write(self._resumen(metricas))
+                if options["una_vez"]:
+                    break
+                time.sleep(options["intervalo"])
+        except KeyboardInterrupt:
+            self.stdout.write("Deteniendo el cierre de intentos...")
+
+        self.stdout.write(self.style.SUCCESS(f"Intentos vencidos cerrados: {total}"))
+
+    def _resumen(self, metricas):
+        por_segundo = metricas["cerrados"] / metricas["segundos"] if metricas["segundos"] else 0
+        resumen = (
+            f"Cerrados {metricas['cerrados']} intento(s) de {metricas['evaluaciones']} evaluación(es) "
+            f"en {metricas['lotes']} lote(s), {metricas['segundos']:.2f} s ({por_segundo:.0f} intentos/s)"
+        )
+        if metricas["fallidos"]:
+            return self.style.WARNING(f"{resumen}; {metricas['fallidos']} fallido(s)")
+        return resumen
@@ -0,0 +1,63 @@
+"""Compacta los snapshots de intentos entregados al formato referenciado por VersionPregunta."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from quizzes.calificacion_utils import compactar_item_snapshot
+from quizzes.models import ResultadoEvaluacion, VersionPregunta
+
+
+class Command(BaseCommand):
+    help = (
+        "Reemplaza los textos copiados en cada snapshot por referencias a versiones inmutables "
+        "de las preguntas, procesando los resultados por lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=200, help="Resultados procesados por lote.")
+        parser.add_argument("--evaluation", type=int, help="Limita la compactación a una evaluación.")
+        parser.add_argument(
+            "--simular", action="store_true",
+            help="Calcula cuántos snapshots se compactarían sin escribir cambios.",
+        )
+
+    def handle(self, *args, **options):
+        lote = max(1, options["lote"])
+        resultados = ResultadoEvaluacion.objects.filter(completada=True).order_by("pk")
+        if options["evaluation"]:
+            resultados = resultados.filter(evaluacion_id=options["evaluation"])
+
+        ultimo_id = 0
+        revisados = 0
+        compactados = 0
+        while True:
+            filas = list(resultados.filter(pk__gt=ultimo_id).only("id", "respuestas_guardadas")[:lote])
+            if not filas:
+                break
+            ultimo_id = filas[-1].pk
+            revisados += len(filas)
+
+            versiones = {}
+            modificados = []
+            for resultado in filas:
+                data = resultado.respuestas_guardadas
+                if not isinstance(data, dict) or not data.get("preguntas_snapshot"):
+                    continue
+                items = data["preguntas_snapshot"]
+                if not any("opciones" in item for item in items):
+                    continue
+                data["preguntas_snapshot"] = [compactar_item_snapshot(item, versiones) for item in items]
+                modificados.append(resultado)
+
+            if modificados and not options["simular"]:
+                # Las versiones se registran antes de que algún snapshot las referencie
+                with transaction.atomic():
+                    VersionPregunta.registrar(versiones)
+                    ResultadoEvaluacion.objects.bulk_update(modificados, ["respuestas_guardadas"])
+            compactados += len(modificados)
+            self.stdout.write(f"Revisados {revisados} resultados; compactados {compactados}.")
+
+        accion = "se compactarían" if options["simular"] else "compactados"
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo: {revisados} resultados revisados, {compactados} snapshots {accion}."
+        ))
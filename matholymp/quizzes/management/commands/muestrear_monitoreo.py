@@ -0,0 +1,51 @@
+"""Muestreo periódico del historial del monitoreo y compactación de las muestras antiguas."""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from quizzes.historial_monitoreo import (
+    ANTIGUEDAD_COMPACTACION, INTERVALO_MUESTREO, RESOLUCION_COMPACTADA, compactar_muestras, tomar_muestras,
+)
+
+
+class Command(BaseCommand):
+    help = "Registra cada N segundos los agregados del monitoreo de las evaluaciones con actividad (MuestraMonitoreo)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--intervalo", type=int, default=INTERVALO_MUESTREO, help="Segundos entre muestras.")
+        parser.add_argument(
+            "--una-vez", action="store_true",
+            help="Toma una sola muestra, compacta y termina.",
+        )
+        parser.add_argument(
+            "--compactar-horas", type=float, default=ANTIGUEDAD_COMPACTACION.total_seconds() / 3600,
+            help="Antigüedad en horas a partir de la cual las muestras se compactan.",
+        )
+        parser.add_argument(
+            "--resolucion", type=int, default=RESOLUCION_COMPACTADA,
+            help="Segundos que cubre cada muestra compactada.",
+        )
+
+    def handle(self, *args, **options):
+        intervalo = max(1, options["intervalo"])
+        antiguedad = timedelta(hours=options["compactar_horas"])
+        ultima_compactacion = 0
+
+        try:
+            while True:
+                inicio = time.monotonic()
+                muestras = tomar_muestras(intervalo)
+                # La compactación se ejecuta como máximo una vez por intervalo compactado
+                if options["una_vez"] or inicio - ultima_compactacion >= options["resolucion"]:
+                    leidas, creadas = compactar_muestras(antiguedad, options["resolucion"])
+                    ultima_compactacion = inicio
+                    if leidas:
+                        self.stdout.write(f"Compactadas {leidas} muestra(s) en {creadas}")
+                if options["una_vez"]:
+                    self.stdout.write(self.style.SUCCESS(f"Muestras registradas: {muestras}"))
+                    break
+                time.sleep(max(0, intervalo - (time.monotonic() - inicio)))
+        except KeyboardInterrupt:
+            self.stdout.write("Deteniendo el muestreo...")
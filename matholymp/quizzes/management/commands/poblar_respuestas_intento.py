@@ -0,0 +1,51 @@
+"""Normaliza en RespuestaIntento los snapshots de los intentos entregados antes de existir la tabla."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from quizzes.models import ResultadoEvaluacion
+from quizzes.respuestas_intento import con_respuestas_normalizadas, registrar_respuestas
+
+
+class Command(BaseCommand):
+    help = (
+        "Registra una fila de RespuestaIntento por pregunta de cada intento entregado con snapshot, "
+        "procesando los resultados por lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=200, help="Resultados procesados por lote.")
+        parser.add_argument("--evaluation", type=int, help="Limita el proceso a una evaluación.")
+        parser.add_argument(
+            "--rehacer", action="store_true",
+            help="Vuelve a normalizar también los intentos que ya tienen sus respuestas registradas.",
+        )
+
+    def handle(self, *args, **options):
+        lote = max(1, options["lote"])
+        resultados = ResultadoEvaluacion.objects.filter(completada=True).order_by("pk")
+        if options["evaluation"]:
+            resultados = resultados.filter(evaluacion_id=options["evaluation"])
+        if not options["rehacer"]:
+            resultados = resultados.filter(~con_respuestas_normalizadas())
+
+        ultimo_id = 0
+        revisados = 0
+        filas = 0
+        while True:
+            # Solo un lote de snapshots en memoria a la vez
+            pendientes = list(
+                resultados.filter(pk__gt=ultimo_id).only("id", "evaluacion_id", "respuestas_guardadas")[:lote]
+            )
+            if not pendientes:
+                break
+            ultimo_id = pendientes[-1].pk
+            revisados += len(pendientes)
+
+            with transaction.atomic():
+                filas += registrar_respuestas(pendientes)
+            self.stdout.write(f"Revisados {revisados} resultados; {filas} respuestas registradas.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo: {revisados} resultados revisados, {filas} respuestas registradas."
+        ))
@@ -0,0 +1,47 @@
+"""Worker que precalcula las estadísticas de resultados de las evaluaciones recién cerradas."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from quizzes.estadisticas_resultados import VENTANA_PRECALENTADO_HORAS, precalentar_evaluaciones_cerradas
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula y guarda en caché las estadísticas de resultados (sin filtros, por grupo y por categoría) "
+        "de las evaluaciones cuyo end_time ya pasó."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ventana", type=int, default=VENTANA_PRECALENTADO_HORAS,
+            help="Horas hacia atrás desde ahora en las que se buscan evaluaciones cerradas.",
+        )
+        parser.add_argument("--intervalo", type=float, default=60.0, help="Segundos entre barridos.")
+        parser.add_argument(
+            "--una-vez", action="store_true",
+            help="Ejecuta un solo barrido y termina.",
+        )
+        parser.add_argument("--evaluation", type=int, help="ID de la evaluación a precalentar (ignora la ventana).")
+
+    def handle(self, *args, **options):
+        ventana = max(1, options["ventana"])
+        total = 0
+
+        try:
+            while True:
+                metricas = precalentar_evaluaciones_cerradas(ventana, options["evaluation"])
+                total += metricas["combinaciones"]
+                if metricas["combinaciones"] or options["una_vez"]:
+                    self.stdout.write(
+                        f"Precalculadas {metricas['combinaciones']} combinación(es) de "
+                        f"{metricas['evaluaciones']} evaluación(es) en {metricas['segundos']:.2f} s"
+                    )
+                if options["una_vez"]:
+                    break
+                time.sleep(options["intervalo"])
+        except KeyboardInterrupt:
+            self.stdout.write("Deteniendo el precalentado de estadísticas...")
+
+        self.stdout.write(self.style.SUCCESS(f"Combinaciones de estadísticas precalculadas: {total}"))
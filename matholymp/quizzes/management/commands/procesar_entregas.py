@@ -0,0 +1,68 @@
+"""Worker que califica las entregas encoladas por la entrega asíncrona de take_quiz."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from quizzes.cola_calificacion import (
+    MAX_INTENTOS, calificar_entrega, entregas_fallidas, reclamar_entregas, reencolar_fallidas,
+)
+
+
+class Command(BaseCommand):
+    help = "Califica en un pool de hilos las entregas pendientes de la cola (CALIFICACION_ASINCRONA)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hilos", type=int, default=4, help="Cantidad de hilos calificadores.")
+        parser.add_argument("--lote", type=int, default=50, help="Entregas reclamadas por ciclo.")
+        parser.add_argument(
+            "--intervalo", type=float, default=1.0,
+            help="Segundos de espera cuando la cola está vacía.",
+        )
+        parser.add_argument(
+            "--una-vez", action="store_true",
+            help="Vacía la cola disponible y termina, en lugar de quedarse esperando.",
+        )
+        parser.add_argument(
+            "--fallidas", action="store_true",
+            help=f"Lista las entregas que fallaron {MAX_INTENTOS} veces (ya no se reclaman) y termina.",
+        )
+        parser.add_argument(
+            "--reintentar", type=int, nargs="*", metavar="ENTREGA_ID",
+            help="Vuelve a encolar las entregas fallidas indicadas (todas si no se indica ninguna) antes de procesar.",
+        )
+
+    def handle(self, *args, **options):
+        if options["fallidas"]:
+            fallidas = entregas_fallidas().select_related("resultado")
+            for entrega in fallidas:
+                self.stdout.write(
+                    f"Entrega {entrega.pk} (resultado {entrega.resultado_id}, evaluación "
+                    f"{entrega.resultado.evaluacion_id}): {entrega.ultimo_error or 'sin error registrado'}"
+                )
+            self.stdout.write(f"Entregas fallidas: {len(fallidas)}")
+            return
+        if options["reintentar"] is not None:
+            reencoladas = reencolar_fallidas(options["reintentar"])
+            self.stdout.write(f"Entregas fallidas reencoladas: {reencoladas}")
+
+        hilos = max(1, options["hilos"])
+        lote = max(1, options["lote"])
+        calificadas = 0
+
+        self.stdout.write(f"Procesando entregas con {hilos} hilo(s)...")
+        with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="calificador") as pool:
+            try:
+                while True:
+                    ids = reclamar_entregas(lote)
+                    if not ids:
+                        if options["una_vez"]:
+                            break
+                        time.sleep(options["intervalo"])
+                        continue
+                    calificadas += sum(1 for ok in pool.map(calificar_entrega, ids) if ok)
+            except KeyboardInterrupt:
+                self.stdout.write("Deteniendo el worker...")
+
+        self.stdout.write(self.style.SUCCESS(f"Entregas calificadas: {calificadas}"))
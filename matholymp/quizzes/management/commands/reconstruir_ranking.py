@@ -0,0 +1,33 @@
+"""Recalcula desde los intentos la tabla EntradaRanking de las evaluaciones."""
+
+from django.core.management.base import BaseCommand
+
+from quizzes.models import Evaluacion
+from quizzes.ranking import reconstruir_ranking
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye el ranking materializado (mejor intento, posición y colegio de cada participante) "
+        "de todas las evaluaciones o de la indicada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--evaluation", type=int, help="ID de la evaluación a reconstruir.")
+
+    def handle(self, *args, **options):
+        evaluaciones = Evaluacion.objects.order_by("pk")
+        if options["evaluation"]:
+            evaluaciones = evaluaciones.filter(pk=options["evaluation"])
+
+        total_evaluaciones = 0
+        total_entradas = 0
+        for evaluacion in evaluaciones.iterator():
+            entradas = reconstruir_ranking(evaluacion)
+            total_evaluaciones += 1
+            total_entradas += entradas
+            self.stdout.write(f"{evaluacion.title}: {entradas} entradas.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo: {total_evaluaciones} evaluaciones reconstruidas, {total_entradas} entradas."
+        ))
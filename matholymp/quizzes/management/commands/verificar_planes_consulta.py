@@ -0,0 +1,85 @@
+"""
+Verifica con EXPLAIN, sobre la base de datos configurada y sus datos reales, que las consultas de
+las rutas críticas del examen y del monitoreo usen índices (ver quizzes/planes_consulta.py).
+
+Las pruebas de quizzes/tests.py hacen la misma verificación con datos propios en cada ejecución de
+`manage.py test`; este comando sirve para revisar los planes con el volumen de producción. En
+MySQL el optimizador puede preferir un recorrido completo en tablas casi vacías, así que conviene
+ejecutarlo sobre una base con datos (por ejemplo tras preparar_carga_locust).
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from quizzes.models import Evaluacion, ResultadoEvaluacion
+from quizzes.planes_consulta import SIN_CACHE, capturar_consultas, escenarios, plan_consulta, recorridos_completos
+
+
+class _Reversion(Exception):
+    """Revierte la transacción de la verificación"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta las vistas y tareas críticas del examen y del monitoreo, captura su SQL y verifica "
+        "con EXPLAIN que no recorran tablas completas. Los cambios se revierten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--evaluation", type=int, help="ID de la evaluación (por defecto la más reciente con intentos).")
+        parser.add_argument("--verbose-plan", action="store_true", help="Muestra el SQL y el plan de cada consulta.")
+
+    def handle(self, *args, **options):
+        evaluaciones = Evaluacion.objects.order_by('-pk')
+        if options["evaluation"]:
+            evaluacion = evaluaciones.filter(pk=options["evaluation"]).first()
+        else:
+            evaluacion = evaluaciones.filter(resultados__isnull=False).first() or evaluaciones.first()
+        if evaluacion is None:
+            raise CommandError("No hay evaluaciones para verificar.")
+        admin = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if admin is None:
+            raise CommandError("Se necesita un superusuario activo para llamar a las vistas de administración.")
+        intento = ResultadoEvaluacion.objects.filter(
+            evaluacion=evaluacion, participante__user__isnull=False
+        ).select_related('participante__user').order_by('completada', '-pk').first()
+        estudiante = intento.participante.user if intento else None
+        if estudiante is None:
+            self.stdout.write(self.style.WARNING(
+                "La evaluación no tiene intentos de participantes con usuario: se omiten las vistas del estudiante."
+            ))
+
+        self.fallos = 0
+        try:
+            with override_settings(CACHES=SIN_CACHE), transaction.atomic():
+                for nombre, funcion in escenarios(evaluacion, admin, estudiante, intento.participante_id if intento else 0):
+                    respuesta, consultas = capturar_consultas(funcion)
+                    self.verificar(nombre, respuesta, consultas, options["verbose_plan"])
+                raise _Reversion
+        except _Reversion:
+            pass
+
+        if self.fallos:
+            raise CommandError(f"{self.fallos} consulta(s) recorren tablas completas.")
+        self.stdout.write(self.style.SUCCESS("Todas las consultas críticas usan índices."))
+
+    def verificar(self, nombre, respuesta, consultas, verbose):
+        completos = []
+        for sql in consultas:
+            plan = plan_consulta(sql)
+            recorridos = recorridos_completos(sql, plan)
+            completos += recorridos
+            if verbose or recorridos:
+                self.stdout.write(f"    {sql}")
+                for paso in plan:
+                    self.stdout.write(f"        {paso}")
+        # Las vistas reportan su código de estado: una redirección o un error no recorre la ruta completa
+        if hasattr(respuesta, 'status_code'):
+            nombre = f"{nombre} [HTTP {respuesta.status_code}]"
+        if completos:
+            self.fallos += 1
+            self.stdout.write(self.style.ERROR(f"[FALLO] {nombre}: {'; '.join(completos)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"[OK] {nombre} ({len(consultas)} consultas)"))
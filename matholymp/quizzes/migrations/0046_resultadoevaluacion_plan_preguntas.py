@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0045_alter_evaluacion_preguntas_a_mostrar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultadoevaluacion',
+            name='plan_preguntas',
+            field=models.JSONField(blank=True, default=list, help_text='IDs de las preguntas asignadas al intento, en el orden en que se muestran'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0046_resultadoevaluacion_plan_preguntas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluacion',
+            name='version_roster',
+            field=models.PositiveIntegerField(default=0, help_text='Se incrementa cuando cambian los grupos, individuales o clasificados de la evaluación'),
+        ),
+    ]
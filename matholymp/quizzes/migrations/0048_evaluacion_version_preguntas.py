@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0047_evaluacion_version_roster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluacion',
+            name='version_preguntas',
+            field=models.PositiveIntegerField(default=0, help_text='Se incrementa cuando cambian las preguntas, opciones o puntos de la evaluación'),
+        ),
+    ]
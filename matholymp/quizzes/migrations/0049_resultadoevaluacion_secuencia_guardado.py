@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0048_evaluacion_version_preguntas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultadoevaluacion',
+            name='secuencia_guardado',
+            field=models.PositiveIntegerField(default=0, help_text='Último número de secuencia de guardado automático aplicado'),
+        ),
+    ]
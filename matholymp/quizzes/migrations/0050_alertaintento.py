@@ -0,0 +1,85 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+SEVERIDADES_VALIDAS = {'baja', 'media', 'alta'}
+
+
+def migrar_alertas_a_tabla(apps, schema_editor):
+    """Copia las alertas de la lista JSON de cada intento a la tabla AlertaIntento"""
+    ResultadoEvaluacion = apps.get_model('quizzes', 'ResultadoEvaluacion')
+    AlertaIntento = apps.get_model('quizzes', 'AlertaIntento')
+
+    lote = []
+    resultados = ResultadoEvaluacion.objects.values_list('id', 'alertas_detectadas')
+    for resultado_id, alertas in resultados.iterator(chunk_size=500):
+        for alerta in alertas or []:
+            if not isinstance(alerta, dict):
+                continue
+            timestamp = parse_datetime(str(alerta.get('timestamp') or '')) or timezone.now()
+            if timezone.is_naive(timestamp):
+                timestamp = timezone.make_aware(timestamp)
+            severidad = alerta.get('severidad')
+            lote.append(AlertaIntento(
+                resultado_id=resultado_id,
+                tipo=str(alerta.get('tipo') or 'desconocido')[:50],
+                descripcion=alerta.get('descripcion') or '',
+                severidad=severidad if severidad in SEVERIDADES_VALIDAS else 'baja',
+                timestamp=timestamp,
+            ))
+        if len(lote) >= 1000:
+            AlertaIntento.objects.bulk_create(lote)
+            lote = []
+    if lote:
+        AlertaIntento.objects.bulk_create(lote)
+
+
+def migrar_alertas_a_json(apps, schema_editor):
+    """Reconstruye la lista JSON de alertas de cada intento a partir de la tabla"""
+    ResultadoEvaluacion = apps.get_model('quizzes', 'ResultadoEvaluacion')
+    AlertaIntento = apps.get_model('quizzes', 'AlertaIntento')
+
+    alertas_por_resultado = {}
+    for alerta in AlertaIntento.objects.order_by('resultado_id', 'timestamp', 'id').iterator(chunk_size=1000):
+        alertas_por_resultado.setdefault(alerta.resultado_id, []).append({
+            'tipo': alerta.tipo,
+            'descripcion': alerta.descripcion,
+            'severidad': alerta.severidad,
+            'timestamp': alerta.timestamp.isoformat(),
+        })
+    for resultado_id, alertas in alertas_por_resultado.items():
+        ResultadoEvaluacion.objects.filter(pk=resultado_id).update(alertas_detectadas=alertas)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0049_resultadoevaluacion_secuencia_guardado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertaIntento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=50)),
+                ('descripcion', models.TextField(blank=True)),
+                ('severidad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta')], default='baja', max_length=10)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('resultado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='quizzes.resultadoevaluacion')),
+            ],
+            options={
+                'ordering': ['timestamp', 'id'],
+                'indexes': [models.Index(fields=['resultado', 'timestamp'], name='quizzes_ale_resulta_2e503d_idx')],
+            },
+        ),
+        migrations.RunPython(migrar_alertas_a_tabla, migrar_alertas_a_json),
+        migrations.RemoveField(
+            model_name='resultadoevaluacion',
+            name='alertas_detectadas',
+        ),
+    ]
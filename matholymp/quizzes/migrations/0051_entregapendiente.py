@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0050_alertaintento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultadoevaluacion',
+            name='calificacion_pendiente',
+            field=models.BooleanField(default=False, help_text='Entregada y en cola para que el worker la califique'),
+        ),
+        migrations.CreateModel(
+            name='EntregaPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('disponible_desde', models.DateTimeField(default=django.utils.timezone.now, help_text='La entrega puede reclamarse a partir de este momento')),
+                ('intentos', models.PositiveIntegerField(default=0, help_text='Veces que un worker reclamó la entrega')),
+                ('ultimo_error', models.TextField(blank=True)),
+                ('resultado', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='entrega_pendiente', to='quizzes.resultadoevaluacion')),
+            ],
+            options={
+                'ordering': ['disponible_desde', 'id'],
+                'indexes': [models.Index(fields=['disponible_desde'], name='quizzes_ent_disponi_940e77_idx')],
+            },
+        ),
+    ]
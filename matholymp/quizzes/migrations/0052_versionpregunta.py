@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0051_entregapendiente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionPregunta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash_contenido', models.CharField(max_length=64, unique=True)),
+                ('contenido', models.JSONField(help_text="{'text': ..., 'opciones': [{'id', 'text', 'is_correct'}]}")),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
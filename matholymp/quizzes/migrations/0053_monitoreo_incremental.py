@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0052_versionpregunta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intentosparticipante',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='resultadoevaluacion',
+            index=models.Index(fields=['evaluacion', 'ultima_actividad'], name='quizzes_res_evaluac_9e9dc7_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0053_monitoreo_incremental'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadoresMonitoreo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inscritos', models.PositiveIntegerField(default=0)),
+                ('iniciados', models.PositiveIntegerField(default=0, help_text='Participantes con al menos un intento')),
+                ('activos', models.PositiveIntegerField(default=0, help_text='Intentos en curso con actividad reciente')),
+                ('entregados', models.PositiveIntegerField(default=0, help_text='Participantes cuyo último intento está completado')),
+                ('finalizados_admin', models.PositiveIntegerField(default=0, help_text='Participantes cuyo último intento finalizó un administrador')),
+                ('total_alertas', models.PositiveIntegerField(default=0)),
+                ('version_roster', models.PositiveIntegerField(default=0, help_text='version_roster de la evaluación con la que se contaron los inscritos')),
+                ('fecha_barrido', models.DateTimeField(default=django.utils.timezone.now, help_text='Último recálculo de los participantes activos')),
+                ('evaluacion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='contadores_monitoreo', to='quizzes.evaluacion')),
+            ],
+            options={
+                'verbose_name': 'Contadores de Monitoreo',
+                'verbose_name_plural': 'Contadores de Monitoreo',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0054_contadoresmonitoreo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='resultadoevaluacion',
+            name='quizzes_res_evaluac_9e9dc7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['fecha_hora', 'accion'], name='quizzes_aud_fecha_h_30a39f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='intentosparticipante',
+            index=models.Index(fields=['evaluacion', 'participante'], name='quizzes_int_evaluac_9da19c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultadoevaluacion',
+            index=models.Index(fields=['evaluacion', 'participante', 'completada', 'numero_intento'], name='quizzes_res_evaluac_01afa3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultadoevaluacion',
+            index=models.Index(fields=['evaluacion', 'completada', '-puntos_obtenidos', 'tiempo_utilizado'], name='quizzes_res_evaluac_b51f7b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultadoevaluacion',
+            index=models.Index(fields=['evaluacion', 'completada', 'ultima_actividad'], name='quizzes_res_evaluac_413c6f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultadoevaluacion',
+            index=models.Index(fields=['ultima_actividad', 'completada'], name='quizzes_res_ultima__df85bc_idx'),
+        ),
+    ]
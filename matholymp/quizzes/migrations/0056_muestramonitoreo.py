@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0055_indices_rutas_criticas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MuestraMonitoreo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(help_text='Momento de la muestra (inicio del intervalo en las compactadas)')),
+                ('intervalo', models.PositiveIntegerField(help_text='Segundos que cubre la muestra (mayor en muestras compactadas)')),
+                ('activos', models.PositiveIntegerField(default=0, help_text='Máximo de participantes activos en el intervalo')),
+                ('entregados', models.PositiveIntegerField(default=0, help_text='Participantes con el último intento entregado')),
+                ('guardados', models.PositiveBigIntegerField(default=0, help_text='Guardados automáticos acumulados de la evaluación')),
+                ('alertas', models.PositiveIntegerField(default=0, help_text='Alertas acumuladas de la evaluación')),
+                ('evaluacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='muestras_monitoreo', to='quizzes.evaluacion')),
+            ],
+            options={
+                'verbose_name': 'Muestra de Monitoreo',
+                'verbose_name_plural': 'Muestras de Monitoreo',
+                'indexes': [models.Index(fields=['evaluacion', 'fecha'], name='quizzes_mue_evaluac_cf232d_idx'), models.Index(fields=['intervalo', 'fecha'], name='quizzes_mue_interva_1baf3d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0056_muestramonitoreo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RespuestaIntento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('es_correcta', models.BooleanField(default=False)),
+                ('puntos_pregunta', models.PositiveIntegerField(default=1)),
+                ('puntos_ganados', models.PositiveIntegerField(default=0)),
+                ('evaluacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='respuestas_intentos', to='quizzes.evaluacion')),
+                ('opcion', models.ForeignKey(blank=True, help_text='Opción elegida; vacía si la pregunta quedó sin responder', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='respuestas_intentos', to='quizzes.opcion')),
+                ('pregunta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='respuestas_intentos', to='quizzes.pregunta')),
+                ('resultado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='respuestas', to='quizzes.resultadoevaluacion')),
+            ],
+            options={
+                'verbose_name': 'Respuesta de Intento',
+                'verbose_name_plural': 'Respuestas de Intentos',
+                'indexes': [models.Index(fields=['evaluacion', 'pregunta'], name='quizzes_res_evaluac_0a4e55_idx')],
+                'constraints': [models.UniqueConstraint(fields=('resultado', 'pregunta'), name='unique_respuesta_por_pregunta')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0057_respuestaintento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluacion',
+            name='version_resultados',
+            field=models.PositiveIntegerField(default=0, help_text='Se incrementa cuando se inicia, entrega, finaliza o elimina un intento de la evaluación'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0058_evaluacion_version_resultados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntradaRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puntos_obtenidos', models.DecimalField(decimal_places=3, default=0, max_digits=5)),
+                ('tiempo_utilizado', models.PositiveIntegerField(default=0, help_text='Tiempo utilizado en segundos')),
+                ('posicion', models.PositiveIntegerField()),
+                ('colegio_nombre', models.CharField(blank=True, help_text='Colegio del representante del grupo del participante', max_length=200)),
+                ('evaluacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entradas_ranking', to='quizzes.evaluacion')),
+                ('participante', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='entradas_ranking', to='quizzes.participantes')),
+                ('resultado', models.OneToOneField(db_constraint=False, help_text='Mejor intento completado del participante', on_delete=django.db.models.deletion.DO_NOTHING, related_name='entrada_ranking', to='quizzes.resultadoevaluacion')),
+            ],
+            options={
+                'verbose_name': 'Entrada de Ranking',
+                'verbose_name_plural': 'Entradas de Ranking',
+                'ordering': ['posicion'],
+                'indexes': [models.Index(fields=['evaluacion', 'posicion'], name='quizzes_ent_evaluac_953806_idx'), models.Index(fields=['evaluacion', '-puntos_obtenidos', 'tiempo_utilizado', 'resultado'], name='quizzes_ent_evaluac_1b1ba2_idx')],
+                'constraints': [models.UniqueConstraint(fields=('evaluacion', 'participante'), name='unique_entrada_ranking_participante')],
+            },
+        ),
+    ]
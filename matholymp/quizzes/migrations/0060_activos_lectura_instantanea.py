@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0059_entradaranking'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='muestramonitoreo',
+            name='activos',
+            field=models.PositiveIntegerField(default=0, help_text='Participantes activos al tomar la muestra (mayor lectura del intervalo en las compactadas)'),
+        ),
+    ]
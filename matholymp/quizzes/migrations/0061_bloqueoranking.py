@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0060_activos_lectura_instantanea'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BloqueoRanking',
+            fields=[
+                ('evaluacion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='bloqueo_ranking', serialize=False, to='quizzes.evaluacion')),
+            ],
+            options={
+                'verbose_name': 'Bloqueo de Ranking',
+                'verbose_name_plural': 'Bloqueos de Ranking',
+            },
+        ),
+    ]
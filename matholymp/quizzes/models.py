@@ -6,6 +6,8 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 import re
 import os
+import hashlib
+import json
 from datetime import datetime
 
 
@@ -342,10 +344,15 @@ class IntentosParticipante(models.Model):
     # Campos de auditoría
     creado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, help_text='Admin que asignó los intentos')
     fecha_asignacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
     motivo = models.TextField(blank=True, help_text='Motivo por el cual se asignaron intentos adicionales')
     
     class Meta:
         unique_together = ['participante', 'evaluacion']
+        indexes = [
+            # Configuraciones de los participantes de una evaluación (monitoreo)
+            models.Index(fields=['evaluacion', 'participante']),
+        ]
         verbose_name = 'Configuración de Intentos'
         verbose_name_plural = 'Configuraciones de Intentos'
     
@@ -508,6 +515,13 @@ class Evaluacion(models.Model):
     # Campos para participantes de la etapa 1
     grupos_participantes = models.ManyToManyField('GrupoParticipantes', blank=True, related_name='evaluaciones_etapa1')
     participantes_individuales = models.ManyToManyField('Participantes', blank=True, related_name='evaluaciones_individuales')
+    
+    # Versión de la lista de autorizados; invalida la caché de is_participante_autorizado
+    version_roster = models.PositiveIntegerField(default=0, help_text='Se incrementa cuando cambian los grupos, individuales o clasificados de la evaluación')
+    # Versión del banco de preguntas; invalida la caché de la clave de respuestas
+    version_preguntas = models.PositiveIntegerField(default=0, help_text='Se incrementa cuando cambian las preguntas, opciones o puntos de la evaluación')
+    # Versión de los intentos; invalida la caché de las estadísticas de resultados
+    version_resultados = models.PositiveIntegerField(default=0, help_text='Se incrementa cuando se inicia, entrega, finaliza o elimina un intento de la evaluación')
 
     def __str__(self):
         return f"{self.title} - Etapa {self.etapa}"
@@ -582,31 +596,13 @@ class Evaluacion(models.Model):
         if self.etapa != 2:
             return []
         
-        # Buscar la evaluación de la etapa 1
-        evaluacion_etapa1 = Evaluacion.objects.filter(etapa=1, anio=self.anio).first()
+        evaluacion_etapa1, top_n = self.get_origen_clasificacion()
         if not evaluacion_etapa1:
             return []
-        
-        # Determinar cuántos pasan desde etapa 1
-        num_etapas = self.concurso.num_etapas if self.concurso else 3
-        top_n = 15 if num_etapas == 3 else 5
 
-        # Obtener los mejores resultados ordenados por nota (descendente) y tiempo en segundos (ascendente)
-        resultados = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion_etapa1,
-            completada=True
-        ).order_by('-puntos_obtenidos', 'tiempo_utilizado').select_related('participante')
-        
-        participantes = []
-        vistos = set()
-        for r in resultados:
-            if r.participante_id not in vistos:
-                vistos.add(r.participante_id)
-                participantes.append(r.participante)
-                if len(participantes) == top_n:
-                    break
-        
-        return participantes
+        # Mejor intento de cada participante y top N resueltos en la base de datos (ver ranking.py)
+        from .ranking import mejores_participantes
+        return mejores_participantes(evaluacion_etapa1, top_n)
     
     def has_students_taking_exam(self):
         """Verifica si hay estudiantes que están actualmente rindiendo la evaluación"""
@@ -653,31 +649,12 @@ class Evaluacion(models.Model):
         if self.etapa != 3:
             return []
         
-        num_etapas = self.concurso.num_etapas if self.concurso else 3
-        
-        if num_etapas == 3:
-            evaluacion_etapa = Evaluacion.objects.filter(etapa=2, anio=self.anio).first()
-        else:
-            evaluacion_etapa = Evaluacion.objects.filter(etapa=1, anio=self.anio).first()
-            
+        evaluacion_etapa, _ = self.get_origen_clasificacion()
         if not evaluacion_etapa:
             return []
         
-        resultados = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion_etapa,
-            completada=True
-        ).order_by('-puntos_obtenidos', 'tiempo_utilizado').select_related('participante')
-        
-        participantes = []
-        vistos = set()
-        for r in resultados:
-            if r.participante_id not in vistos:
-                vistos.add(r.participante_id)
-                participantes.append(r.participante)
-                if len(participantes) == 5:
-                    break
-        
-        return participantes
+        from .ranking import mejores_participantes
+        return mejores_participantes(evaluacion_etapa, 5)
     
     def get_participantes_autorizados(self):
         """Obtiene los participantes autorizados según la etapa"""
@@ -695,30 +672,110 @@ class Evaluacion(models.Model):
                 return self.get_participantes_etapa3()
         return []
     
+    def get_origen_clasificacion(self):
+        """
+        Retorna la evaluación de la que clasifican los participantes de esta etapa
+        y cuántos clasifican: (evaluacion_origen, top_n). Para la etapa 1 retorna (None, 0).
+        """
+        num_etapas = self.concurso.num_etapas if self.concurso else 3
+        if self.etapa == 2:
+            # Pasan 15 si hay 3 etapas, 5 si hay 2
+            top_n = 15 if num_etapas == 3 else 5
+            return Evaluacion.objects.filter(etapa=1, anio=self.anio).first(), top_n
+        if self.etapa == 3:
+            etapa_origen = 2 if num_etapas == 3 else 1
+            return Evaluacion.objects.filter(etapa=etapa_origen, anio=self.anio).first(), 5
+        return None, 0
+
+    def get_ids_clasificados(self):
+        """Obtiene los IDs de los clasificados automáticos de la etapa anterior sin cargar los participantes"""
+        evaluacion_origen, top_n = self.get_origen_clasificacion()
+        if not evaluacion_origen:
+            return set()
+        
+        from .ranking import ids_mejores_participantes
+        return set(ids_mejores_participantes(evaluacion_origen, top_n))
+
+    def is_participante_autorizado(self, participante_id):
+        """
+        Verifica si un participante puede rendir la evaluación sin cargar la lista completa.
+        El resultado se cachea por versión de la lista de autorizados (version_roster).
+        """
+        from django.core.cache import cache
+        
+        cache_key = f'evaluacion_{self.pk}_roster_v{self.version_roster}_participante_{participante_id}'
+        autorizado = cache.get(cache_key)
+        if autorizado is None:
+            autorizado = self._consultar_participante_autorizado(participante_id)
+            cache.set(cache_key, autorizado, 300)
+        return autorizado
+
+    def _consultar_participante_autorizado(self, participante_id):
+        """Resuelve la autorización con consultas EXISTS según la etapa"""
+        if self.etapa == 1:
+            return Participantes.objects.filter(pk=participante_id).filter(
+                models.Q(evaluaciones_individuales=self) | models.Q(grupos__evaluaciones_etapa1=self)
+            ).exists()
+        if self.etapa in (2, 3):
+            if self.participantes_individuales.exists():
+                return self.participantes_individuales.filter(pk=participante_id).exists()
+            return participante_id in self.get_ids_clasificados()
+        return False
+
+    @classmethod
+    def invalidar_roster(cls, **filtros):
+        """Incrementa version_roster de las evaluaciones filtradas para invalidar la caché de autorizados"""
+        cls.objects.filter(**filtros).update(version_roster=models.F('version_roster') + 1)
+
+    @classmethod
+    def invalidar_clave_respuestas(cls, evaluacion_id):
+        """Incrementa version_preguntas para invalidar la caché de la clave de respuestas"""
+        cls.objects.filter(pk=evaluacion_id).update(version_preguntas=models.F('version_preguntas') + 1)
+
+    @classmethod
+    def invalidar_resultados(cls, evaluacion_id):
+        """
+        Incrementa version_resultados para invalidar la caché de las estadísticas de resultados.
+        Solo las evaluaciones cerradas tienen estadísticas en caché: mientras el examen está abierto
+        no se escribe en la fila de la evaluación en cada inicio o entrega.
+        """
+        if cls.objects.filter(pk=evaluacion_id, end_time__lt=timezone.now()).exists():
+            cls.objects.filter(pk=evaluacion_id).update(version_resultados=models.F('version_resultados') + 1)
+
     def get_preguntas_aleatorias(self):
         """Obtiene preguntas aleatorias segmentadas por Unidades Temáticas"""
         return self.get_preguntas_para_estudiante(participante_id=0, numero_intento=1)
     
     def get_preguntas_para_estudiante(self, participante_id, numero_intento=1):
         """Obtiene preguntas segmentadas por Unidades Temáticas con fallback de seguridad para un estudiante e intento específico"""
+        plan = self.calcular_plan_preguntas(participante_id, numero_intento)
+        return self.cargar_preguntas_plan(plan)
+
+    def calcular_plan_preguntas(self, participante_id, numero_intento=1):
+        """
+        Calcula la lista ordenada de IDs de preguntas para un estudiante e intento.
+        Trabaja solo con IDs (una consulta para el banco y otra para las cuotas) y usa un
+        generador aleatorio local para no alterar el estado global del módulo random.
+        """
         import hashlib, random
         
-        total_preguntas = self.preguntas.count()
+        banco = list(self.preguntas.order_by('id').values_list('id', 'categoria__unidad_id'))
+        total_preguntas = len(banco)
         if total_preguntas == 0:
             return []
             
-        cuotas = list(self.cuotas_unidades.select_related('unidad').all())
+        cuotas = list(self.cuotas_unidades.all())
         total_requerido = sum(c.cantidad_preguntas for c in cuotas)
         if total_requerido <= 0:
             total_requerido = self.preguntas_a_mostrar or 10
             
         if total_preguntas <= total_requerido:
-            return list(self.preguntas.prefetch_related('opciones', 'categoria').order_by('id'))
+            return [pregunta_id for pregunta_id, _ in banco]
             
         hash_base = f"{self.id}_{participante_id}_{numero_intento}"
         hash_participante = hashlib.md5(hash_base.encode()).hexdigest()
         seed = int(hash_participante[:8], 16)
-        random.seed(seed)
+        generador = random.Random(seed)
         
         seleccionadas = []
         ids_seleccionados = set()
@@ -727,33 +784,35 @@ class Evaluacion(models.Model):
         for cuota in cuotas:
             if cuota.cantidad_preguntas <= 0:
                 continue
-            pool = list(
-                self.preguntas.filter(categoria__unidad=cuota.unidad)
-                .exclude(id__in=ids_seleccionados)
-                .prefetch_related('opciones', 'categoria')
-                .order_by('id')
-            )
+            pool = [
+                pregunta_id for pregunta_id, unidad_id in banco
+                if unidad_id == cuota.unidad_id and pregunta_id not in ids_seleccionados
+            ]
             n = min(cuota.cantidad_preguntas, len(pool))
             if n > 0:
-                elegidas = random.sample(pool, n)
+                elegidas = generador.sample(pool, n)
                 seleccionadas.extend(elegidas)
-                ids_seleccionados.update(p.id for p in elegidas)
+                ids_seleccionados.update(elegidas)
                 
         # 2. Fallback de Seguridad: Si alguna unidad no tenía suficiente stock, completar con preguntas restantes
         if len(seleccionadas) < total_requerido:
             faltantes = total_requerido - len(seleccionadas)
-            pool_restante = list(
-                self.preguntas.exclude(id__in=ids_seleccionados)
-                .prefetch_related('opciones', 'categoria')
-                .order_by('id')
-            )
+            pool_restante = [pregunta_id for pregunta_id, _ in banco if pregunta_id not in ids_seleccionados]
             if pool_restante:
                 n_extra = min(faltantes, len(pool_restante))
-                extra = random.sample(pool_restante, n_extra)
+                extra = generador.sample(pool_restante, n_extra)
                 seleccionadas.extend(extra)
                 
-        random.shuffle(seleccionadas)
+        generador.shuffle(seleccionadas)
         return seleccionadas
+
+    def cargar_preguntas_plan(self, plan):
+        """Carga en una sola consulta las preguntas de un plan, respetando el orden del plan"""
+        if not plan:
+            return []
+        preguntas = self.preguntas.filter(id__in=plan).select_related('categoria').prefetch_related('opciones')
+        por_id = {pregunta.id: pregunta for pregunta in preguntas}
+        return [por_id[pregunta_id] for pregunta_id in plan if pregunta_id in por_id]
     
     def clean(self):
         """Validación personalizada del modelo"""
@@ -884,6 +943,7 @@ class ResultadoEvaluacion(models.Model):
     respuestas_guardadas = models.JSONField(default=dict, blank=True, help_text='Respuestas guardadas automáticamente')
     tiempo_restante = models.PositiveIntegerField(help_text='Tiempo restante en segundos', default=0)
     ultima_actividad = models.DateTimeField(auto_now=True, help_text='Última actividad del estudiante')
+    secuencia_guardado = models.PositiveIntegerField(default=0, help_text='Último número de secuencia de guardado automático aplicado')
     
     # Campos para puntaje numérico
     puntos_obtenidos = models.DecimalField(max_digits=5, decimal_places=3, default=0, help_text='Puntos obtenidos por el estudiante (ponderado sobre 10)')
@@ -893,8 +953,11 @@ class ResultadoEvaluacion(models.Model):
     numero_intento = models.PositiveIntegerField(default=1, help_text='Número del intento del participante')
     
     # Campo para control de cambios de pestaña y alertas anti-fraude
+    # Plan de preguntas congelado al iniciar el intento (IDs en el orden mostrado)
+    plan_preguntas = models.JSONField(default=list, blank=True, help_text='IDs de las preguntas asignadas al intento, en el orden en que se muestran')
+    
     cambios_pestana = models.PositiveIntegerField(default=0, help_text='Número de cambios de pestaña durante la evaluación')
-    alertas_detectadas = models.JSONField(default=list, blank=True, help_text='Lista de alertas detectadas durante la prueba')
+    calificacion_pendiente = models.BooleanField(default=False, help_text='Entregada y en cola para que el worker la califique')
     
     # Control administrativo
     finalizado_por_admin = models.ForeignKey(
@@ -911,6 +974,46 @@ class ResultadoEvaluacion(models.Model):
     class Meta:
         unique_together = ['evaluacion', 'participante', 'numero_intento']
         ordering = ['-puntos_obtenidos', 'tiempo_utilizado']
+        indexes = [
+            # Intento activo o último intento (completado, finalizado por admin) de un participante
+            models.Index(fields=['evaluacion', 'participante', 'completada', 'numero_intento']),
+            # Rankings y clasificados: completados por nota descendente y tiempo ascendente
+            models.Index(fields=['evaluacion', 'completada', '-puntos_obtenidos', 'tiempo_utilizado']),
+            # Participantes activos de una evaluación (contadores y monitoreo)
+            models.Index(fields=['evaluacion', 'completada', 'ultima_actividad']),
+            # Barrido de contadores: actividad reciente en todas las evaluaciones (rango primero)
+            models.Index(fields=['ultima_actividad', 'completada']),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado leído de la base de datos; los contadores del monitoreo se ajustan según sus transiciones
+        if 'completada' in field_names and 'finalizado_por_admin_id' in field_names:
+            # ultima_actividad queda en None si se difirió (.only): el cierre se cuenta como activo
+            instance._estado_contadores = (
+                instance.completada, instance.finalizado_por_admin_id, instance.__dict__.get('ultima_actividad')
+            )
+        return instance
+    
+    @classmethod
+    def calificados(cls, **filtros):
+        """
+        Intentos completados con puntaje definitivo. Con la calificación asíncrona una entrega queda
+        completada con puntos_obtenidos=0 hasta que el worker la califica; rankings, clasificados,
+        estadísticas y exportaciones solo deben considerar los intentos ya calificados.
+        """
+        return cls.objects.filter(completada=True, calificacion_pendiente=False, **filtros)
+    
+    @property
+    def esta_calificado(self):
+        return self.completada and not self.calificacion_pendiente
+    
+    def get_estado_exportacion(self):
+        """Estado del intento para las hojas de resultados detallados"""
+        if self.calificacion_pendiente:
+            return "Calificación pendiente"
+        return "Completado" if self.completada else "En progreso"
     
     def get_tiempo_formateado(self):
         """Retorna el tiempo utilizado en formato legible"""
@@ -932,12 +1035,17 @@ class ResultadoEvaluacion(models.Model):
         return f"{self.participante.NombresCompletos} - {self.evaluacion.title} ({self.puntos_obtenidos:.3f}/{self.puntos_totales})"
     
     def get_posicion_ranking(self):
-        """Obtiene la posición en el ranking de la evaluación"""
-        resultados = self.evaluacion.resultados.filter(completada=True).order_by('-puntos_obtenidos', 'tiempo_utilizado')
-        for i, resultado in enumerate(resultados, 1):
-            if resultado == self:
-                return i
-        return None
+        """Obtiene la posición del participante en el ranking de la evaluación (por su mejor intento)"""
+        if not self.completada:
+            return None
+        from .ranking import posicion_participante
+        return posicion_participante(self.evaluacion, self.participante_id)
+    
+    def get_puntaje_porcentaje(self):
+        """Retorna el puntaje como porcentaje del puntaje total (ej: 85.0)"""
+        if not self.puntos_totales:
+            return 0.0
+        return float(self.puntos_obtenidos) / self.puntos_totales * 100
     
     def get_puntaje_numerico(self):
         """Retorna el puntaje ponderado en formato numérico (ej: 8.500/10)"""
@@ -946,10 +1054,9 @@ class ResultadoEvaluacion(models.Model):
     @classmethod
     def get_mejor_resultado(cls, evaluacion, participante):
         """Obtiene el mejor resultado de un participante en una evaluación específica"""
-        return cls.objects.filter(
+        return cls.calificados(
             evaluacion=evaluacion,
-            participante=participante,
-            completada=True
+            participante=participante
         ).order_by('-puntos_obtenidos', 'tiempo_utilizado').first()
     
     @classmethod
@@ -962,28 +1069,91 @@ class ResultadoEvaluacion(models.Model):
         
         return (ultimo_resultado.numero_intento + 1) if ultimo_resultado else 1
 
+    def get_plan_ids(self):
+        """
+        Retorna los IDs del plan de preguntas congelado al iniciar el intento.
+        Los intentos anteriores al plan lo calculan una sola vez y lo persisten.
+        """
+        if not self.plan_preguntas:
+            plan = self.evaluacion.calcular_plan_preguntas(self.participante_id, self.numero_intento)
+            self.plan_preguntas = plan
+            if self.pk and plan:
+                # update() evita tocar ultima_actividad y las señales de auditoría
+                ResultadoEvaluacion.objects.filter(pk=self.pk).update(plan_preguntas=plan)
+        return self.plan_preguntas
+
+    def get_preguntas_plan(self):
+        """Retorna las preguntas del intento según el plan congelado al iniciarlo"""
+        return self.evaluacion.cargar_preguntas_plan(self.get_plan_ids())
+
     def get_snapshot_respuestas(self):
         """Retorna la lista de preguntas congeladas si el examen está completado y tiene snapshot"""
         if self.completada and isinstance(self.respuestas_guardadas, dict):
-            return self.respuestas_guardadas.get('preguntas_snapshot')
+            preguntas_snapshot = self.respuestas_guardadas.get('preguntas_snapshot')
+            if preguntas_snapshot:
+                from .calificacion_utils import expandir_snapshot
+                return expandir_snapshot(preguntas_snapshot)
+            return preguntas_snapshot
         return None
 
+    def aplicar_respuestas_delta(self, cambios, secuencia=None, tiempo_restante=None, max_reintentos=3):
+        """
+        Aplica solo las respuestas modificadas mediante un UPDATE condicional sobre la fila del intento activo.
+        secuencia_guardado actúa como control optimista: se rechazan secuencias antiguas y, si otra
+        petición escribió entre la lectura y la escritura, se vuelve a leer y se reintenta.
+        Retorna (aplicado, secuencia_actual).
+        """
+        respuestas_actuales = self.respuestas_guardadas
+        secuencia_actual = self.secuencia_guardado
+        for _ in range(max_reintentos):
+            if secuencia is not None and secuencia <= secuencia_actual:
+                return False, secuencia_actual
+            nueva_secuencia = secuencia if secuencia is not None else secuencia_actual + 1
+            
+            respuestas = dict(respuestas_actuales or {})
+            respuestas.update(cambios)
+            campos = {
+                'respuestas_guardadas': respuestas,
+                'secuencia_guardado': nueva_secuencia,
+                'ultima_actividad': timezone.now(),
+            }
+            if tiempo_restante is not None:
+                campos['tiempo_restante'] = tiempo_restante
+            
+            actualizadas = ResultadoEvaluacion.objects.filter(
+                pk=self.pk, completada=False, secuencia_guardado=secuencia_actual
+            ).update(**campos)
+            if actualizadas:
+                for campo, valor in campos.items():
+                    setattr(self, campo, valor)
+                return True, nueva_secuencia
+            
+            # Otra petición ganó la carrera o el intento se completó: releer el estado actual
+            fila = ResultadoEvaluacion.objects.filter(pk=self.pk, completada=False).values(
+                'respuestas_guardadas', 'secuencia_guardado'
+            ).first()
+            if fila is None:
+                return False, secuencia_actual
+            respuestas_actuales = fila['respuestas_guardadas']
+            secuencia_actual = fila['secuencia_guardado']
+        return False, secuencia_actual
+
     def agregar_alerta(self, tipo_alerta, descripcion, severidad='baja'):
         """Agrega una nueva alerta de auditoría al resultado del examen"""
-        alerta = {
-            'tipo': tipo_alerta,
-            'descripcion': descripcion,
-            'severidad': severidad,
-            'timestamp': timezone.now().isoformat()
-        }
-        if self.alertas_detectadas is None:
-            self.alertas_detectadas = []
-        self.alertas_detectadas.append(alerta)
-        # Una acción administrativa no representa actividad del estudiante.
-        self.save(update_fields=['alertas_detectadas'])
+        # Inserción de una fila: no reescribe el intento ni toca su última actividad
+        return AlertaIntento.objects.create(
+            resultado=self,
+            tipo=tipo_alerta,
+            descripcion=descripcion,
+            severidad=severidad
+        )
 
     def finalizar_por_admin(self, admin_user, motivo):
         """Finaliza la evaluación por decisión administrativa"""
+        from . import diario_respuestas
+        if not self.completada and diario_respuestas.write_behind_activo():
+            # save() escribe todos los campos: las respuestas en el diario se vacían antes
+            diario_respuestas.diario.vaciar_antes_de_cerrar([self])
         with transaction.atomic():
             self.puntos_obtenidos = 0
             self.puntos_totales = 10
@@ -993,12 +1163,17 @@ class ResultadoEvaluacion(models.Model):
             self.finalizado_por_admin = admin_user
             self.motivo_finalizacion = motivo
             self.fecha_finalizacion_admin = timezone.now()
+            # Una entrega en cola de calificación no debe sobrescribir el 0/10 administrativo
+            self.calificacion_pendiente = False
+            EntregaPendiente.objects.filter(resultado=self).delete()
             self.agregar_alerta(
                 'finalizado_por_admin',
                 f'Evaluación finalizada administrativamente por {admin_user.username}. Motivo: {motivo}',
                 severidad='alta'
             )
             self.save()
+        from .estado_intento import invalidar_estado_intento
+        invalidar_estado_intento(self.evaluacion_id, self.participante.user_id)
 
     def esta_activo(self):
         """Verifica si el estudiante ha registrado actividad reciente (últimos 5 minutos)"""
@@ -1016,6 +1191,255 @@ class ResultadoEvaluacion(models.Model):
             return 'success'
         return 'warning'
 
+
+class AlertaIntento(models.Model):
+    """Alerta de auditoría registrada durante un intento (cambio de pestaña, pérdida de foco, etc.)"""
+    SEVERIDADES = [
+        ('baja', 'Baja'),
+        ('media', 'Media'),
+        ('alta', 'Alta'),
+    ]
+
+    resultado = models.ForeignKey(ResultadoEvaluacion, on_delete=models.CASCADE, related_name='alertas')
+    tipo = models.CharField(max_length=50)
+    descripcion = models.TextField(blank=True)
+    severidad = models.CharField(max_length=10, choices=SEVERIDADES, default='baja')
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['timestamp', 'id']
+        indexes = [
+            models.Index(fields=['resultado', 'timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.resultado_id} - {self.tipo} ({self.severidad})"
+
+    def como_dict(self):
+        """Representación JSON usada por el panel de monitoreo"""
+        return {
+            'tipo': self.tipo,
+            'descripcion': self.descripcion,
+            'severidad': self.severidad,
+            'timestamp': self.timestamp.isoformat(),
+        }
+
+    @classmethod
+    def registrar_lote(cls, alertas):
+        """Inserta varias alertas en una sola consulta. Recibe instancias sin guardar."""
+        return cls.objects.bulk_create(alertas, batch_size=500)
+
+
+class RespuestaIntento(models.Model):
+    """
+    Respuesta a una pregunta de un intento entregado, normalizada desde su snapshot congelado.
+    Permite calcular estadísticas por pregunta, categoría o grupo con GROUP BY en la base de datos
+    sin leer el JSON de respuestas_guardadas. Las filas se registran al finalizar el intento.
+    """
+    resultado = models.ForeignKey(ResultadoEvaluacion, on_delete=models.CASCADE, related_name='respuestas')
+    evaluacion = models.ForeignKey(Evaluacion, on_delete=models.CASCADE, related_name='respuestas_intentos')
+    pregunta = models.ForeignKey(Pregunta, on_delete=models.CASCADE, related_name='respuestas_intentos')
+    opcion = models.ForeignKey(
+        Opcion, on_delete=models.SET_NULL, null=True, blank=True, related_name='respuestas_intentos',
+        help_text='Opción elegida; vacía si la pregunta quedó sin responder'
+    )
+    es_correcta = models.BooleanField(default=False)
+    puntos_pregunta = models.PositiveIntegerField(default=1)
+    puntos_ganados = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Respuesta de Intento'
+        verbose_name_plural = 'Respuestas de Intentos'
+        constraints = [
+            models.UniqueConstraint(fields=['resultado', 'pregunta'], name='unique_respuesta_por_pregunta'),
+        ]
+        indexes = [
+            models.Index(fields=['evaluacion', 'pregunta']),
+        ]
+
+    def __str__(self):
+        return f"{self.resultado_id} - Pregunta {self.pregunta_id}"
+
+
+class EntradaRanking(models.Model):
+    """
+    Posición de un participante en el ranking de una evaluación según su mejor intento completado.
+    Se mantiene de forma incremental al entregar, finalizar o eliminar intentos (ver ranking.py);
+    las páginas de ranking, el PDF y la clasificación a la etapa siguiente la leen por posición.
+    """
+    evaluacion = models.ForeignKey(Evaluacion, on_delete=models.CASCADE, related_name='entradas_ranking')
+    # Sin cascada: al eliminar intentos (o al participante con sus intentos) la entrada se mueve o se
+    # quita desde post_delete de ResultadoEvaluacion, cerrando el hueco de su posición
+    participante = models.ForeignKey(
+        Participantes, on_delete=models.DO_NOTHING, db_constraint=False, related_name='entradas_ranking'
+    )
+    resultado = models.OneToOneField(
+        ResultadoEvaluacion, on_delete=models.DO_NOTHING, db_constraint=False, related_name='entrada_ranking',
+        help_text='Mejor intento completado del participante'
+    )
+    puntos_obtenidos = models.DecimalField(max_digits=5, decimal_places=3, default=0)
+    tiempo_utilizado = models.PositiveIntegerField(default=0, help_text='Tiempo utilizado en segundos')
+    posicion = models.PositiveIntegerField()
+    colegio_nombre = models.CharField(max_length=200, blank=True, help_text='Colegio del representante del grupo del participante')
+
+    class Meta:
+        verbose_name = 'Entrada de Ranking'
+        verbose_name_plural = 'Entradas de Ranking'
+        ordering = ['posicion']
+        constraints = [
+            models.UniqueConstraint(fields=['evaluacion', 'participante'], name='unique_entrada_ranking_participante'),
+        ]
+        indexes = [
+            # Páginas del ranking y clasificados por rango de posiciones
+            models.Index(fields=['evaluacion', 'posicion']),
+            # Posición de un mejor intento nuevo: cuántas entradas quedan por delante
+            models.Index(fields=['evaluacion', '-puntos_obtenidos', 'tiempo_utilizado', 'resultado']),
+        ]
+
+    def __str__(self):
+        return f"{self.posicion}. {self.participante_id} - Evaluación {self.evaluacion_id}"
+
+
+class BloqueoRanking(models.Model):
+    """
+    Fila de bloqueo del ranking materializado de una evaluación. Las actualizaciones del ranking se
+    serializan bloqueando esta fila y no la de Evaluacion, que editan los administradores.
+    """
+    evaluacion = models.OneToOneField(
+        Evaluacion, on_delete=models.CASCADE, primary_key=True, related_name='bloqueo_ranking'
+    )
+
+    class Meta:
+        verbose_name = 'Bloqueo de Ranking'
+        verbose_name_plural = 'Bloqueos de Ranking'
+
+    def __str__(self):
+        return f"Bloqueo del ranking de la evaluación {self.evaluacion_id}"
+
+
+class VersionPregunta(models.Model):
+    """
+    Versión inmutable del contenido de una pregunta (texto y opciones) identificada por su hash.
+    Los snapshots de los intentos entregados referencian estas versiones en lugar de copiar los textos.
+    """
+    hash_contenido = models.CharField(max_length=64, unique=True)
+    contenido = models.JSONField(help_text="{'text': ..., 'opciones': [{'id', 'text', 'is_correct'}]}")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.hash_contenido[:12]
+
+    @staticmethod
+    def calcular_hash(contenido):
+        """Hash SHA-256 de la serialización canónica del contenido"""
+        serializado = json.dumps(contenido, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def registrar(cls, contenidos):
+        """
+        Registra los contenidos que aún no existen, en una sola inserción.
+        Recibe {hash: contenido}; las versiones existentes nunca se modifican.
+        """
+        if contenidos:
+            cls.objects.bulk_create(
+                [cls(hash_contenido=h, contenido=c) for h, c in contenidos.items()],
+                ignore_conflicts=True,
+                batch_size=500
+            )
+
+    @classmethod
+    def obtener_contenidos(cls, hashes):
+        """Retorna {hash: contenido} para los hashes indicados"""
+        return dict(cls.objects.filter(hash_contenido__in=set(hashes)).values_list('hash_contenido', 'contenido'))
+
+
+class EntregaPendiente(models.Model):
+    """Entrega aceptada que espera calificación y snapshot en el worker (cola respaldada en la base de datos)"""
+    resultado = models.OneToOneField(ResultadoEvaluacion, on_delete=models.CASCADE, related_name='entrega_pendiente')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    disponible_desde = models.DateTimeField(default=timezone.now, help_text='La entrega puede reclamarse a partir de este momento')
+    intentos = models.PositiveIntegerField(default=0, help_text='Veces que un worker reclamó la entrega')
+    ultimo_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['disponible_desde', 'id']
+        indexes = [
+            models.Index(fields=['disponible_desde']),
+        ]
+
+    def __str__(self):
+        return f"Entrega del resultado {self.resultado_id} (intentos: {self.intentos})"
+
+
+class ContadoresMonitoreo(models.Model):
+    """
+    Totales del monitoreo de una evaluación, según el último intento de cada participante.
+    Se ajustan en la misma transacción que inicia, entrega o finaliza un intento; 'activos'
+    depende del paso del tiempo y se recalcula periódicamente desde la última actividad.
+    """
+    evaluacion = models.OneToOneField(Evaluacion, on_delete=models.CASCADE, related_name='contadores_monitoreo')
+    inscritos = models.PositiveIntegerField(default=0)
+    iniciados = models.PositiveIntegerField(default=0, help_text='Participantes con al menos un intento')
+    activos = models.PositiveIntegerField(default=0, help_text='Intentos en curso con actividad reciente')
+    entregados = models.PositiveIntegerField(default=0, help_text='Participantes cuyo último intento está completado')
+    finalizados_admin = models.PositiveIntegerField(default=0, help_text='Participantes cuyo último intento finalizó un administrador')
+    total_alertas = models.PositiveIntegerField(default=0)
+    version_roster = models.PositiveIntegerField(default=0, help_text='version_roster de la evaluación con la que se contaron los inscritos')
+    fecha_barrido = models.DateTimeField(default=timezone.now, help_text='Último recálculo de los participantes activos')
+
+    class Meta:
+        verbose_name = 'Contadores de Monitoreo'
+        verbose_name_plural = 'Contadores de Monitoreo'
+
+    def __str__(self):
+        return f"Contadores de la evaluación {self.evaluacion_id}"
+
+    @property
+    def pendientes(self):
+        """Inscritos que no tienen un intento en curso con actividad reciente ni entregado"""
+        return max(0, self.inscritos - self.activos - self.entregados)
+
+    def como_dict(self):
+        return {
+            'inscritos': self.inscritos,
+            'iniciados': self.iniciados,
+            'activos': self.activos,
+            'entregados': self.entregados,
+            'finalizados_admin': self.finalizados_admin,
+            'pendientes': self.pendientes,
+            'total_alertas': self.total_alertas,
+        }
+
+
+class MuestraMonitoreo(models.Model):
+    """
+    Muestra periódica de los agregados del monitoreo de una evaluación (historial de solo inserción).
+    'activos' es la lectura instantánea de los participantes activos al tomar la muestra (en las
+    compactadas, la mayor lectura del intervalo); entregados, guardados y alertas son acumulados,
+    de modo que la tasa por minuto sale de la diferencia entre muestras consecutivas y la
+    compactación de muestras antiguas solo conserva el último valor de cada intervalo.
+    """
+    evaluacion = models.ForeignKey(Evaluacion, on_delete=models.CASCADE, related_name='muestras_monitoreo')
+    fecha = models.DateTimeField(help_text='Momento de la muestra (inicio del intervalo en las compactadas)')
+    intervalo = models.PositiveIntegerField(help_text='Segundos que cubre la muestra (mayor en muestras compactadas)')
+    activos = models.PositiveIntegerField(default=0, help_text='Participantes activos al tomar la muestra (mayor lectura del intervalo en las compactadas)')
+    entregados = models.PositiveIntegerField(default=0, help_text='Participantes con el último intento entregado')
+    guardados = models.PositiveBigIntegerField(default=0, help_text='Guardados automáticos acumulados de la evaluación')
+    alertas = models.PositiveIntegerField(default=0, help_text='Alertas acumuladas de la evaluación')
+
+    class Meta:
+        verbose_name = 'Muestra de Monitoreo'
+        verbose_name_plural = 'Muestras de Monitoreo'
+        indexes = [
+            models.Index(fields=['evaluacion', 'fecha']),
+            models.Index(fields=['intervalo', 'fecha']),
+        ]
+
+    def __str__(self):
+        return f"Muestra de la evaluación {self.evaluacion_id} ({self.fecha:%Y-%m-%d %H:%M:%S})"
+
+
 class SolicitudClaveTemporal(models.Model):
     """
     Modelo para rastrear las solicitudes de clave temporal
@@ -1081,6 +1505,9 @@ class AuditLog(models.Model):
 
     class Meta:
         ordering = ['-fecha_hora']
+        indexes = [
+            models.Index(fields=['fecha_hora', 'accion']),
+        ]
         verbose_name = 'Log de Auditoría'
         verbose_name_plural = 'Logs de Auditoría'
 
@@ -0,0 +1,384 @@
+"""
+Serialización del estado de monitoreo de una evaluación.
+
+El endpoint de sondeo (obtener_estado_monitoreo) y las notificaciones por WebSocket del panel
+de monitoreo comparten este formato, de modo que el JavaScript del panel procesa igual una
+respuesta completa que la fila de un solo participante.
+
+La tabla del panel se pagina, filtra y ordena en SQL (consultar_tabla_monitoreo): el estado,
+la actividad, los cambios de pestaña, los intentos y las alertas del último intento de cada
+participante se anotan con subconsultas sobre la lista de IDs autorizados, que se cachea por
+versión de la lista (version_roster).
+
+Cada vista de la tabla (filtros, orden y página) se guarda como snapshot en la caché compartida
+y se recalcula como máximo una vez cada MONITOREO_SNAPSHOT_SEGUNDOS: un único proceso la
+construye mientras las demás solicitudes esperan ese resultado (single-flight), de modo que la
+carga no crece con la cantidad de administradores que monitorean la misma evaluación.
+
+La consulta incremental (?since=<cursor>) busca por índice los participantes cuyo intento,
+alertas o intentos otorgados cambiaron (participantes_modificados_desde): si nada cambió desde
+el snapshot guardado se reutiliza sin recalcularlo, y si hubo cambios solo se serializan las
+filas modificadas que están en la página. Los IDs de la página siempre se envían para que el
+navegador reordene y descarte filas. El cursor combina el instante de la consulta con la versión
+de la lista de autorizados; si la lista cambió se responde la página completa.
+"""
+
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+from .calificacion_utils import obtener_diccionario_respuestas
+from .estado_intento import MAX_CAMBIOS_PESTANA
+from .models import AlertaIntento, IntentosParticipante, Participantes, ResultadoEvaluacion
+
+
+# Margen para no perder cambios de transacciones confirmadas después de leer el cursor
+SOLAPAMIENTO_CURSOR = timedelta(seconds=2)
+TIEMPO_CACHE_IDS_ROSTER = 60 * 60
+# Espera máxima por un snapshot en construcción antes de calcularlo en la propia solicitud
+ESPERA_SNAPSHOT = 5
+
+ESTADOS_MONITOREO = ('activo', 'inactivo', 'pendiente', 'finalizado')
+ORDENES_MONITOREO = {
+    'nombre': 'NombresCompletos',
+    'cedula': 'cedula',
+    'estado': 'estado_monitoreo',
+    'actividad': 'actividad_monitoreo',
+    'alertas': 'alertas_monitoreo',
+    'pestanas': 'cambios_monitoreo',
+}
+LIMITE_PAGINA = 50
+LIMITE_PAGINA_MAXIMO = 200
+
+
+def contar_respondidas(respuestas):
+    """Cuenta las preguntas con respuesta en un diccionario {'pregunta_102': '415'}"""
+    return sum(
+        1 for clave, respuesta in respuestas.items()
+        if clave.startswith('pregunta_') and respuesta
+    )
+
+
+def serializar_monitoreos(evaluacion, participantes):
+    """
+    Retorna la fila de monitoreo de cada participante (último intento, avance, alertas e intentos)
+    con un número constante de consultas.
+    """
+    datos_monitoreo = []
+    participante_ids = [participante.id for participante in participantes]
+    resultados = ResultadoEvaluacion.objects.filter(
+        evaluacion=evaluacion, participante_id__in=participante_ids
+    ).order_by('participante_id', '-numero_intento')
+    configuraciones = {
+        configuracion.participante_id: configuracion
+        for configuracion in IntentosParticipante.objects.filter(
+            evaluacion=evaluacion, participante_id__in=participante_ids
+        )
+    }
+    ultimos_resultados = {}
+    intentos_usados_por_participante = {}
+    for resultado in resultados:
+        ultimos_resultados.setdefault(resultado.participante_id, resultado)
+        if resultado.completada:
+            intentos_usados_por_participante[resultado.participante_id] = (
+                intentos_usados_por_participante.get(resultado.participante_id, 0) + 1
+            )
+
+    # Conteo y últimas tres alertas de cada intento mostrado, en dos consultas
+    resultado_ids = [resultado.id for resultado in ultimos_resultados.values()]
+    alertas_count_por_resultado = dict(
+        AlertaIntento.objects.filter(resultado_id__in=resultado_ids)
+        .values('resultado_id').annotate(total=Count('id')).values_list('resultado_id', 'total')
+    )
+    alertas_recientes_por_resultado = {}
+    ultima_alerta_por_resultado = {}
+    alertas_recientes = AlertaIntento.objects.filter(resultado_id__in=resultado_ids).annotate(
+        posicion=Window(
+            expression=RowNumber(),
+            partition_by=[F('resultado_id')],
+            order_by=[F('timestamp').desc(), F('id').desc()]
+        )
+    ).filter(posicion__lte=3).order_by('resultado_id', 'timestamp', 'id')
+    for alerta in alertas_recientes:
+        alertas_recientes_por_resultado.setdefault(alerta.resultado_id, []).append(alerta.como_dict())
+        ultima_alerta_por_resultado[alerta.resultado_id] = alerta.timestamp
+
+    total_banco_preguntas = evaluacion.preguntas.count()
+    cantidad_configurada = sum(
+        cuota.cantidad_preguntas for cuota in evaluacion.cuotas_unidades.all()
+    ) or evaluacion.preguntas_a_mostrar or 10
+    total_preguntas_mostradas = min(total_banco_preguntas, cantidad_configurada)
+
+    for participante in participantes:
+        resultado = ultimos_resultados.get(participante.id)
+        intentos_usados = intentos_usados_por_participante.get(participante.id, 0)
+        configuracion = configuraciones.get(participante.id)
+        intentos_maximos = configuracion.intentos_maximos if configuracion else participante.intentos_maximos_default
+        intentos_disponibles = max(0, intentos_maximos - intentos_usados)
+        ha_iniciado = resultado is not None
+        
+        if not resultado:
+            estado = 'pendiente'
+        elif resultado.completada:
+            estado = 'finalizado' if intentos_disponibles == 0 else 'inactivo'
+        elif resultado.esta_activo():
+            estado = 'activo'
+        else:
+            estado = 'inactivo'
+            
+        # Marca de la última modificación de la fila, usada por la consulta incremental
+        marcas = [
+            resultado.ultima_actividad if resultado else None,
+            ultima_alerta_por_resultado.get(resultado.id) if resultado else None,
+            configuracion.fecha_actualizacion if configuracion else None,
+        ]
+        modificado = max((marca for marca in marcas if marca), default=None)
+            
+        preguntas_respondidas = min(
+            total_preguntas_mostradas, contar_respondidas(obtener_diccionario_respuestas(resultado))
+        )
+        porcentaje_avance = round(
+            (preguntas_respondidas / total_preguntas_mostradas * 100), 1
+        ) if total_preguntas_mostradas else 0
+        
+        datos_monitoreo.append({
+            # La clave visual debe ser estable por participante, no por intento.
+            'id': participante.id,
+            'resultado_id': resultado.id if resultado else None,
+            'participante_id': participante.id,
+            'participante_nombre': participante.NombresCompletos,
+            'participante_cedula': participante.cedula,
+            'estado': estado,
+            'esta_activo': resultado.esta_activo() if resultado else False,
+            'ha_iniciado': ha_iniciado,
+            'preguntas_respondidas': preguntas_respondidas,
+            'preguntas_revisadas': total_preguntas_mostradas,
+            'porcentaje_avance': porcentaje_avance,
+            'ultima_actividad': resultado.ultima_actividad.isoformat() if (resultado and resultado.ultima_actividad) else None,
+            'alertas_count': alertas_count_por_resultado.get(resultado.id, 0) if resultado else 0,
+            'alertas_recientes': alertas_recientes_por_resultado.get(resultado.id, []) if resultado else [],
+            'tiene_resultado_completado': (resultado.completada) if resultado else False,
+            'puntos_obtenidos': float(resultado.puntos_obtenidos) if (resultado and resultado.esta_calificado) else None,
+            'puntaje_numerico': resultado.get_puntaje_numerico() if (resultado and resultado.esta_calificado) else None,
+            'intentos_disponibles': intentos_disponibles,
+            'intentos_usados': intentos_usados,
+            'cambios_pestana_actuales': resultado.cambios_pestana if resultado else 0,
+            'cambios_pestana_maximo': MAX_CAMBIOS_PESTANA,
+            'modificado': modificado.timestamp() if modificado else None,
+        })
+
+    return datos_monitoreo
+
+
+def generar_cursor(evaluacion, momento):
+    """Cursor opaco para la siguiente consulta incremental: '<timestamp>:<version_roster>'"""
+    return f'{(momento - SOLAPAMIENTO_CURSOR).timestamp():.6f}:{evaluacion.version_roster}'
+
+
+def leer_cursor(cursor):
+    """Retorna (datetime, version_roster) o None si el cursor no es válido"""
+    try:
+        marca, version = cursor.split(':')
+        return datetime.fromtimestamp(float(marca), tz=dt_timezone.utc), int(version)
+    except (AttributeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def participantes_modificados_desde(evaluacion, desde):
+    """IDs de participantes con intentos, alertas o intentos otorgados modificados después de `desde`"""
+    # completada__in permite recorrer por rango el índice (evaluacion, completada, ultima_actividad)
+    ids = set(
+        ResultadoEvaluacion.objects.filter(
+            evaluacion=evaluacion, completada__in=[False, True], ultima_actividad__gt=desde
+        ).values_list('participante_id', flat=True)
+    )
+    ids.update(
+        AlertaIntento.objects.filter(resultado__evaluacion=evaluacion, timestamp__gt=desde)
+        .values_list('resultado__participante_id', flat=True)
+    )
+    ids.update(
+        IntentosParticipante.objects.filter(evaluacion=evaluacion, fecha_actualizacion__gt=desde)
+        .values_list('participante_id', flat=True)
+    )
+    return ids
+
+
+def _cache_key_ids_roster(evaluacion_id, version):
+    return f'evaluacion_{evaluacion_id}_roster_v{version}_ids'
+
+
+def guardar_ids_roster(evaluacion, participantes):
+    """Guarda los IDs autorizados de la versión actual para calcular bajas en consultas posteriores"""
+    cache.set(
+        _cache_key_ids_roster(evaluacion.pk, evaluacion.version_roster),
+        [participante.id for participante in participantes],
+        TIEMPO_CACHE_IDS_ROSTER
+    )
+
+
+def obtener_ids_roster(evaluacion_id, version):
+    ids = cache.get(_cache_key_ids_roster(evaluacion_id, version))
+    return set(ids) if ids is not None else None
+
+
+def obtener_ids_autorizados(evaluacion):
+    """IDs autorizados de la versión actual de la lista, desde la caché o calculados y guardados"""
+    ids = obtener_ids_roster(evaluacion.pk, evaluacion.version_roster)
+    if ids is None:
+        participantes = evaluacion.get_participantes_autorizados()
+        guardar_ids_roster(evaluacion, participantes)
+        ids = {participante.id for participante in participantes}
+    return ids
+
+
+def leer_parametros_tabla(params):
+    """Normaliza los filtros, el orden y la página de la tabla de monitoreo recibidos por GET"""
+    def entero(nombre, defecto):
+        try:
+            return int(params.get(nombre, defecto))
+        except (TypeError, ValueError):
+            return defecto
+
+    estado = params.get('estado', '')
+    orden = params.get('orden', 'nombre')
+    return {
+        'estado': estado if estado in ESTADOS_MONITOREO else '',
+        'min_alertas': max(0, entero('min_alertas', 0)),
+        'busqueda': (params.get('q') or '').strip(),
+        'orden': orden if orden.lstrip('-') in ORDENES_MONITOREO else 'nombre',
+        'pagina': max(1, entero('pagina', 1)),
+        'limite': min(LIMITE_PAGINA_MAXIMO, max(1, entero('limite', LIMITE_PAGINA))),
+    }
+
+
+def consultar_tabla_monitoreo(evaluacion, ids, estado='', min_alertas=0, busqueda='', orden='nombre'):
+    """
+    Participantes autorizados filtrados y ordenados en SQL según el estado de su último intento.
+    Los valores se declaran con alias(): cada subconsulta solo se incluye donde un filtro o el
+    orden la usa, y la página se lee sin columnas extra (serializar_monitoreos arma las filas).
+    estado_monitoreo es la posición en ESTADOS_MONITOREO del estado de serializar_monitoreos.
+    """
+    resultados = ResultadoEvaluacion.objects.filter(evaluacion=evaluacion, participante=OuterRef('pk'))
+    ultimo = resultados.order_by('-numero_intento')
+    intentos_usados = resultados.filter(completada=True).order_by().values('participante').annotate(
+        total=Count('pk')
+    ).values('total')
+    intentos_configurados = IntentosParticipante.objects.filter(
+        evaluacion=evaluacion, participante=OuterRef('pk')
+    ).values('intentos_maximos')[:1]
+    alertas = AlertaIntento.objects.filter(resultado_id=OuterRef('ultimo_resultado_monitoreo')).order_by().values(
+        'resultado_id'
+    ).annotate(total=Count('pk')).values('total')
+
+    codigo = {valor: Value(posicion) for posicion, valor in enumerate(ESTADOS_MONITOREO)}
+    participantes = Participantes.objects.filter(pk__in=ids).alias(
+        ultimo_resultado_monitoreo=Subquery(ultimo.values('pk')[:1]),
+        completada_monitoreo=Subquery(ultimo.values('completada')[:1]),
+        actividad_monitoreo=Subquery(ultimo.values('ultima_actividad')[:1]),
+        cambios_monitoreo=Coalesce(Subquery(ultimo.values('cambios_pestana')[:1]), 0),
+        intentos_usados_monitoreo=Coalesce(Subquery(intentos_usados), 0),
+        intentos_maximos_monitoreo=Coalesce(Subquery(intentos_configurados), F('intentos_maximos_default')),
+    ).alias(
+        alertas_monitoreo=Coalesce(Subquery(alertas), 0),
+        estado_monitoreo=Case(
+            When(completada_monitoreo__isnull=True, then=codigo['pendiente']),
+            When(
+                completada_monitoreo=True,
+                intentos_usados_monitoreo__gte=F('intentos_maximos_monitoreo'),
+                then=codigo['finalizado']
+            ),
+            When(completada_monitoreo=True, then=codigo['inactivo']),
+            When(actividad_monitoreo__gte=timezone.now() - timedelta(minutes=5), then=codigo['activo']),
+            default=codigo['inactivo'],
+            output_field=IntegerField(),
+        ),
+    )
+
+    if estado:
+        participantes = participantes.filter(estado_monitoreo=ESTADOS_MONITOREO.index(estado))
+    if min_alertas:
+        participantes = participantes.filter(alertas_monitoreo__gte=min_alertas)
+    if busqueda:
+        participantes = participantes.filter(Q(NombresCompletos__icontains=busqueda) | Q(cedula__icontains=busqueda))
+
+    campo = ORDENES_MONITOREO[orden.lstrip('-')]
+    expresion = F(campo).desc(nulls_last=True) if orden.startswith('-') else F(campo).asc(nulls_last=True)
+    return participantes.order_by(expresion, 'pk')
+
+
+def construir_pagina_monitoreo(evaluacion, parametros):
+    """Calcula una página de la tabla de monitoreo con sus filas serializadas y los contadores"""
+    from .contadores_monitoreo import obtener_contadores
+
+    ahora = timezone.now()
+    filtros = dict(parametros)
+    pagina, limite = filtros.pop('pagina'), filtros.pop('limite')
+
+    tabla = consultar_tabla_monitoreo(evaluacion, obtener_ids_autorizados(evaluacion), **filtros)
+    total_filtrado = tabla.count()
+    paginas = max(1, -(-total_filtrado // limite))
+    pagina = min(pagina, paginas)
+    participantes = list(tabla[(pagina - 1) * limite:pagina * limite])
+
+    return {
+        'monitoreos': serializar_monitoreos(evaluacion, participantes),
+        'ids_pagina': [participante.id for participante in participantes],
+        'pagina': pagina,
+        'paginas': paginas,
+        'limite': limite,
+        'total_filtrado': total_filtrado,
+        'contadores': obtener_contadores(evaluacion).como_dict(),
+        'generado': ahora.timestamp(),
+    }
+
+
+def fecha_snapshot(snapshot):
+    """Instante en que se calculó el snapshot, como datetime con zona horaria"""
+    return datetime.fromtimestamp(snapshot['generado'], tz=dt_timezone.utc)
+
+
+def _cache_key_snapshot(evaluacion, parametros):
+    vista = hashlib.md5(json.dumps(parametros, sort_keys=True).encode()).hexdigest()[:12]
+    return f'monitoreo_{evaluacion.pk}_roster_v{evaluacion.version_roster}_vista_{vista}'
+
+
+def leer_snapshot_monitoreo(evaluacion, parametros):
+    """Snapshot guardado de la vista sin importar su antigüedad, o None si no hay uno"""
+    if getattr(settings, 'MONITOREO_SNAPSHOT_SEGUNDOS', 0) <= 0:
+        return None
+    return cache.get(_cache_key_snapshot(evaluacion, parametros))
+
+
+def obtener_snapshot_monitoreo(evaluacion, parametros):
+    """
+    Retorna la página de monitoreo compartida por todos los administradores, calculándola como
+    máximo una vez por intervalo. Si otro proceso la está calculando se espera su resultado.
+    """
+    intervalo = getattr(settings, 'MONITOREO_SNAPSHOT_SEGUNDOS', 0)
+    if intervalo <= 0:
+        return construir_pagina_monitoreo(evaluacion, parametros)
+
+    cache_key = _cache_key_snapshot(evaluacion, parametros)
+    lock_key = f'{cache_key}_lock'
+    limite_espera = time.monotonic() + ESPERA_SNAPSHOT
+    while True:
+        snapshot = cache.get(cache_key)
+        if snapshot is not None and time.time() - snapshot['generado'] < intervalo:
+            return snapshot
+        if cache.add(lock_key, True, ESPERA_SNAPSHOT):
+            try:
+                snapshot = construir_pagina_monitoreo(evaluacion, parametros)
+                cache.set(cache_key, snapshot, intervalo * 10)
+                return snapshot
+            finally:
+                cache.delete(lock_key)
+        if time.monotonic() >= limite_espera:
+            return snapshot or construir_pagina_monitoreo(evaluacion, parametros)
+        time.sleep(0.05)
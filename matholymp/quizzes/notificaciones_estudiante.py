@@ -0,0 +1,91 @@
+"""
+Notificaciones en tiempo real para la página de evaluación del estudiante (Django Channels).
+
+Cuando un administrador finaliza el intento, reduce los cambios de pestaña o el barrido cierra
+un intento vencido, el nuevo estado del intento (el mismo cuerpo que responde el latido) se
+publica al estudiante una vez confirmada la transacción. Al editarse la evaluación (por ejemplo,
+una extensión de la duración) se difunde un aviso a todos sus estudiantes conectados para que
+vuelvan a consultar el latido.
+
+Con el WebSocket abierto el navegador espacia el latido HTTP a una reconciliación ocasional; si
+no hay capa de canales o la conexión falla, sigue sondeando el latido con el intervalo normal.
+"""
+
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth.models import User
+from django.core.signals import request_started
+from django.db import transaction
+from django.dispatch import receiver
+
+from .estado_intento import datos_latido, refrescar_estado_intento
+from .notificaciones_monitoreo import LoteTransaccion
+
+
+logger = logging.getLogger(__name__)
+
+
+def grupo_estudiante(evaluacion_id, user_id):
+    # Un estudiante tiene a lo sumo un intento activo por evaluación: el grupo identifica ese intento
+    return f'estudiante_evaluacion_{evaluacion_id}_{user_id}'
+
+
+def grupo_estudiantes_evaluacion(evaluacion_id):
+    return f'estudiantes_evaluacion_{evaluacion_id}'
+
+
+def notificar_estudiante(evaluacion_id, user_id):
+    """Publica al estudiante el estado de su intento al confirmar la transacción actual"""
+    notificar_estudiantes(evaluacion_id, [user_id])
+
+
+def notificar_estudiantes(evaluacion_id, user_ids):
+    for user_id in user_ids:
+        _lote.agregar((evaluacion_id, user_id))
+
+
+def _publicar_lote(pendientes):
+    for clave in pendientes:
+        _publicar_estado(clave)
+
+
+_lote = LoteTransaccion(_publicar_lote)
+
+
+@receiver(request_started)
+def _descartar_lote(**kwargs):
+    _lote.descartar()
+
+
+def difundir_evaluacion(evaluacion_id, aviso=''):
+    """Avisa a todos los estudiantes conectados de la evaluación que consulten de nuevo su estado"""
+    mensaje = {'tipo': 'evaluacion', 'aviso': aviso}
+    transaction.on_commit(lambda: _enviar(grupo_estudiantes_evaluacion(evaluacion_id), mensaje))
+
+
+def _publicar_estado(clave):
+    evaluacion_id, user_id = clave
+    try:
+        estado = refrescar_estado_intento(evaluacion_id, User(pk=user_id))
+    except Exception:
+        logger.exception('No se pudo construir el estado del intento del usuario %s', user_id)
+        return
+    if estado is None or not estado['resultado_id']:
+        return
+    _enviar(grupo_estudiante(evaluacion_id, user_id), {'tipo': 'estado', **datos_latido(estado)})
+
+
+def _enviar(grupo, mensaje):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(grupo, {
+            'type': 'estudiante.mensaje',
+            'mensaje': mensaje,
+        })
+    except Exception:
+        # El navegador recupera el estado con el latido HTTP
+        logger.exception('No se pudo publicar el estado al grupo %s', grupo)
@@ -0,0 +1,132 @@
+"""
+Notificaciones en tiempo real para el panel de monitoreo (Django Channels).
+
+Cada cambio del estado de un participante (inicio, avance, cambio de pestaña, alerta, entrega,
+finalización administrativa, nuevos intentos) se publica en el grupo de la evaluación una vez
+confirmada la transacción. La publicación es liviana y no consulta la base de datos: solo lleva
+el participante y los eventos. El consumidor WebSocket de cada panel conectado (consumers.py)
+arma la fila y los contadores y los reenvía al navegador, de modo que la petición del estudiante
+no paga la serialización y, sin paneles abiertos, nadie la paga.
+
+Los eventos de una misma transacción se agrupan (LoteTransaccion) en un solo mensaje por
+evaluación con los eventos de cada participante. Si no hay capa de canales configurada o la
+publicación falla, el panel sigue funcionando con el sondeo HTTP.
+"""
+
+import logging
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.signals import request_started
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+def nombre_grupo(evaluacion_id):
+    return f'monitoreo_evaluacion_{evaluacion_id}'
+
+
+class LoteTransaccion:
+    """
+    Agrupa por clave los eventos de la transacción en curso y los publica una sola vez al confirmarla.
+
+    Cada evento registra con on_commit el mismo vaciado idempotente: el primero que corre publica
+    el lote completo y lo limpia, el resto no encuentra nada. Así un savepoint revertido, que
+    descarta sus callbacks, no deja eventos confirmados sin publicar. Los eventos de una
+    transacción revertida quedan en el lote hasta la siguiente confirmación o el inicio de la
+    siguiente petición; como quien recibe el aviso consulta el estado actual, a lo sumo provocan
+    una actualización de más, nunca una pérdida.
+    """
+
+    def __init__(self, publicar):
+        self.publicar = publicar
+        self._local = threading.local()
+
+    def agregar(self, clave, evento=None):
+        pendientes = getattr(self._local, 'pendientes', None)
+        if pendientes is None or not transaction.get_connection().in_atomic_block:
+            # Sin transacción abierta, lo que quedó en el lote es de una transacción revertida
+            pendientes = self._local.pendientes = {}
+        pendientes.setdefault(clave, []).append(evento)
+        transaction.on_commit(self._vaciar)
+
+    def descartar(self):
+        self._local.pendientes = None
+
+    def _vaciar(self):
+        pendientes = getattr(self._local, 'pendientes', None)
+        self._local.pendientes = None
+        if pendientes:
+            self.publicar(pendientes)
+
+
+def _publicar_lote(pendientes):
+    por_evaluacion = {}
+    for (evaluacion_id, participante_id), eventos in pendientes.items():
+        por_evaluacion.setdefault(evaluacion_id, {})[participante_id] = eventos
+    for evaluacion_id, eventos in por_evaluacion.items():
+        _enviar_cambios(evaluacion_id, eventos)
+
+
+_lote = LoteTransaccion(_publicar_lote)
+
+
+def notificar_participante(evaluacion_id, participante_id, evento):
+    """Avisa a los paneles conectados que el participante cambió, al confirmar la transacción actual"""
+    _lote.agregar((evaluacion_id, participante_id), evento)
+
+
+@receiver(request_started)
+def _descartar_lote(**kwargs):
+    _lote.descartar()
+
+
+def notificar_participantes(evaluacion_id, participante_ids, evento):
+    """
+    Avisa al confirmar la transacción del cambio en bloque de varios participantes con un solo
+    mensaje; cada panel serializa sus filas en una pasada.
+    """
+    if participante_ids:
+        participante_ids = list(participante_ids)
+        transaction.on_commit(lambda: _publicar_participantes(evaluacion_id, participante_ids, evento))
+
+
+def notificar_avance(evaluacion_id, participante_id, preguntas_respondidas):
+    """Publica solo el avance del participante; el navegador recalcula el porcentaje"""
+    _enviar(evaluacion_id, {
+        'type': 'monitoreo.mensaje',
+        'mensaje': {
+            'tipo': 'avance',
+            'participante_id': participante_id,
+            'preguntas_respondidas': preguntas_respondidas,
+            'ultima_actividad': timezone.now().isoformat(),
+        },
+    })
+
+
+def _publicar_participantes(evaluacion_id, participante_ids, evento):
+    _enviar_cambios(evaluacion_id, {participante_id: [evento] for participante_id in participante_ids})
+
+
+def _enviar_cambios(evaluacion_id, eventos):
+    """Publica solo qué participantes cambiaron y por qué: la fila la arma el consumidor de cada panel"""
+    _enviar(evaluacion_id, {
+        'type': 'monitoreo.cambios',
+        'cambios': [[participante_id, eventos_participante] for participante_id, eventos_participante in eventos.items()],
+    })
+
+
+def _enviar(evaluacion_id, evento):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(nombre_grupo(evaluacion_id), evento)
+    except Exception:
+        # El panel recupera el estado con el sondeo HTTP
+        logger.exception('No se pudo publicar el evento de monitoreo de la evaluación %s', evaluacion_id)
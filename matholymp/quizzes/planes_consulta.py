@@ -0,0 +1,145 @@
+"""
+Verificación con EXPLAIN de las consultas de las rutas críticas del examen y del monitoreo.
+
+Las consultas no se copian a mano: cada escenario llama a la vista real con el cliente de pruebas
+de Django (estudiante y administrador con sesión iniciada) o a la misma función que ejecutan los
+comandos periódicos (ranking, estadísticas, contadores, barrido, cola de calificación e historial).
+El SQL que ejecutan se captura con CaptureQueriesContext y se obtiene el plan de cada SELECT, UPDATE
+y DELETE en la base de datos configurada (MySQL o SQLite). Un recorrido completo de una de las
+tablas que crecen con los intentos (TABLAS_CRITICAS) es un fallo.
+
+Lo usan las pruebas de quizzes/tests.py, con datos propios, y el comando verificar_planes_consulta
+sobre una base con datos reales. Los escenarios escriben en la base de datos (crean el intento,
+reclaman entregas, toman muestras): quien los ejecuta los envuelve en una transacción que se
+revierte, con la caché desactivada (SIN_CACHE) para que las vistas lleguen a la base de datos.
+"""
+
+import json
+import re
+from datetime import timedelta
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .cierre_intentos import cerrar_intentos_vencidos
+from .cola_calificacion import reclamar_entregas
+from .contadores_monitoreo import barrer_activos, evaluaciones_por_barrer, recalcular_contadores
+from .estadisticas_resultados import calcular_estadisticas_resultados
+from .historial_monitoreo import compactar_muestras, tomar_muestras
+from .models import (
+    AlertaIntento, EntradaRanking, EntregaPendiente, IntentosParticipante, MuestraMonitoreo, ResultadoEvaluacion,
+)
+from .monitoreo_utils import participantes_modificados_desde
+from .ranking import actualizar_participante, reconstruir_ranking
+
+
+# Tablas que crecen con los participantes y los intentos (ContadoresMonitoreo tiene una fila por evaluación)
+TABLAS_CRITICAS = {
+    modelo._meta.db_table for modelo in (
+        AlertaIntento, EntradaRanking, EntregaPendiente, IntentosParticipante, MuestraMonitoreo, ResultadoEvaluacion,
+    )
+}
+
+SIN_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+# Tabla y alias de cada FROM/JOIN del SQL generado por el ORM (los alias del ORM son U0, T3, V1...)
+PATRON_TABLA = re.compile(r'(?:FROM|JOIN)\s+[`"](\w+)[`"](?:\s+(?:AS\s+)?[`"]?([A-Z]\d+)\b)?')
+
+
+def _cliente(usuario):
+    cliente = Client()
+    cliente.force_login(usuario)
+    return cliente
+
+
+def escenarios(evaluacion, admin, estudiante, participante_id):
+    """Rutas críticas: (nombre, función que la ejecuta). Los clientes inician sesión antes de capturar."""
+    def vista(cliente, nombre_url, consulta='', datos=None, args=(evaluacion.pk,)):
+        url = reverse(f'quizzes:{nombre_url}', args=args) + consulta
+        if datos is not None:
+            return lambda: cliente.post(url, json.dumps(datos), content_type='application/json')
+        return lambda: cliente.get(url)
+
+    lista = []
+    if estudiante:
+        cliente = _cliente(estudiante)
+        lista += [
+            ("take_quiz", vista(cliente, 'take_quiz')),
+            ("latido del intento", vista(cliente, 'heartbeat_evaluacion')),
+            ("verificación de estado", vista(cliente, 'verificar_estado_evaluacion')),
+            ("progreso guardado", vista(cliente, 'obtener_progreso_evaluacion')),
+            ("guardado automático", vista(cliente, 'guardar_respuesta_automatica', datos={'cambios': {}})),
+            ("cambio de pestaña", vista(cliente, 'registrar_cambio_pestana', datos={})),
+            ("resultados del estudiante", vista(cliente, 'student_results', args=())),
+        ]
+    cliente = _cliente(admin)
+    lista += [
+        ("ranking: clasificados", vista(cliente, 'ranking_evaluacion', '?estado=clasificados')),
+        ("ranking: no clasificados", vista(cliente, 'ranking_evaluacion', '?estado=no_clasificados&page=2')),
+        ("resultados y estadísticas", vista(cliente, 'evaluacion_results')),
+        ("monitoreo: página", vista(cliente, 'monitoreo_evaluacion')),
+        ("monitoreo: tabla filtrada y ordenada", vista(cliente, 'obtener_estado_monitoreo', '?orden=-alertas&min_alertas=1')),
+        ("monitoreo: cambios desde el cursor", lambda: participantes_modificados_desde(
+            evaluacion, timezone.now() - timedelta(minutes=1)
+        )),
+        ("monitoreo: historial", vista(cliente, 'historial_monitoreo')),
+        ("ranking: reconstrucción (ROW_NUMBER)", lambda: reconstruir_ranking(evaluacion)),
+        ("ranking: actualización incremental", lambda: actualizar_participante(evaluacion.pk, participante_id)),
+        ("estadísticas de resultados", lambda: calcular_estadisticas_resultados(evaluacion)),
+        ("contadores: evaluaciones por barrer", lambda: list(evaluaciones_por_barrer())),
+        ("contadores: recálculo", lambda: recalcular_contadores(evaluacion)),
+        ("contadores: participantes activos", lambda: barrer_activos(evaluacion.pk)),
+        ("barrido de intentos vencidos", lambda: cerrar_intentos_vencidos(evaluacion_id=evaluacion.pk)),
+        ("cola de calificación: reclamar entregas", lambda: reclamar_entregas(50)),
+        ("historial: muestreo", tomar_muestras),
+        ("historial: compactación", compactar_muestras),
+    ]
+    return lista
+
+
+def capturar_consultas(funcion):
+    """Ejecuta la función y retorna (su resultado, SQL de sus SELECT, UPDATE y DELETE sin repetir)"""
+    with CaptureQueriesContext(connection) as capturadas:
+        resultado = funcion()
+    consultas = []
+    for consulta in capturadas.captured_queries:
+        sql = consulta['sql']
+        if sql.lstrip().split(' ', 1)[0].upper() in ('SELECT', 'UPDATE', 'DELETE') and sql not in consultas:
+            consultas.append(sql)
+    return resultado, consultas
+
+
+def plan_consulta(sql):
+    """Retorna las filas del plan de ejecución del SQL capturado en la base de datos actual"""
+    prefijo = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefijo + sql)
+        columnas = [columna[0] for columna in cursor.description]
+        return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+
+def recorridos_completos(sql, plan, solo_sin_indice=False):
+    """
+    Pasos del plan que recorren completa una de las TABLAS_CRITICAS. Con solo_sin_indice (tablas
+    casi vacías de las pruebas, donde MySQL puede preferir el recorrido aunque tenga un índice)
+    en MySQL solo cuentan los recorridos sin ningún índice aplicable (possible_keys vacío).
+    """
+    tablas = {}
+    for tabla, alias in PATRON_TABLA.findall(sql):
+        tablas[tabla] = tabla
+        if alias:
+            tablas[alias] = tabla
+    if connection.vendor == 'sqlite':
+        # 'SCAN tabla' sin índice; 'SCAN tabla USING INDEX' recorre un índice y también es completo
+        pasos = [(paso['detail'].split(' ')[1], paso['detail']) for paso in plan if paso['detail'].startswith('SCAN ')]
+    elif connection.vendor == 'mysql':
+        pasos = [
+            (paso['table'], f"{paso['table']} (type=ALL)") for paso in plan
+            if paso.get('type') == 'ALL' and not (solo_sin_indice and paso.get('possible_keys'))
+        ]
+    else:
+        raise NotImplementedError(f'Base de datos no soportada: {connection.vendor}')
+    return [detalle for nombre, detalle in pasos if tablas.get(nombre) in TABLAS_CRITICAS]
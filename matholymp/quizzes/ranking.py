@@ -0,0 +1,288 @@
+"""
+Ranking de una evaluación materializado en EntradaRanking.
+
+Cada participante con intentos completados tiene una entrada con su mejor intento (nota
+descendente, tiempo ascendente y, ante un empate total, el intento más antiguo), su posición y
+el nombre de su colegio. Las páginas de ranking, el PDF y la clasificación a la etapa siguiente
+leen las entradas por el índice (evaluacion, posicion) con una sola consulta.
+
+Al entregar, finalizar o eliminar un intento, actualizar_participante vuelve a elegir el mejor
+intento del participante y mueve su entrada: solo se desplazan una posición las entradas entre
+la posición anterior y la nueva. Las actualizaciones de una evaluación se serializan bloqueando
+su fila de BloqueoRanking (no la de Evaluacion). Desde signals.py la actualización corre al
+confirmarse la transacción de la entrega, en una transacción corta propia, de modo que el bloqueo
+no se mantiene durante la entrega del estudiante; si falla, la tabla de la evaluación se
+reconstruye. reconstruir_ranking recalcula la tabla completa de una evaluación con ROW_NUMBER()
+(el mejor intento por participante y la posición, ambos en la base de datos); lo usa el comando
+reconstruir_ranking y la primera lectura de una evaluación que aún no tiene entradas.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import BloqueoRanking, EntradaRanking, Evaluacion, GrupoParticipantes, ResultadoEvaluacion
+
+
+logger = logging.getLogger(__name__)
+
+
+ORDEN_RANKING = (F('puntos_obtenidos').desc(), F('tiempo_utilizado').asc(), F('pk').asc())
+
+# A partir de este tamaño, un lote de intentos cerrados reconstruye la tabla en lugar de mover entradas
+LIMITE_INCREMENTAL = 50
+
+
+def completados(evaluacion):
+    """Intentos calificados de la evaluación (las entregas en cola de calificación aún no cuentan)"""
+    return ResultadoEvaluacion.calificados(evaluacion=evaluacion)
+
+
+def mejores_intentos(evaluacion):
+    """QuerySet con el mejor intento completado de cada participante (sin orden)"""
+    mejores = completados(evaluacion).annotate(
+        orden_participante=Window(RowNumber(), partition_by=[F('participante_id')], order_by=ORDEN_RANKING)
+    ).filter(orden_participante=1).values('pk')
+    return completados(evaluacion).filter(pk__in=mejores)
+
+
+def consultar_ranking(evaluacion):
+    """Mejores intentos ordenados por ranking con su posición anotada en `posicion`, calculados desde los intentos"""
+    return mejores_intentos(evaluacion).annotate(
+        posicion=Window(RowNumber(), order_by=ORDEN_RANKING)
+    ).order_by(*ORDEN_RANKING)
+
+
+def cupos_clasificacion(evaluacion):
+    """
+    Cantidad de participantes que clasifican (o ganan) en la evaluación según su etapa y el número
+    de etapas del concurso; None si la etapa no clasifica (etapa 2 en un concurso de 2 etapas).
+    """
+    num_etapas = evaluacion.concurso.num_etapas if evaluacion.concurso else 3
+    if evaluacion.etapa == 1:
+        return 15 if num_etapas == 3 else 5
+    if evaluacion.etapa == 2:
+        return 5 if num_etapas == 3 else None
+    if evaluacion.etapa == 3:
+        return 5
+    return None
+
+
+def nombres_colegios(participante_ids):
+    """Colegio del representante del primer grupo de cada participante: {participante_id: nombre}"""
+    miembros = GrupoParticipantes.participantes.through.objects.filter(
+        participantes_id__in=participante_ids
+    ).order_by('grupoparticipantes_id').values_list('participantes_id', 'grupoparticipantes__representante__NombreColegio')
+    colegios = {}
+    for participante_id, nombre in miembros:
+        colegios.setdefault(participante_id, nombre or '')
+    return colegios
+
+
+# --- LECTURA ---
+
+def leer_ranking(evaluacion):
+    """Entradas del ranking de la evaluación ordenadas por posición (reconstruye la tabla si aún no existe)"""
+    if not EntradaRanking.objects.filter(evaluacion=evaluacion).exists() and completados(evaluacion).exists():
+        reconstruir_ranking(evaluacion)
+    return EntradaRanking.objects.filter(evaluacion=evaluacion).order_by('posicion')
+
+
+def filtrar_ranking(entradas, evaluacion, filtro_estado):
+    """Aplica el filtro de estado ('todos', 'clasificados', 'no_clasificados') por rango de posiciones"""
+    cupos = cupos_clasificacion(evaluacion)
+    if filtro_estado == 'clasificados' and cupos:
+        return entradas.filter(posicion__lte=cupos)
+    if filtro_estado == 'no_clasificados':
+        return entradas.filter(posicion__gt=cupos) if cupos else entradas.none()
+    return entradas
+
+
+def resultados_de_entradas(entradas):
+    """
+    Mejores intentos de las entradas con `posicion_real` y `participante.colegio_nombre`,
+    el formato que usan la plantilla del ranking y el PDF.
+    """
+    resultados = []
+    for entrada in entradas.select_related('resultado__participante'):
+        resultado = entrada.resultado
+        resultado.posicion_real = entrada.posicion
+        resultado.participante.colegio_nombre = entrada.colegio_nombre or None
+        resultados.append(resultado)
+    return resultados
+
+
+def mejores_participantes(evaluacion, top_n):
+    """Participantes de las top_n primeras posiciones del ranking, en orden"""
+    entradas = leer_ranking(evaluacion).filter(posicion__lte=top_n).select_related('participante')
+    return [entrada.participante for entrada in entradas]
+
+
+def ids_mejores_participantes(evaluacion, top_n):
+    return set(leer_ranking(evaluacion).filter(posicion__lte=top_n).values_list('participante_id', flat=True))
+
+
+def posicion_participante(evaluacion, participante_id):
+    """Posición del participante en el ranking o None si no tiene intentos completados"""
+    return leer_ranking(evaluacion).filter(participante_id=participante_id).values_list('posicion', flat=True).first()
+
+
+def estadisticas_ranking(evaluacion):
+    """
+    Total de participantes, promedio de puntos y tiempo promedio real (minutos, a partir de las
+    fechas de inicio y fin) de los mejores intentos.
+    """
+    estadisticas = leer_ranking(evaluacion).aggregate(
+        total=Count('pk'),
+        promedio_puntos=Avg('puntos_obtenidos'),
+        duracion_promedio=Avg(
+            ExpressionWrapper(F('resultado__fecha_fin') - F('resultado__fecha_inicio'), output_field=DurationField()),
+            filter=Q(resultado__fecha_inicio__isnull=False, resultado__fecha_fin__isnull=False),
+        ),
+    )
+    duracion = estadisticas['duracion_promedio']
+    return {
+        'total_participantes': estadisticas['total'],
+        'promedio_puntos': estadisticas['promedio_puntos'] or 0,
+        'promedio_tiempo': duracion.total_seconds() / 60 if duracion else 0,
+    }
+
+
+# --- MANTENIMIENTO ---
+
+def _bloquear_evaluacion(evaluacion_id):
+    """Serializa las actualizaciones del ranking de una evaluación dentro de la transacción actual"""
+    BloqueoRanking.objects.select_for_update().get_or_create(evaluacion_id=evaluacion_id)
+
+
+def reconstruir_ranking(evaluacion):
+    """Recalcula todas las entradas de la evaluación desde los intentos. Retorna cuántas quedaron."""
+    with transaction.atomic():
+        _bloquear_evaluacion(evaluacion.pk)
+        filas = list(consultar_ranking(evaluacion).values_list(
+            'pk', 'participante_id', 'puntos_obtenidos', 'tiempo_utilizado', 'posicion'
+        ))
+        colegios = nombres_colegios([fila[1] for fila in filas])
+        EntradaRanking.objects.filter(evaluacion=evaluacion).delete()
+        EntradaRanking.objects.bulk_create([
+            EntradaRanking(
+                evaluacion_id=evaluacion.pk,
+                participante_id=participante_id,
+                resultado_id=resultado_id,
+                puntos_obtenidos=puntos,
+                tiempo_utilizado=tiempo,
+                posicion=posicion,
+                colegio_nombre=colegios.get(participante_id, ''),
+            )
+            for resultado_id, participante_id, puntos, tiempo, posicion in filas
+        ], batch_size=1000)
+    return len(filas)
+
+
+def actualizar_participante(evaluacion_id, participante_id):
+    """
+    Vuelve a elegir el mejor intento del participante y mueve su entrada a la posición que le
+    corresponde, desplazando solo las entradas entre la posición anterior y la nueva.
+    """
+    entradas = EntradaRanking.objects.filter(evaluacion_id=evaluacion_id)
+    if not entradas.exists():
+        # Sin tabla aún (o evaluación eliminada): la primera lectura la reconstruye completa
+        return
+    with transaction.atomic():
+        _bloquear_evaluacion(evaluacion_id)
+        actual = entradas.filter(participante_id=participante_id).first()
+        mejor = completados(evaluacion_id).filter(participante_id=participante_id).order_by(*ORDEN_RANKING).values(
+            'pk', 'puntos_obtenidos', 'tiempo_utilizado'
+        ).first()
+        if actual and mejor and (actual.resultado_id, actual.puntos_obtenidos, actual.tiempo_utilizado) == (
+            mejor['pk'], mejor['puntos_obtenidos'], mejor['tiempo_utilizado']
+        ):
+            return
+
+        if mejor is None:
+            if actual:
+                actual.delete()
+                entradas.filter(posicion__gt=actual.posicion).update(posicion=F('posicion') - 1)
+            return
+
+        # Posición entre las demás entradas: cuántas van por delante del nuevo mejor intento
+        posicion = entradas.exclude(participante_id=participante_id).filter(
+            Q(puntos_obtenidos__gt=mejor['puntos_obtenidos'])
+            | Q(puntos_obtenidos=mejor['puntos_obtenidos'], tiempo_utilizado__lt=mejor['tiempo_utilizado'])
+            | Q(puntos_obtenidos=mejor['puntos_obtenidos'], tiempo_utilizado=mejor['tiempo_utilizado'], resultado_id__lt=mejor['pk'])
+        ).count() + 1
+
+        if actual is None:
+            entradas.filter(posicion__gte=posicion).update(posicion=F('posicion') + 1)
+            EntradaRanking.objects.create(
+                evaluacion_id=evaluacion_id,
+                participante_id=participante_id,
+                resultado_id=mejor['pk'],
+                puntos_obtenidos=mejor['puntos_obtenidos'],
+                tiempo_utilizado=mejor['tiempo_utilizado'],
+                posicion=posicion,
+                colegio_nombre=nombres_colegios([participante_id]).get(participante_id, ''),
+            )
+            return
+
+        if posicion < actual.posicion:
+            entradas.filter(posicion__gte=posicion, posicion__lt=actual.posicion).update(posicion=F('posicion') + 1)
+        elif posicion > actual.posicion:
+            entradas.filter(posicion__gt=actual.posicion, posicion__lte=posicion).update(posicion=F('posicion') - 1)
+        actual.resultado_id = mejor['pk']
+        actual.puntos_obtenidos = mejor['puntos_obtenidos']
+        actual.tiempo_utilizado = mejor['tiempo_utilizado']
+        actual.posicion = posicion
+        actual.save(update_fields=['resultado', 'puntos_obtenidos', 'tiempo_utilizado', 'posicion'])
+
+
+def actualizar_participante_al_confirmar(evaluacion_id, participante_id):
+    """Programa actualizar_participante para cuando se confirme la transacción actual"""
+    transaction.on_commit(lambda: _actualizar_o_reconstruir(evaluacion_id, participante_id))
+
+
+def _actualizar_o_reconstruir(evaluacion_id, participante_id):
+    # Corre después de confirmada la entrega: un error aquí no debe convertirla en un error 500
+    try:
+        actualizar_participante(evaluacion_id, participante_id)
+        return
+    except Exception:
+        logger.exception(
+            'No se pudo mover la entrada del participante %s en el ranking de la evaluación %s; se reconstruye',
+            participante_id, evaluacion_id
+        )
+    try:
+        reconstruir_ranking(Evaluacion(pk=evaluacion_id))
+    except Exception:
+        # La tabla queda desactualizada hasta el comando reconstruir_ranking
+        logger.exception('No se pudo reconstruir el ranking de la evaluación %s', evaluacion_id)
+
+
+def actualizar_participantes(evaluacion, participante_ids):
+    """Actualiza el ranking tras un lote de intentos cerrados o finalizados en bloque"""
+    participante_ids = set(participante_ids)
+    if len(participante_ids) > LIMITE_INCREMENTAL:
+        if EntradaRanking.objects.filter(evaluacion=evaluacion).exists():
+            reconstruir_ranking(evaluacion)
+        return
+    for participante_id in participante_ids:
+        actualizar_participante(evaluacion.pk, participante_id)
+
+
+def actualizar_colegios(participante_ids=None):
+    """Refresca el colegio de las entradas de los participantes indicados (o de todas)"""
+    entradas = EntradaRanking.objects.all()
+    if participante_ids is not None:
+        entradas = entradas.filter(participante_id__in=participante_ids)
+    ids = set(entradas.values_list('participante_id', flat=True))
+    if not ids:
+        return
+    colegios = nombres_colegios(ids)
+    por_colegio = defaultdict(list)
+    for participante_id in ids:
+        por_colegio[colegios.get(participante_id, '')].append(participante_id)
+    for nombre, ids_colegio in por_colegio.items():
+        entradas.filter(participante_id__in=ids_colegio).exclude(colegio_nombre=nombre).update(colegio_nombre=nombre)
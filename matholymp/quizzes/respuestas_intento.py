@@ -0,0 +1,101 @@
+"""
+Respuestas normalizadas de los intentos entregados (RespuestaIntento).
+
+Al finalizar un intento, su snapshot congelado se descompone en una fila por pregunta (opción
+elegida, corrección y puntos) insertada con bulk_create. El receptor de post_save de
+ResultadoEvaluacion las registra en cada entrega; el cierre en bloque de intentos vencidos y el
+comando poblar_respuestas_intento (para los snapshots históricos) llaman directamente a
+registrar_respuestas.
+
+Con estas filas las estadísticas por pregunta y por categoría son agregados GROUP BY que resuelve
+la base de datos, sin cargar en memoria el JSON de respuestas_guardadas de cada intento.
+"""
+
+from django.db.models import Count, Exists, OuterRef, Q
+
+from .models import Opcion, Pregunta, RespuestaIntento
+
+
+def tiene_snapshot(respuestas_guardadas):
+    return isinstance(respuestas_guardadas, dict) and 'preguntas_snapshot' in respuestas_guardadas
+
+
+def registrar_respuestas(resultados):
+    """
+    Reemplaza las respuestas normalizadas de los intentos indicados por las de su snapshot.
+    Los intentos sin snapshot (en curso o finalizados sin calificar) se ignoran.
+    Retorna la cantidad de filas insertadas.
+    """
+    resultados = [resultado for resultado in resultados if tiene_snapshot(resultado.respuestas_guardadas)]
+    if not resultados:
+        return 0
+
+    items = [
+        (resultado, item)
+        for resultado in resultados
+        for item in resultado.respuestas_guardadas['preguntas_snapshot']
+        if item.get('pregunta_id')
+    ]
+    # Los snapshots conservan preguntas u opciones que pudieron eliminarse después de la entrega
+    preguntas = set(Pregunta.objects.filter(
+        pk__in={item['pregunta_id'] for _, item in items}
+    ).values_list('id', flat=True))
+    opciones = set(Opcion.objects.filter(
+        pk__in={item['respuesta_estudiante_id'] for _, item in items if item.get('respuesta_estudiante_id')}
+    ).values_list('id', flat=True))
+
+    filas = []
+    for resultado, item in items:
+        if item['pregunta_id'] not in preguntas:
+            continue
+        opcion_id = item.get('respuesta_estudiante_id')
+        filas.append(RespuestaIntento(
+            resultado_id=resultado.pk,
+            evaluacion_id=resultado.evaluacion_id,
+            pregunta_id=item['pregunta_id'],
+            opcion_id=opcion_id if opcion_id in opciones else None,
+            es_correcta=bool(item.get('es_correcta')),
+            puntos_pregunta=item.get('puntos_pregunta') or 1,
+            puntos_ganados=item.get('puntos_ganados') or 0,
+        ))
+
+    RespuestaIntento.objects.filter(resultado__in=[resultado.pk for resultado in resultados]).delete()
+    RespuestaIntento.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
+
+
+def con_respuestas_normalizadas():
+    """Expresión para filtrar o anotar los ResultadoEvaluacion que ya tienen sus respuestas normalizadas"""
+    return Exists(RespuestaIntento.objects.filter(resultado=OuterRef('pk')))
+
+
+def _conteos():
+    return {
+        'correctas': Count('id', filter=Q(es_correcta=True)),
+        'incorrectas': Count('id', filter=Q(es_correcta=False, opcion__isnull=False)),
+        'sin_responder': Count('id', filter=Q(opcion__isnull=True)),
+    }
+
+
+def estadisticas_preguntas(resultados):
+    """
+    Correctas, incorrectas y sin responder de cada pregunta en los intentos indicados.
+
+    Returns:
+        dict: {pregunta_id: {'correctas', 'incorrectas', 'sin_responder'}}
+    """
+    filas = RespuestaIntento.objects.filter(resultado__in=resultados).values('pregunta_id').annotate(**_conteos())
+    return {fila.pop('pregunta_id'): fila for fila in filas}
+
+
+def estadisticas_categorias(resultados):
+    """
+    Correctas, incorrectas y sin responder agregadas por categoría de la pregunta.
+
+    Returns:
+        dict: {categoria_id: {'correctas', 'incorrectas', 'sin_responder', 'preguntas'}}
+    """
+    filas = RespuestaIntento.objects.filter(resultado__in=resultados).values(
+        'pregunta__categoria_id'
+    ).annotate(preguntas=Count('pregunta_id', distinct=True), **_conteos())
+    return {fila.pop('pregunta__categoria_id'): fila for fila in filas}
@@ -0,0 +1,13 @@
+"""
+Rutas WebSocket de la aplicación quizzes, montadas en olymp/asgi.py.
+"""
+
+from django.urls import path
+
+from . import consumers
+
+
+websocket_urlpatterns = [
+    path('ws/monitoreo/<int:pk>/', consumers.MonitoreoEvaluacionConsumer.as_asgi()),
+    path('ws/evaluacion/<int:pk>/', consumers.EstudianteEvaluacionConsumer.as_asgi()),
+]
@@ -153,4 +153,290 @@ def audit_resultado_delete(sender, instance, **kwargs):
         detalles = f"Eliminó el intento de examen de '{instance.participante}' en '{instance.evaluacion.title}'"
         AuditLog.registrar_accion(usuario_ejecutor=user, accion='ELIMINACION_INTENTO', detalles=detalles, ip_address=ip)
     except Exception:
-        pass
\ No newline at end of file
+        pass
+
+# --- INVALIDACIÓN DE LA CACHÉ DE PARTICIPANTES AUTORIZADOS ---
+
+from django.db.models.signals import m2m_changed
+from .models import GrupoParticipantes
+
+CAMBIOS_M2M = ('post_add', 'post_remove', 'post_clear')
+
+
+@receiver(m2m_changed, sender=Evaluacion.grupos_participantes.through)
+@receiver(m2m_changed, sender=Evaluacion.participantes_individuales.through)
+def invalidar_roster_evaluacion(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalida la caché de autorizados cuando cambian los grupos o individuales de una evaluación"""
+    if action not in CAMBIOS_M2M:
+        return
+    if not reverse:
+        Evaluacion.invalidar_roster(pk=instance.pk)
+    elif pk_set:
+        Evaluacion.invalidar_roster(pk__in=pk_set)
+    else:
+        Evaluacion.invalidar_roster()
+
+
+@receiver(m2m_changed, sender=GrupoParticipantes.participantes.through)
+def invalidar_roster_grupo(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalida la caché de autorizados de las evaluaciones que incluyen un grupo modificado"""
+    if action not in CAMBIOS_M2M:
+        return
+    if not reverse:
+        Evaluacion.invalidar_roster(grupos_participantes=instance)
+    elif pk_set:
+        Evaluacion.invalidar_roster(grupos_participantes__in=pk_set)
+    else:
+        Evaluacion.invalidar_roster(etapa=1)
+
+
+@receiver(post_save, sender=Evaluacion)
+def invalidar_roster_evaluacion_editada(sender, instance, created, **kwargs):
+    """La etapa o el año de una evaluación determinan quiénes están autorizados"""
+    if not created:
+        Evaluacion.invalidar_roster(pk=instance.pk)
+
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+@receiver(post_delete, sender=ResultadoEvaluacion)
+def invalidar_roster_clasificados(sender, instance, **kwargs):
+    """Un resultado completado puede cambiar los clasificados de las etapas siguientes"""
+    if not instance.completada:
+        return
+    evaluacion = Evaluacion.objects.filter(pk=instance.evaluacion_id).values('etapa', 'anio').first()
+    if evaluacion:
+        Evaluacion.invalidar_roster(anio=evaluacion['anio'], etapa__gt=evaluacion['etapa'])
+
+
+# --- INVALIDACIÓN DE LA CACHÉ DE LA CLAVE DE RESPUESTAS ---
+
+from .models import Opcion
+
+
+@receiver(post_save, sender=Pregunta)
+@receiver(post_delete, sender=Pregunta)
+def invalidar_clave_pregunta(sender, instance, **kwargs):
+    """Crear, editar (texto o puntos) o eliminar una pregunta cambia la clave de respuestas"""
+    Evaluacion.invalidar_clave_respuestas(instance.evaluacion_id)
+
+
+@receiver(post_save, sender=Opcion)
+@receiver(post_delete, sender=Opcion)
+def invalidar_clave_opcion(sender, instance, **kwargs):
+    """Crear, editar o eliminar una opción cambia la clave de respuestas"""
+    evaluacion_id = Pregunta.objects.filter(pk=instance.pregunta_id).values_list('evaluacion_id', flat=True).first()
+    if evaluacion_id:
+        Evaluacion.invalidar_clave_respuestas(evaluacion_id)
+
+
+# --- INVALIDACIÓN DEL ESTADO CACHEADO DEL INTENTO ---
+
+from .estado_intento import invalidar_estado_intento
+
+# Campos que el estudiante actualiza durante el intento sin alterar el estado cacheado
+CAMPOS_SIN_ESTADO = {'ultima_actividad', 'tiempo_restante', 'respuestas_guardadas', 'secuencia_guardado'}
+
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+@receiver(post_delete, sender=ResultadoEvaluacion)
+def invalidar_estado_resultado(sender, instance, update_fields=None, **kwargs):
+    """Crear, entregar, finalizar por administración o cambiar pestañas modifica el estado del intento"""
+    if update_fields and set(update_fields) <= CAMPOS_SIN_ESTADO:
+        return
+    user_id = Participantes.objects.filter(pk=instance.participante_id).values_list('user_id', flat=True).first()
+    if user_id:
+        invalidar_estado_intento(instance.evaluacion_id, user_id)
+
+
+# --- NOTIFICACIONES EN TIEMPO REAL AL ESTUDIANTE ---
+
+from .estado_intento import invalidar_estados_intento
+from .notificaciones_estudiante import difundir_evaluacion, notificar_estudiante
+
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+def notificar_estado_estudiante(sender, instance, created, update_fields=None, **kwargs):
+    """Finalización administrativa, reducción de cambios de pestaña o cierre del intento por otro usuario"""
+    if created or (update_fields and set(update_fields) <= CAMPOS_SIN_ESTADO):
+        return
+    user_id = Participantes.objects.filter(pk=instance.participante_id).values_list('user_id', flat=True).first()
+    usuario_actual = get_current_user()
+    # La petición del propio estudiante ya le responde con el nuevo estado
+    if user_id and not (usuario_actual and usuario_actual.pk == user_id):
+        notificar_estudiante(instance.evaluacion_id, user_id)
+
+
+@receiver(post_save, sender=Evaluacion)
+def difundir_evaluacion_editada(sender, instance, created, **kwargs):
+    """Una edición (p. ej. de la duración) cambia el tiempo restante de los intentos en curso"""
+    if created:
+        return
+    user_ids = Participantes.objects.filter(
+        resultados__evaluacion=instance, resultados__completada=False
+    ).values_list('user_id', flat=True)
+    invalidar_estados_intento(instance.pk, [user_id for user_id in user_ids if user_id])
+    difundir_evaluacion(instance.pk)
+
+
+# --- CONTADORES MATERIALIZADOS DEL MONITOREO ---
+# Se registran antes que las notificaciones: la notificación de un intento sin transacción se
+# publica de inmediato y el panel que la recibe lee los contadores, que ya deben incluir el ajuste.
+
+from . import contadores_monitoreo
+from .models import AlertaIntento
+
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+def actualizar_contadores_resultado(sender, instance, created, update_fields=None, **kwargs):
+    """Inicio, entrega y finalización administrativa ajustan los contadores de la evaluación"""
+    if update_fields and set(update_fields) <= CAMPOS_SIN_ESTADO:
+        return
+    contadores_monitoreo.registrar_guardado_resultado(instance, created)
+
+
+@receiver(post_delete, sender=ResultadoEvaluacion)
+@receiver(post_delete, sender=AlertaIntento)
+def descartar_contadores_eliminacion(sender, instance, **kwargs):
+    evaluacion_id = getattr(instance, 'evaluacion_id', None)
+    if evaluacion_id is None:
+        evaluacion_id = ResultadoEvaluacion.objects.filter(pk=instance.resultado_id).values_list('evaluacion_id', flat=True).first()
+    if evaluacion_id:
+        contadores_monitoreo.descartar_contadores(evaluacion_id)
+
+
+@receiver(post_save, sender=AlertaIntento)
+def contar_alerta(sender, instance, created, **kwargs):
+    if created:
+        contadores_monitoreo.registrar_alerta(instance.resultado.evaluacion_id)
+
+
+# --- NOTIFICACIONES EN TIEMPO REAL DEL PANEL DE MONITOREO ---
+
+from .models import IntentosParticipante
+from .notificaciones_monitoreo import notificar_participante
+
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+def notificar_resultado_monitoreo(sender, instance, created, update_fields=None, **kwargs):
+    """Inicio, entrega, finalización administrativa o cambio de pestaña de un intento"""
+    # Los guardados de avance o actividad no se notifican aquí: el avance lo publica el guardado automático
+    if update_fields and set(update_fields) <= CAMPOS_SIN_ESTADO:
+        return
+    if created:
+        evento = 'iniciado'
+    elif instance.completada and instance.finalizado_por_admin_id:
+        evento = 'finalizado_admin'
+    elif instance.completada:
+        evento = 'entregado'
+    elif update_fields and 'cambios_pestana' in update_fields:
+        evento = 'cambio_pestana'
+    else:
+        evento = 'actualizado'
+    notificar_participante(instance.evaluacion_id, instance.participante_id, evento)
+
+
+@receiver(post_delete, sender=ResultadoEvaluacion)
+def notificar_resultado_eliminado_monitoreo(sender, instance, **kwargs):
+    notificar_participante(instance.evaluacion_id, instance.participante_id, 'actualizado')
+
+
+@receiver(post_save, sender=AlertaIntento)
+def notificar_alerta_monitoreo(sender, instance, created, **kwargs):
+    if created:
+        resultado = instance.resultado
+        notificar_participante(resultado.evaluacion_id, resultado.participante_id, 'alerta')
+
+
+@receiver(post_save, sender=IntentosParticipante)
+def notificar_intentos_monitoreo(sender, instance, **kwargs):
+    """Un administrador otorgó intentos adicionales"""
+    notificar_participante(instance.evaluacion_id, instance.participante_id, 'intentos')
+
+
+# --- RESPUESTAS NORMALIZADAS DE LOS INTENTOS ENTREGADOS ---
+
+from .respuestas_intento import registrar_respuestas, tiene_snapshot
+
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+def registrar_respuestas_resultado(sender, instance, update_fields=None, **kwargs):
+    """Entrega, cierre por tiempo o calificación asíncrona: el snapshot congelado se normaliza"""
+    if update_fields and 'respuestas_guardadas' not in update_fields:
+        return
+    if not instance.completada or not tiene_snapshot(instance.respuestas_guardadas):
+        return
+    # La entrega por cambios de pestaña guarda dos veces el mismo snapshot; se registra una sola vez
+    if getattr(instance, '_snapshot_registrado', None) is instance.respuestas_guardadas:
+        return
+    registrar_respuestas([instance])
+    instance._snapshot_registrado = instance.respuestas_guardadas
+
+
+# --- INVALIDACIÓN DE LA CACHÉ DE ESTADÍSTICAS DE RESULTADOS ---
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+@receiver(post_delete, sender=ResultadoEvaluacion)
+def invalidar_estadisticas_resultado(sender, instance, update_fields=None, **kwargs):
+    """Inicio, entrega, finalización administrativa o eliminación de un intento cambian las estadísticas"""
+    if update_fields and set(update_fields) <= CAMPOS_SIN_ESTADO | {'cambios_pestana'}:
+        return
+    Evaluacion.invalidar_resultados(instance.evaluacion_id)
+
+
+# --- RANKING MATERIALIZADO ---
+
+from .models import EntradaRanking, Representante
+from .ranking import actualizar_colegios, actualizar_participante_al_confirmar
+
+
+@receiver(post_save, sender=ResultadoEvaluacion)
+def actualizar_ranking_resultado(sender, instance, update_fields=None, **kwargs):
+    """Entrega, cierre por tiempo o finalización administrativa: se mueve la entrada del participante"""
+    if update_fields and set(update_fields) <= CAMPOS_SIN_ESTADO | {'cambios_pestana'}:
+        return
+    if instance.completada:
+        actualizar_participante_al_confirmar(instance.evaluacion_id, instance.participante_id)
+
+
+@receiver(post_delete, sender=ResultadoEvaluacion)
+def actualizar_ranking_eliminacion(sender, instance, **kwargs):
+    """Al eliminar un intento completado la entrada pasa al siguiente mejor intento o se quita"""
+    if instance.completada:
+        actualizar_participante_al_confirmar(instance.evaluacion_id, instance.participante_id)
+
+
+@receiver(m2m_changed, sender=GrupoParticipantes.participantes.through)
+def actualizar_colegios_grupo(sender, instance, action, reverse, pk_set, **kwargs):
+    """El colegio de cada entrada sale del primer grupo del participante"""
+    if action not in CAMBIOS_M2M:
+        return
+    if reverse:
+        actualizar_colegios([instance.pk])
+    elif pk_set:
+        actualizar_colegios(pk_set)
+    else:
+        actualizar_colegios()
+
+
+@receiver(post_save, sender=GrupoParticipantes)
+def actualizar_colegios_representante_grupo(sender, instance, created, **kwargs):
+    if not created:
+        actualizar_colegios(instance.participantes.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Representante)
+def actualizar_colegios_representante(sender, instance, created, **kwargs):
+    if not created:
+        actualizar_colegios(
+            GrupoParticipantes.participantes.through.objects.filter(
+                grupoparticipantes__representante=instance
+            ).values_list('participantes_id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=Representante)
+def actualizar_colegios_representante_eliminado(sender, instance, **kwargs):
+    """Los grupos del representante quedan sin colegio (SET_NULL no dispara post_save)"""
+    actualizar_colegios(
+        EntradaRanking.objects.filter(colegio_nombre=instance.NombreColegio).values_list('participante_id', flat=True)
+    )
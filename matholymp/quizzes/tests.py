@@ -0,0 +1,101 @@
+"""
+Pruebas de regresión de los planes de consulta de las rutas críticas (ver planes_consulta.py).
+
+Cada prueba arma su propia evaluación con preguntas, participantes, intentos entregados, una
+entrega en cola, alertas y muestras del historial, llama a las vistas y tareas reales y verifica
+con EXPLAIN que ninguna de sus consultas recorra completa una tabla que crece con los intentos.
+"""
+
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import (
+    AlertaIntento, Carrera, Concurso, EntregaPendiente, Evaluacion, EvaluacionCuotaUnidad, Facultad,
+    GrupoParticipantes, MuestraMonitoreo, Opcion, Participantes, Pregunta, ResultadoEvaluacion, Tema,
+    UnidadTematica,
+)
+from .planes_consulta import SIN_CACHE, capturar_consultas, escenarios, plan_consulta, recorridos_completos
+
+
+@override_settings(CACHES=SIN_CACHE)
+class PlanesConsultaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        facultad = Facultad.objects.create(nombre='Facultad de Pruebas')
+        carrera = Carrera.objects.create(facultad=facultad, nombre='Carrera de Pruebas')
+        concurso = Concurso.objects.create(
+            carrera=carrera, nombre='Concurso de Pruebas', fecha_inicio=date.today(), fecha_fin=date.today() + timedelta(days=3)
+        )
+        unidad = UnidadTematica.objects.create(carrera=carrera, numero=1, nombre='Unidad 1')
+        tema = Tema.objects.create(unidad=unidad, nombre='Tema 1')
+        ahora = timezone.now()
+        cls.evaluacion = Evaluacion.objects.create(
+            concurso=concurso, title='Evaluación de Pruebas', etapa=1, anio=concurso.anio, duration_minutes=60,
+            start_time=ahora - timedelta(hours=1), end_time=ahora + timedelta(hours=2),
+        )
+        for numero in range(8):
+            pregunta = Pregunta.objects.create(evaluacion=cls.evaluacion, categoria=tema, text=f'Pregunta {numero}', puntos=1)
+            for opcion in range(4):
+                Opcion.objects.create(pregunta=pregunta, text=f'Opción {opcion}', is_correct=opcion == 0)
+        EvaluacionCuotaUnidad.objects.create(evaluacion=cls.evaluacion, unidad=unidad, cantidad_preguntas=5)
+
+        participantes = [
+            Participantes.create_participant(
+                f'{1700000000 + numero}', f'Participante {numero}', f'participante{numero}@example.com',
+                concurso=concurso, carrera=carrera
+            )[0]
+            for numero in range(12)
+        ]
+        grupo = GrupoParticipantes.objects.create(concurso=concurso, name='Grupo de Pruebas')
+        grupo.participantes.set(participantes)
+        cls.evaluacion.grupos_participantes.add(grupo)
+
+        # Intentos entregados (con un segundo intento para algunos), una entrega en cola y alertas
+        for numero, participante in enumerate(participantes[1:]):
+            for intento in range(1, 2 + numero % 2):
+                resultado = ResultadoEvaluacion.objects.create(
+                    evaluacion=cls.evaluacion, participante=participante, numero_intento=intento,
+                    completada=True, puntos_obtenidos=numero % 10, tiempo_utilizado=300 + numero,
+                    fecha_inicio=ahora - timedelta(minutes=50), fecha_fin=ahora - timedelta(minutes=20),
+                )
+                AlertaIntento.objects.create(resultado=resultado, tipo='cambio_pestana', descripcion='Alerta de prueba')
+        pendiente = ResultadoEvaluacion.objects.filter(evaluacion=cls.evaluacion, participante=participantes[1]).first()
+        pendiente.calificacion_pendiente = True
+        pendiente.save(update_fields=['calificacion_pendiente'])
+        EntregaPendiente.objects.create(resultado=pendiente)
+        MuestraMonitoreo.objects.bulk_create([
+            MuestraMonitoreo(evaluacion=cls.evaluacion, fecha=ahora - timedelta(days=2, minutes=minuto), intervalo=60)
+            for minuto in range(5)
+        ])
+
+        # El primer participante no tiene intentos: take_quiz le crea uno y el resto de vistas lo usa
+        cls.estudiante = participantes[0]
+        cls.participante_entregado = participantes[2]
+        cls.admin = User.objects.create_superuser('admin_pruebas', 'admin@example.com', 'clave-de-pruebas')
+
+    def test_rutas_criticas_usan_indices(self):
+        lista = escenarios(self.evaluacion, self.admin, self.estudiante.user, self.participante_entregado.pk)
+        for nombre, funcion in lista:
+            with self.subTest(escenario=nombre):
+                respuesta, consultas = capturar_consultas(funcion)
+                if hasattr(respuesta, 'status_code'):
+                    # Una redirección o un error no recorrería la ruta que se quiere verificar
+                    self.assertEqual(respuesta.status_code, 200)
+                self.assertTrue(consultas)
+                completos = {
+                    sql: recorrido
+                    for sql in consultas
+                    for recorrido in recorridos_completos(sql, plan_consulta(sql), solo_sin_indice=True)
+                }
+                self.assertEqual(completos, {})
+
+    def test_detecta_recorrido_completo(self):
+        # Un filtro por una columna sin índice debe reportarse; si no, la prueba anterior no prueba nada
+        _, consultas = capturar_consultas(lambda: list(ResultadoEvaluacion.objects.filter(tiempo_utilizado=300)))
+        plan = plan_consulta(consultas[0])
+        self.assertTrue(recorridos_completos(consultas[0], plan, solo_sin_indice=connection.vendor == 'mysql'))
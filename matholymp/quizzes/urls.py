@@ -16,12 +16,14 @@ urlpatterns = [
     path('quiz/<int:pk>/guardar/', views.guardar_respuesta_automatica, name='guardar_respuesta_automatica'),
     path('quiz/<int:pk>/progreso/', views.obtener_progreso_evaluacion, name='obtener_progreso_evaluacion'),
     path('quiz/<int:pk>/verificar-estado/', views.verificar_estado_evaluacion, name='verificar_estado_evaluacion'),
+    path('quiz/<int:pk>/heartbeat/', views.heartbeat_evaluacion, name='heartbeat_evaluacion'),
     path('quiz/<int:pk>/cambio-pestana/', views.registrar_cambio_pestana, name='registrar_cambio_pestana'),
     path('quiz/<int:pk>/auditoria/', views.registrar_evento_auditoria, name='registrar_evento_auditoria'),
     path('evaluaciones/', views.quiz_view, name='quiz'),  # Nueva URL para evaluaciones
     path('evaluaciones/crear/', views.create_evaluacion, name='create_evaluacion'),
     path('mis-resultados/', views.student_results, name='student_results'),
     path('resultado/<int:pk>/revisar/', views.revisar_intento_evaluacion, name='revisar_intento_evaluacion'),
+    path('resultado/<int:pk>/calificacion/', views.estado_calificacion, name='estado_calificacion'),
     path('resultado/<int:pk>/pdf/', views.exportar_resultado_pdf, name='exportar_resultado_pdf'),
     path('evaluacion/<int:eval_id>/preguntas/', views.manage_questions, name='manage_questions'),
     path('evaluacion/<int:eval_id>/preguntas/guardar/', views.save_question, name='save_question'),
@@ -61,6 +63,8 @@ urlpatterns = [
     path('evaluacion/<int:pk>/monitoreo/', views.monitoreo_evaluacion, name='monitoreo_evaluacion'),
     path('evaluacion/<int:pk>/monitoreo/actualizar/', views.actualizar_monitoreo, name='actualizar_monitoreo'),
     path('evaluacion/<int:pk>/monitoreo/estado/', views.obtener_estado_monitoreo, name='obtener_estado_monitoreo'),
+    path('evaluacion/<int:pk>/monitoreo/historial/', views.historial_monitoreo, name='historial_monitoreo'),
+    path('evaluacion/<int:pk>/monitoreo/acciones-masivas/', views.acciones_masivas_monitoreo, name='acciones_masivas_monitoreo'),
     path('evaluacion/<int:pk>/monitoreo/finalizar/', views.finalizar_evaluacion_admin, name='finalizar_evaluacion_admin'),
     path('evaluacion/<int:pk>/dar-nuevo-intento/', views.dar_nuevo_intento_evaluacion, name='dar_nuevo_intento_evaluacion'),
     path('evaluacion/<int:pk>/reducir-cambios-pestana/', views.reducir_cambios_pestana, name='reducir_cambios_pestana'),
@@ -1,5 +1,5 @@
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
@@ -11,8 +11,25 @@ from .email_utils import (
     generate_participants_list_email,
 )
 from .scope_utils import get_user_scope, filter_queryset_by_scope
+from .calificacion_utils import calificar_intento, obtener_diccionario_respuestas
+from .estadisticas_resultados import categorias_evaluacion, grupos_con_resultados, obtener_estadisticas_resultados
+from .ranking import cupos_clasificacion, estadisticas_ranking, filtrar_ranking, leer_ranking, resultados_de_entradas
+from .respuestas_intento import estadisticas_preguntas
+from .monitoreo_utils import (
+    contar_respondidas, leer_cursor, generar_cursor, leer_parametros_tabla, obtener_snapshot_monitoreo,
+    leer_snapshot_monitoreo, fecha_snapshot, participantes_modificados_desde, serializar_monitoreos
+)
+from .notificaciones_monitoreo import notificar_avance
+from . import diario_respuestas
+from . import cola_calificacion
+from .estado_intento import obtener_estado_intento, invalidar_estado_intento, tiempo_restante_estado, datos_latido, MAX_CAMBIOS_PESTANA
+from .contadores_monitoreo import obtener_contadores
+from .historial_monitoreo import serie_monitoreo
+from .acciones_masivas import aplicar_accion_masiva, ACCIONES_MASIVAS, LIMITE_ACCION_MASIVA
 from .decorators import superuser_required, full_access_required, admin_required
+from olymp.middleware import sin_guardar_sesion
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth import authenticate, login,logout
 from django.contrib.auth.models import User
@@ -32,8 +49,8 @@ from django.http import JsonResponse
 import os
 from django.conf import settings
 from .models import Pregunta, Opcion, Categoria
-from .models import ResultadoEvaluacion
-from django.db.models import Avg
+from .models import ResultadoEvaluacion, AlertaIntento
+from django.db.models import Avg, Count
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -206,29 +223,6 @@ def session_check(request):
     }, status=200 if request.user.is_authenticated else 403)
 
 
-def obtener_diccionario_respuestas(resultado):
-    """
-    Extrae el diccionario plano {'pregunta_102': '415'} desde respuestas_guardadas,
-    soporta diccionarios planos y snapshots congelados.
-    """
-    if not resultado or not resultado.respuestas_guardadas:
-        return {}
-        
-    data = resultado.respuestas_guardadas
-    if isinstance(data, dict):
-        if 'preguntas_snapshot' in data:
-            resp_dict = {}
-            for item in data['preguntas_snapshot']:
-                p_id = item.get('pregunta_id')
-                o_id = item.get('respuesta_estudiante_id')
-                if p_id and o_id:
-                    resp_dict[f'pregunta_{p_id}'] = str(o_id)
-                    resp_dict[str(p_id)] = str(o_id)
-            return resp_dict
-        return data
-    return {}
-
-
 def obtener_progreso_respuestas(resultado, preguntas_mostradas):
     """Cuenta respuestas válidas del intento sin depender del modelo de monitoreo eliminado."""
     respuestas = obtener_diccionario_respuestas(resultado)
@@ -239,71 +233,6 @@ def obtener_progreso_respuestas(resultado, preguntas_mostradas):
     return respondidas, len(preguntas_mostradas)
 
 
-def generar_snapshot_respuestas(preguntas_mostradas, respuestas_diccionario):
-    """
-    Genera un snapshot JSON congelado e inmutable al entregar un examen.
-    Preserva los textos completos de las preguntas, opciones, respuesta elegida y la opción correcta.
-    """
-    preguntas_snapshot = []
-    respuestas_diccionario = respuestas_diccionario or {}
-    
-    for pregunta in preguntas_mostradas:
-        pregunta_key = f'pregunta_{pregunta.id}'
-        opcion_seleccionada_id_raw = respuestas_diccionario.get(pregunta_key)
-        
-        opciones_list = []
-        opcion_seleccionada_dict = None
-        opcion_correcta_dict = None
-        es_correcta = False
-        
-        opciones_qs = pregunta.opciones.all()
-        for opcion in opciones_qs:
-            es_sel = False
-            if opcion_seleccionada_id_raw is not None:
-                es_sel = (str(opcion.id) == str(opcion_seleccionada_id_raw))
-                
-            opcion_info = {
-                'id': opcion.id,
-                'text': opcion.text,
-                'is_correct': opcion.is_correct,
-                'seleccionada': es_sel
-            }
-            opciones_list.append(opcion_info)
-            
-            if opcion.is_correct:
-                opcion_correcta_dict = opcion_info
-            
-            if es_sel:
-                opcion_seleccionada_dict = opcion_info
-                if opcion.is_correct:
-                    es_correcta = True
-                    
-        peso = getattr(pregunta, 'puntos', 1) or 1
-        puntos_ganados = peso if es_correcta else 0
-        
-        opcion_id_int = None
-        if opcion_seleccionada_id_raw is not None and str(opcion_seleccionada_id_raw).isdigit():
-            opcion_id_int = int(opcion_seleccionada_id_raw)
-            
-        preguntas_snapshot.append({
-            'pregunta_id': pregunta.id,
-            'text': pregunta.text,
-            'puntos_pregunta': peso,
-            'puntos_ganados': puntos_ganados,
-            'es_correcta': es_correcta,
-            'opciones': opciones_list,
-            'respuesta_estudiante_id': opcion_id_int,
-            'respuesta_estudiante': opcion_seleccionada_dict,
-            'opcion_correcta': opcion_correcta_dict
-        })
-        
-    return {
-        'completada': True,
-        'fecha_entrega': timezone.now().isoformat(),
-        'preguntas_snapshot': preguntas_snapshot
-    }
-
-
 @login_required
 def take_quiz(request, pk):
     evaluacion = get_object_or_404(Evaluacion, pk=pk)
@@ -317,8 +246,7 @@ def take_quiz(request, pk):
     participante = Participantes.objects.get(user=request.user)
     
     # Verificar que el participante esté autorizado para esta evaluación
-    participantes_autorizados = evaluacion.get_participantes_autorizados()
-    if participante not in participantes_autorizados:
+    if not evaluacion.is_participante_autorizado(participante.id):
         messages.error(request, 'No estás autorizado para rendir esta evaluación.')
         return redirect('quizzes:quiz')
 
@@ -336,6 +264,11 @@ def take_quiz(request, pk):
         completada=False
     ).first()
     
+    # Con escritura diferida, las respuestas pendientes del intento (de cualquier worker) se vacían
+    # antes de leerlas: la entrega, el cierre por tiempo y por cambios de pestaña califican con ellas
+    if resultado_activo and diario_respuestas.write_behind_activo():
+        diario_respuestas.diario.vaciar_antes_de_cerrar([resultado_activo])
+    
     # Si hay un intento activo, el servidor es la única fuente de verdad del tiempo.
     continuar_evaluacion = False
     if resultado_activo:
@@ -348,24 +281,9 @@ def take_quiz(request, pk):
         else:
             # El intento caducado se cierra antes de permitir cualquier nuevo ingreso.
             respuestas_guardadas = resultado_activo.respuestas_guardadas or {}
-            preguntas_mostradas = evaluacion.get_preguntas_para_estudiante(
-                participante.id, resultado_activo.numero_intento
-            )
-            puntos_ganados = 0
-            puntos_posibles_totales = 0
-            for pregunta in preguntas_mostradas:
-                peso = getattr(pregunta, 'puntos', 1) or 1
-                puntos_posibles_totales += peso
-                pregunta_key = f'pregunta_{pregunta.id}'
-                respuesta_id = respuestas_guardadas.get(pregunta_key)
-                if respuesta_id and pregunta.opciones.filter(id=respuesta_id, is_correct=True).exists():
-                    puntos_ganados += peso
-
-            puntaje_ponderado = round(
-                (puntos_ganados / puntos_posibles_totales) * 10, 3
-            ) if puntos_posibles_totales else 0
-            snapshot_data = generar_snapshot_respuestas(preguntas_mostradas, respuestas_guardadas)
-            resultado_activo.puntos_obtenidos = puntaje_ponderado
+            calificacion = calificar_intento(evaluacion, resultado_activo.get_plan_ids(), respuestas_guardadas)
+            snapshot_data = calificacion['snapshot']
+            resultado_activo.puntos_obtenidos = calificacion['puntaje']
             resultado_activo.puntos_totales = 10
             resultado_activo.tiempo_utilizado = evaluacion.duration_minutes * 60
             resultado_activo.fecha_fin = timezone.now()
@@ -373,6 +291,7 @@ def take_quiz(request, pk):
             resultado_activo.respuestas_guardadas = snapshot_data
             resultado_activo.tiempo_restante = 0
             resultado_activo.save()
+            invalidar_estado_intento(evaluacion.pk, request.user.pk)
             messages.warning(request, 'Se acabó el tiempo para esta evaluación.')
             return redirect('quizzes:quiz')
     
@@ -393,8 +312,11 @@ def take_quiz(request, pk):
     if request.method == 'POST':
         # Verificar si la evaluación fue finalizada por cambios de pestaña
         finalizada_por_cambios_pestana = request.POST.get('finalizada_por_cambios_pestana') == 'true'
-        numero_intento_actual = resultado_activo.numero_intento if resultado_activo else 1
-        preguntas_mostradas = evaluacion.get_preguntas_para_estudiante(participante.id, numero_intento_actual)
+        # La calificación trabaja sobre los IDs del plan y la clave de respuestas cacheada
+        if resultado_activo:
+            preguntas_ids = resultado_activo.get_plan_ids()
+        else:
+            preguntas_ids = evaluacion.calcular_plan_preguntas(participante.id, 1)
         
         if finalizada_por_cambios_pestana:
             # Finalización por cambios de pestaña - asignar puntaje de 0
@@ -414,25 +336,39 @@ def take_quiz(request, pk):
             respuestas_finales = {}
             if resultado_activo and resultado_activo.respuestas_guardadas:
                 respuestas_finales = resultado_activo.respuestas_guardadas
+            calificacion = calificar_intento(evaluacion, preguntas_ids, respuestas_finales)
+            
+        elif resultado_activo and cola_calificacion.calificacion_asincrona_activa():
+            # Entrega asíncrona: se registran las respuestas y el worker califica y congela el snapshot
+            respuestas_finales = {
+                f'pregunta_{pregunta_id}': request.POST.get(f'pregunta_{pregunta_id}')
+                for pregunta_id in preguntas_ids
+            }
+            if resultado_activo.fecha_inicio:
+                tiempo_utilizado = int((timezone.now() - resultado_activo.fecha_inicio).total_seconds())
+            else:
+                tiempo_utilizado = evaluacion.duration_minutes * 60 - calcular_tiempo_restante_servidor(resultado_activo, evaluacion)
+            cola_calificacion.aceptar_entrega(resultado_activo, respuestas_finales, tiempo_utilizado)
+            invalidar_estado_intento(evaluacion.pk, request.user.pk)
+            
+            return render(request, 'quizzes/result.html', {
+                'evaluacion': evaluacion,
+                'resultado': resultado_activo,
+                'score': 0,
+                'total_questions': len(preguntas_ids),
+                'percentage': None,
+                'finalizada_por_cambios_pestana': False,
+            })
             
         else:
             # Procesar envío normal de evaluación con nuevo sistema de puntuación
             score = 0
-            puntos_ganados = 0
-            puntos_posibles_totales = 0
-            respuestas_finales = {}
-            for pregunta in preguntas_mostradas:
-                selected = request.POST.get(f'pregunta_{pregunta.id}')
-                respuestas_finales[f'pregunta_{pregunta.id}'] = selected
-                peso = getattr(pregunta, 'puntos', 1) or 1
-                puntos_posibles_totales += peso
-                
-                if selected:
-                    if pregunta.opciones.filter(id=selected, is_correct=True).exists():
-                        puntos_ganados += peso
-                   
-            puntaje_ponderado = (puntos_ganados / puntos_posibles_totales) * 10 if puntos_posibles_totales > 0 else 0
-            puntos_obtenidos = round(max(0, puntaje_ponderado), 3)
+            respuestas_finales = {
+                f'pregunta_{pregunta_id}': request.POST.get(f'pregunta_{pregunta_id}')
+                for pregunta_id in preguntas_ids
+            }
+            calificacion = calificar_intento(evaluacion, preguntas_ids, respuestas_finales)
+            puntos_obtenidos = calificacion['puntaje']
             puntos_totales = 10
             percentage = round((puntos_obtenidos / puntos_totales) * 100, 1)
             
@@ -444,8 +380,8 @@ def take_quiz(request, pk):
                 tiempo_restante = int(request.POST.get('tiempo_restante', 0))
                 tiempo_utilizado = max(0, tiempo_total - tiempo_restante)
         
-        # Generar snapshot congelado para inmutabilidad del examen entregado
-        snapshot_data = generar_snapshot_respuestas(preguntas_mostradas, respuestas_finales)
+        # Snapshot congelado para inmutabilidad del examen entregado
+        snapshot_data = calificacion['snapshot']
         
         # Guardar resultado en la base de datos con nuevo sistema de puntuación
         if resultado_activo:
@@ -483,6 +419,7 @@ def take_quiz(request, pk):
                 fecha_fin=timezone.now(),
                 completada=True,
                 respuestas_guardadas=snapshot_data,
+                plan_preguntas=preguntas_ids,
                 tiempo_restante=0
             )
             
@@ -497,6 +434,9 @@ def take_quiz(request, pk):
                 nuevo_resultado.fecha_finalizacion_admin = timezone.now()
                 nuevo_resultado.save()
         
+        # El intento quedó entregado (o finalizado por cambios de pestaña): el latido debe verlo ya
+        invalidar_estado_intento(evaluacion.pk, request.user.pk)
+        
         # Agregar un mensaje específico si fue finalizada por cambios de pestaña
         if finalizada_por_cambios_pestana:
             messages.warning(request, 'Tu evaluación fue finalizada automáticamente por exceder el límite de cambios de pestaña permitidos (4/4). Tu puntaje es 0/10.')
@@ -505,19 +445,19 @@ def take_quiz(request, pk):
             'evaluacion': evaluacion, 
             'resultado': resultado_activo if resultado_activo else nuevo_resultado,
             'score': score,
-            'total_questions': len(preguntas_mostradas) if not finalizada_por_cambios_pestana else 0,
+            'total_questions': len(preguntas_ids) if not finalizada_por_cambios_pestana else 0,
             'percentage': percentage,
             'finalizada_por_cambios_pestana': finalizada_por_cambios_pestana,
         })
     
     # Obtener preguntas para este estudiante específico
-    # Si hay un resultado activo, usar su número de intento, si no, obtener el siguiente
+    # Si hay un resultado activo, usar su plan congelado; si no, calcular el plan del siguiente intento
     if resultado_activo:
-        numero_intento = resultado_activo.numero_intento
+        preguntas_mostradas = resultado_activo.get_preguntas_plan()
     else:
         numero_intento = ResultadoEvaluacion.get_siguiente_numero_intento(evaluacion, participante)
-    
-    preguntas_mostradas = evaluacion.get_preguntas_para_estudiante(participante.id, numero_intento)
+        plan_preguntas = evaluacion.calcular_plan_preguntas(participante.id, numero_intento)
+        preguntas_mostradas = evaluacion.cargar_preguntas_plan(plan_preguntas)
     
     if not preguntas_mostradas:
         messages.error(request, 'Esta evaluación no tiene preguntas configuradas.')
@@ -527,16 +467,16 @@ def take_quiz(request, pk):
     if not continuar_evaluacion:
         tiempo_total = evaluacion.duration_minutes * 60  # en segundos
         
-        # Obtener el siguiente número de intento
-        siguiente_intento = ResultadoEvaluacion.get_siguiente_numero_intento(evaluacion, participante)
-        
+        # El plan de preguntas queda congelado en el intento desde su creación
         resultado_activo = ResultadoEvaluacion.objects.create(
             evaluacion=evaluacion,
             participante=participante,
-            numero_intento=siguiente_intento,
+            numero_intento=numero_intento,
             fecha_inicio=timezone.now(),
-            tiempo_restante=tiempo_total
+            tiempo_restante=tiempo_total,
+            plan_preguntas=[pregunta.id for pregunta in preguntas_mostradas]
         )
+        invalidar_estado_intento(evaluacion.pk, request.user.pk)
         
     context = {
         'evaluacion': evaluacion,
@@ -557,67 +497,72 @@ def guardar_respuesta_automatica(request, pk):
         return JsonResponse({'success': False, 'error': 'Método no permitido'})
     
     try:
-        evaluacion = get_object_or_404(Evaluacion, pk=pk)
-        participante = Participantes.objects.get(user=request.user)
-        
-        # Verificar que el participante esté autorizado
-        participantes_autorizados = evaluacion.get_participantes_autorizados()
-        if participante not in participantes_autorizados:
+        # Participante, autorización e intento activo salen del estado cacheado del intento
+        estado = obtener_estado_intento(pk, request.user)
+        if not estado or not estado['autorizado']:
             return JsonResponse({'success': False, 'error': 'No autorizado'})
         
         # Verificar si la evaluación fue finalizada administrativamente.
-        resultado_finalizado_admin = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion,
-            participante=participante,
-            completada=True,
-            finalizado_por_admin__isnull=False
-        ).order_by('-numero_intento').first()
-        
-        if resultado_finalizado_admin:
+        if estado['finalizada_admin']:
             return JsonResponse({
                 'success': False, 
                 'error': 'Evaluación finalizada administrativamente',
                 'redirect': True
             })
         
-        # Obtener o crear resultado activo (no completado)
-        resultado, created = ResultadoEvaluacion.objects.get_or_create(
-            evaluacion=evaluacion,
-            participante=participante,
-            completada=False,
-            defaults={
-                'fecha_inicio': timezone.now(),
-                'tiempo_restante': evaluacion.duration_minutes * 60
-            }
-        )
+        # El intento activo lo crea take_quiz; el guardado automático solo lo actualiza
+        resultado = None
+        if estado['activo']:
+            resultado = ResultadoEvaluacion.objects.filter(
+                pk=estado['resultado_id'],
+                completada=False
+            ).only('id', 'respuestas_guardadas', 'secuencia_guardado').first()
         
-        # Verificación adicional: No permitir guardado si ya está completada
-        if resultado.completada:
+        if not resultado:
+            # El intento se cerró en el servidor (entrega, tiempo vencido o barrido): el navegador
+            # deja de guardar y vuelve a la lista de evaluaciones
+            invalidar_estado_intento(pk, request.user.pk)
             return JsonResponse({
                 'success': False, 
-                'error': 'Esta evaluación ya ha sido completada',
+                'error': 'No se encontró una evaluación activa',
+                'mensaje': 'Tu intento ya fue cerrado. Revisa tus resultados en la lista de evaluaciones.',
                 'redirect': True
             })
         
-        # Actualizar respuestas guardadas
-        import json
+        # Protocolo delta: el cliente envía solo las respuestas modificadas y un número de secuencia
         data = json.loads(request.body.decode('utf-8'))
-        respuestas = data.get('respuestas', {})
+        cambios = data.get('cambios', data.get('respuestas')) or {}
+        if not isinstance(cambios, dict):
+            return JsonResponse({'success': False, 'error': 'Formato de respuestas inválido'}, status=400)
+        cambios = {clave: valor for clave, valor in cambios.items() if str(clave).startswith('pregunta_')}
         
-        # Asegurar que respuestas_guardadas esté inicializado
-        if resultado.respuestas_guardadas is None:
-            resultado.respuestas_guardadas = {}
-        
-        # Hacer una copia del diccionario para evitar problemas de referencia
-        respuestas_actualizadas = resultado.respuestas_guardadas.copy()
-        respuestas_actualizadas.update(respuestas)
+        secuencia = data.get('secuencia')
+        if secuencia is not None:
+            try:
+                secuencia = int(secuencia)
+            except (TypeError, ValueError):
+                return JsonResponse({'success': False, 'error': 'Secuencia inválida'}, status=400)
+        
+        tiempo_restante = tiempo_restante_estado(estado)
+        respuestas = dict(resultado.respuestas_guardadas or {})
+        if diario_respuestas.write_behind_activo():
+            # Escritura diferida: el diario del worker aplica los cambios en lote
+            aplicado, secuencia_actual = diario_respuestas.diario.registrar(
+                resultado.pk, cambios, secuencia, tiempo_restante, resultado.secuencia_guardado
+            )
+            # La fila aún no tiene los guardados anteriores sin vaciar: se cuentan desde el diario
+            respuestas.update(diario_respuestas.cambios_pendientes(resultado.pk))
+        else:
+            aplicado, secuencia_actual = resultado.aplicar_respuestas_delta(
+                cambios, secuencia=secuencia, tiempo_restante=tiempo_restante
+            )
+        if not aplicado:
+            return JsonResponse({'success': False, 'stale': True, 'secuencia': secuencia_actual})
         
-        resultado.respuestas_guardadas = respuestas_actualizadas
-        resultado.tiempo_restante = calcular_tiempo_restante_servidor(resultado, evaluacion)
-        resultado.ultima_actividad = timezone.now()
-        resultado.save()
+        respuestas.update(cambios)
+        notificar_avance(pk, estado['participante_id'], contar_respondidas(respuestas))
         
-        return JsonResponse({'success': True})
+        return JsonResponse({'success': True, 'secuencia': secuencia_actual})
         
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
@@ -631,37 +576,19 @@ def registrar_cambio_pestana(request, pk):
         return JsonResponse({'success': False, 'error': 'Método no permitido'})
     
     try:
-        evaluacion = get_object_or_404(Evaluacion, pk=pk)
-        participante = Participantes.objects.get(user=request.user)
-        
-        # Verificar que el participante esté autorizado
-        participantes_autorizados = evaluacion.get_participantes_autorizados()
-        if participante not in participantes_autorizados:
+        estado = obtener_estado_intento(pk, request.user)
+        if not estado or not estado['autorizado']:
             return JsonResponse({'success': False, 'error': 'No autorizado'})
         
         # Verificar si la evaluación fue finalizada administrativamente.
-        resultado_finalizado_admin = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion,
-            participante=participante,
-            completada=True,
-            finalizado_por_admin__isnull=False
-        ).order_by('-numero_intento').first()
-        
-        if resultado_finalizado_admin:
+        if estado['finalizada_admin']:
             return JsonResponse({
                 'success': False, 
                 'error': 'Evaluación finalizada administrativamente',
                 'redirect': True
             })
         
-        # Obtener resultado actual
-        resultado = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion,
-            participante=participante,
-            completada=False
-        ).first()
-        
-        if not resultado:
+        if not estado['activo']:
             return JsonResponse({
                 'success': False, 
                 'error': 'No se encontró una evaluación activa'
@@ -669,16 +596,25 @@ def registrar_cambio_pestana(request, pk):
 
         # El navegador sólo informa el evento: el contador y tiempo se calculan aquí.
         with transaction.atomic():
-            resultado = ResultadoEvaluacion.objects.select_for_update().get(pk=resultado.pk)
+            resultado = ResultadoEvaluacion.objects.select_for_update().filter(
+                pk=estado['resultado_id'], completada=False
+            ).first()
+            if not resultado:
+                invalidar_estado_intento(pk, request.user.pk)
+                return JsonResponse({
+                    'success': False, 
+                    'error': 'No se encontró una evaluación activa'
+                })
             resultado.cambios_pestana = (resultado.cambios_pestana or 0) + 1
-            resultado.tiempo_restante = calcular_tiempo_restante_servidor(resultado, evaluacion)
+            resultado.tiempo_restante = tiempo_restante_estado(estado)
             resultado.ultima_actividad = timezone.now()
             resultado.save(update_fields=['cambios_pestana', 'tiempo_restante', 'ultima_actividad'])
 
-        cambios_pestana = resultado.cambios_pestana
-        tiempo_restante = resultado.tiempo_restante
-        alerta_texto = f"Cambio de pestaña #{cambios_pestana} - Tiempo restante: {tiempo_restante//60}:{tiempo_restante%60:02d}"
-        resultado.agregar_alerta('cambio_pestana', alerta_texto, severidad='media')
+            cambios_pestana = resultado.cambios_pestana
+            tiempo_restante = resultado.tiempo_restante
+            alerta_texto = f"Cambio de pestaña #{cambios_pestana} - Tiempo restante: {tiempo_restante//60}:{tiempo_restante%60:02d}"
+            resultado.agregar_alerta('cambio_pestana', alerta_texto, severidad='media')
+        invalidar_estado_intento(pk, request.user.pk)
         
         return JsonResponse({
             'success': True,
@@ -697,14 +633,17 @@ def registrar_evento_auditoria(request, pk):
         return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
 
     try:
-        evaluacion = get_object_or_404(Evaluacion, pk=pk)
-        participante = Participantes.objects.get(user=request.user)
-        if participante not in evaluacion.get_participantes_autorizados():
+        estado = obtener_estado_intento(pk, request.user)
+        if not estado:
+            return JsonResponse({'success': False, 'error': 'Participante no encontrado'}, status=403)
+        if not estado['autorizado']:
             return JsonResponse({'success': False, 'error': 'No autorizado'}, status=403)
 
-        resultado = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion, participante=participante, completada=False
-        ).first()
+        resultado = None
+        if estado['activo']:
+            resultado = ResultadoEvaluacion.objects.filter(
+                pk=estado['resultado_id'], completada=False
+            ).only('id').first()
         if not resultado:
             return JsonResponse({'success': False, 'error': 'No se encontró una evaluación activa'}, status=404)
 
@@ -721,8 +660,6 @@ def registrar_evento_auditoria(request, pk):
         return JsonResponse({'success': True, 'auditoria': True})
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'error': 'Datos JSON inválidos'}, status=400)
-    except Participantes.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Participante no encontrado'}, status=403)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -733,39 +670,25 @@ def verificar_estado_evaluacion(request, pk):
     y obtener el estado actualizado de cambios de pestañas
     """
     try:
-        evaluacion = get_object_or_404(Evaluacion, pk=pk)
-        participante = Participantes.objects.get(user=request.user)
-        
-        # Obtener resultado activo (no completado)
-        resultado_activo = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion,
-            participante=participante,
-            completada=False
-        ).first()
-        
-        # Verificar si la evaluación fue finalizada administrativamente.
-        resultado_finalizado_admin = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion,
-            participante=participante,
-            completada=True,
-            finalizado_por_admin__isnull=False
-        ).order_by('-numero_intento').first()
+        estado = obtener_estado_intento(pk, request.user)
+        if not estado:
+            return JsonResponse({'finalizada_admin': False, 'error': 'Participante o evaluación no encontrados'})
         
         response_data = {'finalizada_admin': False}
         
-        if resultado_finalizado_admin:
+        # Verificar si la evaluación fue finalizada administrativamente.
+        if estado['finalizada_admin']:
             response_data.update({
                 'finalizada_admin': True,
-                'motivo': resultado_finalizado_admin.motivo_finalizacion,
-                'admin': resultado_finalizado_admin.finalizado_por_admin.get_full_name() or resultado_finalizado_admin.finalizado_por_admin.username
+                'motivo': estado['motivo'],
+                'admin': estado['admin']
             })
         
         # Incluir información actualizada de cambios de pestañas si hay resultado activo
-        if resultado_activo:
-            cambios_actuales = getattr(resultado_activo, 'cambios_pestana', 0) or 0
+        if estado['activo']:
             response_data.update({
-                'cambios_pestana_actuales': cambios_actuales,
-                'cambios_pestana_maximo': 4
+                'cambios_pestana_actuales': estado['cambios_pestana'],
+                'cambios_pestana_maximo': MAX_CAMBIOS_PESTANA
             })
         
         return JsonResponse(response_data)
@@ -773,20 +696,69 @@ def verificar_estado_evaluacion(request, pk):
     except Exception as e:
         return JsonResponse({'finalizada_admin': False, 'error': str(e)})
 
+@login_required
+@sin_guardar_sesion
+def heartbeat_evaluacion(request, pk):
+    """
+    Latido único de la página de evaluación: tiempo restante calculado por el servidor,
+    finalización administrativa, cambios de pestaña y versión del estado.
+    Responde 304 si el estado no cambió respecto al ETag de If-None-Match y no reescribe la sesión.
+    """
+    estado = obtener_estado_intento(pk, request.user)
+    if not estado or not estado['autorizado'] or not estado['resultado_id']:
+        return JsonResponse({'success': False, 'error': 'No se encontró una evaluación activa'}, status=404)
+    
+    # El tiempo restante cambia cada segundo y no forma parte de la versión: el cliente lleva su reloj
+    etag = f'W/"{estado["version"]}"'
+    etags_cliente = [e.strip() for e in request.headers.get('If-None-Match', '').split(',')]
+    if etag in etags_cliente:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    
+    response = JsonResponse(datos_latido(estado))
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+@login_required
+@sin_guardar_sesion
+def estado_calificacion(request, pk):
+    """
+    Endpoint consultado por la página de resultado mientras el worker califica una entrega asíncrona
+    """
+    resultado = ResultadoEvaluacion.objects.filter(
+        pk=pk, participante__user=request.user, completada=True
+    ).values('calificacion_pendiente', 'puntos_obtenidos', 'puntos_totales').first()
+    if not resultado:
+        return JsonResponse({'success': False, 'error': 'Resultado no encontrado'}, status=404)
+    
+    if resultado['calificacion_pendiente']:
+        # Si la entrega agotó sus reintentos la página deja de consultar y muestra un aviso
+        return JsonResponse({'success': True, 'pendiente': True, 'fallida': cola_calificacion.entrega_fallida(pk)})
+    
+    return JsonResponse({
+        'success': True,
+        'pendiente': False,
+        'puntos_obtenidos': float(resultado['puntos_obtenidos']),
+        'puntaje': f"{resultado['puntos_obtenidos']:.3f}/{resultado['puntos_totales']}"
+    })
+
 @login_required
 def obtener_progreso_evaluacion(request, pk):
     """
     Vista para obtener progreso guardado de una evaluación
     """
     try:
-        evaluacion = get_object_or_404(Evaluacion, pk=pk)
-        participante = Participantes.objects.get(user=request.user)
+        estado = obtener_estado_intento(pk, request.user)
+        if not estado:
+            return JsonResponse({'success': False, 'error': 'Participante o evaluación no encontrados'})
         
-        resultado = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion,
-            participante=participante,
-            completada=False
-        ).first()
+        resultado = None
+        if estado['activo']:
+            resultado = ResultadoEvaluacion.objects.filter(
+                pk=estado['resultado_id'], completada=False
+            ).only('id', 'respuestas_guardadas', 'tiempo_restante', 'ultima_actividad').first()
         
         if resultado:
             return JsonResponse({
@@ -799,7 +771,7 @@ def obtener_progreso_evaluacion(request, pk):
             return JsonResponse({
                 'success': True,
                 'respuestas': {},
-                'tiempo_restante': evaluacion.duration_minutes * 60,
+                'tiempo_restante': estado['duracion_segundos'],
                 'ultima_actividad': None
             })
             
@@ -2008,8 +1980,7 @@ def student_quizs(request):
     # Filtrar evaluaciones autorizadas para este participante y agregar información de estado
     evaluaciones_autorizadas = []
     for evaluacion in todas_evaluaciones:
-        participantes_autorizados = evaluacion.get_participantes_autorizados()
-        if participante in participantes_autorizados:
+        if evaluacion.is_participante_autorizado(participante.id):
             # Verificar si hay un intento en progreso con tiempo restante
             resultado_activo = evaluacion.resultados.filter(
                 participante=participante, 
@@ -2078,9 +2049,8 @@ def student_results(request):
     participante = Participantes.objects.get(user=request.user)
     
     # Obtener resultados del participante
-    resultados = ResultadoEvaluacion.objects.filter(
-        participante=participante,
-        completada=True
+    resultados = ResultadoEvaluacion.calificados(
+        participante=participante
     ).select_related('evaluacion').order_by('evaluacion__etapa', '-fecha_fin')
     
     context = {
@@ -2111,6 +2081,10 @@ def revisar_intento_evaluacion(request, pk):
     if not evaluacion.is_finished():
         return redirect('quizzes:student_results')
     
+    if resultado.calificacion_pendiente:
+        messages.info(request, 'Tu entrega aún se está calificando. Intenta revisarla en unos segundos.')
+        return redirect('quizzes:student_results')
+    
     snapshot = resultado.get_snapshot_respuestas()
     preguntas_con_respuestas = []
     
@@ -2125,7 +2099,7 @@ def revisar_intento_evaluacion(request, pk):
             })
     else:
         # Fallback para exámenes legacy anteriores al snapshot
-        preguntas_del_intento = evaluacion.get_preguntas_para_estudiante(participante.id, resultado.numero_intento)
+        preguntas_del_intento = resultado.get_preguntas_plan()
         respuestas_guardadas = resultado.respuestas_guardadas or {}
         
         for pregunta in preguntas_del_intento:
@@ -2985,286 +2959,33 @@ def evaluacion_results(request, pk):
     grupo_filtro = request.GET.get('grupo', 'todos')
     categoria_filtro = request.GET.get('categoria', 'todas')
     
-    # Obtener todos los grupos disponibles para esta evaluación
-    grupos_disponibles = GrupoParticipantes.objects.filter(
-        participantes__resultados__evaluacion=evaluacion
-    ).distinct().order_by('name')
+    # Grupos y categorías disponibles para los filtros
+    grupos_disponibles = grupos_con_resultados(evaluacion)
+    categorias_disponibles = categorias_evaluacion(evaluacion)
     
-    # Obtener todas las categorías disponibles para esta evaluación
-    from .models import Categoria
-    categorias_disponibles = Categoria.objects.filter(
-        preguntas__in=evaluacion.preguntas.all()
-    ).distinct().order_by('nombre')
-    
-    # Filtrar resultados según el grupo y categoría seleccionados
+    # Resolver el grupo y la categoría seleccionados
+    grupo_seleccionado = None
     if grupo_filtro != 'todos' and grupo_filtro.isdigit():
         grupo_seleccionado = get_object_or_404(GrupoParticipantes, id=int(grupo_filtro))
-        participantes_filtrados = grupo_seleccionado.participantes.all()
-        
-        # Filtrar resultados por participantes del grupo
-        resultados_completados = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion, 
-            completada=True,
-            participante__in=participantes_filtrados
-        )
-        todos_resultados = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion,
-            participante__in=participantes_filtrados
-        )
-    else:
-        grupo_seleccionado = None
-        # Obtener todos los resultados
-        resultados_completados = ResultadoEvaluacion.objects.filter(
-            evaluacion=evaluacion, 
-            completada=True
-        )
-        todos_resultados = ResultadoEvaluacion.objects.filter(evaluacion=evaluacion)
-    
-    # Manejar filtro por categoría
-    if categoria_filtro != 'todas':
-        if categoria_filtro == 'sin_categoria':
-            categoria_seleccionada = None
-            # Filtrar preguntas sin categoría
-            preguntas_filtradas = evaluacion.preguntas.filter(categoria__isnull=True)
-        elif categoria_filtro.isdigit():
-            categoria_seleccionada = get_object_or_404(Categoria, id=int(categoria_filtro))
-            # Filtrar preguntas de la categoría seleccionada
-            preguntas_filtradas = evaluacion.preguntas.filter(categoria=categoria_seleccionada)
-        else:
-            categoria_seleccionada = None
-            preguntas_filtradas = evaluacion.preguntas.all()
-    else:
-        categoria_seleccionada = None
-        preguntas_filtradas = evaluacion.preguntas.all()
     
-    # Estadísticas de participación
-    participantes_con_resultados = todos_resultados.values_list('participante', flat=True).distinct().count()
-    participantes_completaron = resultados_completados.values_list('participante', flat=True).distinct().count()
-    participantes_en_progreso = todos_resultados.filter(completada=False).values_list('participante', flat=True).distinct().count()
+    categoria_seleccionada = None
+    if categoria_filtro.isdigit():
+        from .models import Categoria
+        categoria_seleccionada = get_object_or_404(Categoria, id=int(categoria_filtro))
+    elif categoria_filtro != 'sin_categoria':
+        categoria_filtro = 'todas'
     
-    # Obtener participantes elegibles para esta evaluación
-    if grupo_seleccionado:
-        participantes_elegibles = grupo_seleccionado.participantes.count()
-    elif evaluacion.etapa == 1:
-        participantes_elegibles = len(evaluacion.get_participantes_etapa1())
-    else:
-        # Para etapas superiores, usar todos los participantes registrados como referencia
-        participantes_elegibles = Participantes.objects.count()
-    
-    participantes_no_iniciaron = max(0, participantes_elegibles - participantes_con_resultados)
-    
-    # Calcular tasa de participación
-    tasa_participacion = (participantes_con_resultados / participantes_elegibles * 100) if participantes_elegibles > 0 else 0
-    
-    # Estadísticas de rendimiento
-    estadisticas_rendimiento = {}
-    if resultados_completados.exists():
-        from django.db.models import Avg, Max, Min
-        
-        stats = resultados_completados.aggregate(
-            promedio_puntaje=Avg('puntos_obtenidos'),
-            mejor_puntaje=Max('puntos_obtenidos'),
-            peor_puntaje=Min('puntos_obtenidos'),
-            tiempo_promedio=Avg('tiempo_utilizado')
-        )
-        
-        estadisticas_rendimiento = {
-            'promedio_porcentaje': (stats['promedio_puntaje'] / 10 * 100) if stats['promedio_puntaje'] else 0,
-            'mejor_puntaje': stats['mejor_puntaje'] if stats['mejor_puntaje'] else 0,
-            'peor_puntaje': stats['peor_puntaje'] if stats['peor_puntaje'] else 0,
-            'tiempo_promedio': int(stats['tiempo_promedio']) if stats['tiempo_promedio'] else 0,
-        }
-    else:
-        estadisticas_rendimiento = {
-            'promedio_porcentaje': 0,
-            'mejor_puntaje': 0,
-            'peor_puntaje': 0,
-            'tiempo_promedio': 0,
-        }
-    
-    # Análisis por pregunta (preparar datos para gráficos) - Optimizado
-    analisis_preguntas = []
-    
-    # Obtener todos los resultados con respuestas guardadas una sola vez
-    resultados_con_respuestas = todos_resultados.exclude(
-        respuestas_guardadas__isnull=True
-    ).exclude(
-        respuestas_guardadas={}
-    ).select_related('participante').prefetch_related('evaluacion__preguntas__opciones')
-    
-    # Crear cache de opciones correctas por pregunta para evitar consultas repetidas
-    preguntas_opciones_correctas = {}
-    for pregunta in evaluacion.preguntas.prefetch_related('opciones'):
-        opciones_correctas = {}
-        for opcion in pregunta.opciones.all():
-            opciones_correctas[opcion.id] = opcion.is_correct
-        preguntas_opciones_correctas[pregunta.id] = opciones_correctas
-    
-    # Procesar cada pregunta filtrada
-    for pregunta in preguntas_filtradas:
-        correctas = 0
-        incorrectas = 0
-        sin_responder = 0
-        
-        # Obtener las opciones correctas para esta pregunta desde el cache
-        opciones_correctas_pregunta = preguntas_opciones_correctas.get(pregunta.id, {})
-        
-        for resultado in resultados_con_respuestas:
-            respuestas = obtener_diccionario_respuestas(resultado)
-            
-            # Validar que respuestas no sea None o vacío
-            if not respuestas or not isinstance(respuestas, dict):
-                sin_responder += 1
-                continue
-            
-            # Buscar la respuesta para esta pregunta con el formato correcto
-            # Las claves se guardan como "pregunta_407", "pregunta_410", etc.
-            opcion_id = None
-            pregunta_key = f"pregunta_{pregunta.id}"
-            
-            if pregunta_key in respuestas:
-                opcion_id = respuestas[pregunta_key]
-            
-            if opcion_id is not None:
-                try:
-                    # Normalizar opcion_id a entero
-                    if isinstance(opcion_id, str) and opcion_id.isdigit():
-                        opcion_id = int(opcion_id)
-                    elif not isinstance(opcion_id, int):
-                        sin_responder += 1
-                        continue
-                    
-                    # Verificar si la respuesta es correcta usando el cache
-                    if opcion_id in opciones_correctas_pregunta:
-                        if opciones_correctas_pregunta[opcion_id]:
-                            correctas += 1
-                        else:
-                            incorrectas += 1
-                    else:
-                        # La opción no existe, contar como sin responder
-                        sin_responder += 1
-                        
-                except (ValueError, TypeError):
-                    sin_responder += 1
-            else:
-                sin_responder += 1
-        
-        # Calcular totales y porcentajes
-        total_participantes_que_respondieron = correctas + incorrectas
-        total_participantes_considerados = resultados_con_respuestas.count()
-        
-        # Para el cálculo de porcentaje de acierto, usar solo quienes respondieron
-        porcentaje_correctas = (correctas / total_participantes_que_respondieron * 100) if total_participantes_que_respondieron > 0 else 0
-        
-        analisis_preguntas.append({
-            'pregunta': pregunta,
-            'correctas': correctas,
-            'incorrectas': incorrectas,
-            'sin_responder': sin_responder,
-            'porcentaje_correctas': porcentaje_correctas,
-            'dificultad': 'Fácil' if porcentaje_correctas > 70 else 'Media' if porcentaje_correctas > 40 else 'Difícil'
-        })
-    
-    # Crear versión serializable para JavaScript
-    analisis_preguntas_json = []
-    for analisis in analisis_preguntas:
-        analisis_preguntas_json.append({
-            'pregunta_id': analisis['pregunta'].id,
-            'pregunta_text': analisis['pregunta'].text,
-            'correctas': analisis['correctas'],
-            'incorrectas': analisis['incorrectas'],
-            'sin_responder': analisis['sin_responder'],
-            'porcentaje_correctas': analisis['porcentaje_correctas'],
-            'dificultad': analisis['dificultad']
-        })
-    
-    # Análisis por categorías
-    from collections import defaultdict
-    analisis_categorias = []
-    categorias_stats = defaultdict(lambda: {
-        'preguntas': [],
-        'correctas': 0,
-        'incorrectas': 0,
-        'sin_responder': 0,
-        'total_preguntas': 0
-    })
-    
-    # Agrupar análisis de preguntas por categoría
-    for analisis in analisis_preguntas:
-        pregunta = analisis['pregunta']
-        categoria = pregunta.categoria
-        
-        if categoria:
-            categoria_key = categoria.id
-            categoria_nombre = categoria.nombre
-        else:
-            categoria_key = 'sin_categoria'
-            categoria_nombre = 'Sin categoría'
-        
-        categorias_stats[categoria_key]['categoria_nombre'] = categoria_nombre
-        categorias_stats[categoria_key]['categoria_obj'] = categoria
-        categorias_stats[categoria_key]['preguntas'].append(analisis)
-        categorias_stats[categoria_key]['correctas'] += analisis['correctas']
-        categorias_stats[categoria_key]['incorrectas'] += analisis['incorrectas']
-        categorias_stats[categoria_key]['sin_responder'] += analisis['sin_responder']
-        categorias_stats[categoria_key]['total_preguntas'] += 1
-    
-    # Calcular estadísticas finales por categoría
-    for categoria_key, stats in categorias_stats.items():
-        total_respuestas = stats['correctas'] + stats['incorrectas']
-        porcentaje_acierto = (stats['correctas'] / total_respuestas * 100) if total_respuestas > 0 else 0
-        
-        analisis_categorias.append({
-            'categoria_nombre': stats['categoria_nombre'],
-            'categoria_obj': stats['categoria_obj'],
-            'total_preguntas': stats['total_preguntas'],
-            'correctas': stats['correctas'],
-            'incorrectas': stats['incorrectas'],
-            'sin_responder': stats['sin_responder'],
-            'porcentaje_acierto': porcentaje_acierto,
-            'dificultad': 'Fácil' if porcentaje_acierto > 70 else 'Media' if porcentaje_acierto > 40 else 'Difícil',
-            'preguntas_detalle': stats['preguntas']
-        })
-    
-    # Ordenar por porcentaje de acierto descendente
-    analisis_categorias.sort(key=lambda x: x['porcentaje_acierto'], reverse=True)
+    # Participación, rendimiento, distribución y análisis por pregunta y categoría: se cachean por
+    # versión de los datos una vez cerrada la evaluación (ver estadisticas_resultados.py)
+    estadisticas = obtener_estadisticas_resultados(evaluacion, grupo_seleccionado, categoria_filtro)
 
-    # Distribución de puntajes (para gráficos)
-    distribucion_puntajes = []
-    if resultados_completados.exists():
-        # Crear rangos de puntajes
-        rangos = [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10)]
-        for rango_min, rango_max in rangos:
-            count = resultados_completados.filter(
-                puntos_obtenidos__gte=rango_min,
-                puntos_obtenidos__lt=rango_max if rango_max < 10 else 11
-            ).count()
-            distribucion_puntajes.append({
-                'rango': f'{rango_min}-{rango_max}',
-                'count': count
-            })
-    
-    # Serializar distribucion_puntajes para json_script
-    distribucion_puntajes_json = [
-        {'rango': item['rango'], 'count': item['count']}
-        for item in distribucion_puntajes
-    ]
-
-    # Serializar analisis_categorias para json_script
-    analisis_categorias_json = [
-        {
-            'nombre': cat['categoria_nombre'],
-            'porcentaje': float(cat['porcentaje_acierto']),
-            'preguntas': cat['total_preguntas'],
-            'dificultad': cat['dificultad'],
-        }
-        for cat in analisis_categorias
-    ]
+    resultados_completados = ResultadoEvaluacion.calificados(evaluacion=evaluacion)
+    if grupo_seleccionado:
+        resultados_completados = resultados_completados.filter(participante__in=grupo_seleccionado.participantes.all())
 
     context = {
         'evaluacion': evaluacion,
         'total_preguntas': evaluacion.preguntas.count(),
-        'participantes_count': participantes_elegibles,
         'evaluacion_status': evaluacion.get_status(),
         'evaluacion_status_display': evaluacion.get_status_display(),
 
@@ -3276,25 +2997,8 @@ def evaluacion_results(request, pk):
         'categoria_seleccionada': categoria_seleccionada,
         'categoria_filtro': categoria_filtro,
 
-        # Estadísticas de participación
-        'participantes_con_resultados': participantes_con_resultados,
-        'participantes_completaron': participantes_completaron,
-        'participantes_en_progreso': participantes_en_progreso,
-        'participantes_no_iniciaron': participantes_no_iniciaron,
-        'tasa_participacion': round(tasa_participacion, 1),
-
-        # Estadísticas de rendimiento
-        'estadisticas_rendimiento': estadisticas_rendimiento,
-
-        # Análisis detallado
-        'analisis_preguntas': analisis_preguntas,
-        'analisis_preguntas_json': analisis_preguntas_json,
-        'analisis_categorias': analisis_categorias,
-        'distribucion_puntajes': distribucion_puntajes,
-
-        # Versiones JSON para json_script (sin template-tags en <script>)
-        'distribucion_puntajes_json': distribucion_puntajes_json,
-        'analisis_categorias_json': analisis_categorias_json,
+        # Estadísticas de participación, rendimiento y análisis detallado
+        **estadisticas,
 
         # Top 5 resultados para mostrar
         'top_resultados': resultados_completados.order_by('-puntos_obtenidos', 'tiempo_utilizado')[:5],
@@ -3350,104 +3054,31 @@ def ranking_evaluacion(request, pk):
     # Obtener el filtro de estado
     filtro_estado = request.GET.get('estado', 'todos')
     
-    # Obtener el mejor resultado por participante ordenado por nota (desc) y tiempo en segundos (asc)
-    todos_completados = ResultadoEvaluacion.objects.filter(
-        evaluacion=evaluacion,
-        completada=True
-    ).order_by('-puntos_obtenidos', 'tiempo_utilizado').select_related('participante')
-    
-    resultados = []
-    vistos = set()
-    for r in todos_completados:
-        if r.participante_id not in vistos:
-            vistos.add(r.participante_id)
-            resultados.append(r)
-    
-    # Calcular estadísticas
-    total_participantes = len(resultados)
-    
-    # Calcular promedio de puntos obtenidos (número, no porcentaje)
-    promedio_puntos = sum(r.puntos_obtenidos for r in resultados) / total_participantes if total_participantes > 0 else 0
-    
-    # Calcular tiempo promedio real (usando fechas de inicio y fin)
-    tiempo_total_minutos = 0
-    resultados_con_tiempo_real = 0
-    
-    for resultado in resultados:
-        if resultado.fecha_inicio and resultado.fecha_fin:
-            tiempo_segundos = (resultado.fecha_fin - resultado.fecha_inicio).total_seconds()
-            tiempo_minutos = tiempo_segundos / 60
-            tiempo_total_minutos += tiempo_minutos
-            resultados_con_tiempo_real += 1
-    
-    promedio_tiempo = tiempo_total_minutos / resultados_con_tiempo_real if resultados_con_tiempo_real > 0 else 0
+    # Entradas del ranking materializado: mejor intento, posición y colegio (ver ranking.py)
+    ranking = leer_ranking(evaluacion)
+    estadisticas = estadisticas_ranking(evaluacion)
+    total_participantes = estadisticas['total_participantes']
+    num_etapas = evaluacion.concurso.num_etapas if evaluacion.concurso else 3
     
     # Determinar ganadores según la etapa y configuración
     ganadores = []
-    num_etapas = evaluacion.concurso.num_etapas if evaluacion.concurso else 3
-    if evaluacion.etapa == 1:
-        top_n = 15 if num_etapas == 3 else 5
-        if total_participantes >= top_n:
-            ganadores = resultados[:top_n]
-    elif evaluacion.etapa == 2:
-        # En flujo de 3 etapas, etapa 2 muestra top 5; en flujo de 2 etapas no debería usarse
-        if num_etapas == 3 and total_participantes >= 5:
-            ganadores = resultados[:5]
-    elif evaluacion.etapa == 3 and total_participantes >= 5:
-        ganadores = resultados[:5]
-    
-    # Aplicar filtro de estado y agregar posición real
-    # Primero pre-cargar la información de colegios para optimizar consultas
-    participante_ids = [resultado.participante.id for resultado in resultados]
-    from .models import GrupoParticipantes
-    grupos_info = {}
-    grupos_queryset = GrupoParticipantes.objects.filter(
-        participantes__id__in=participante_ids
-    ).select_related('representante').prefetch_related('participantes')
-    
-    for grupo in grupos_queryset:
-        for participante in grupo.participantes.all():
-            if participante.id not in grupos_info:
-                grupos_info[participante.id] = grupo.representante.NombreColegio if grupo.representante else None
-    
-    resultados_con_posicion = []
-    for i, resultado in enumerate(resultados, 1):
-        resultado.posicion_real = i
-        
-        # Asignar el colegio desde la información pre-cargada
-        resultado.participante.colegio_nombre = grupos_info.get(resultado.participante.id, None)
-        
-        resultados_con_posicion.append(resultado)
-    
-    resultados_filtrados = resultados_con_posicion
-    if filtro_estado == 'clasificados':
-        if evaluacion.etapa == 1:
-            top_n = 15 if num_etapas == 3 else 5
-            resultados_filtrados = resultados_con_posicion[:top_n]
-        elif evaluacion.etapa == 2:
-            if num_etapas == 3:
-                resultados_filtrados = resultados_con_posicion[:5]
-        elif evaluacion.etapa == 3:
-            resultados_filtrados = resultados_con_posicion[:5]
-    elif filtro_estado == 'no_clasificados':
-        if evaluacion.etapa == 1:
-            top_n = 15 if num_etapas == 3 else 5
-            resultados_filtrados = resultados_con_posicion[top_n:] if len(resultados_con_posicion) > top_n else []
-        elif evaluacion.etapa == 2:
-            if num_etapas == 3:
-                resultados_filtrados = resultados_con_posicion[5:] if len(resultados_con_posicion) > 5 else []
-            else:
-                resultados_filtrados = []  # En flujo de 2 etapas, etapa 2 no debería existir
-        elif evaluacion.etapa == 3:
-            resultados_filtrados = resultados_con_posicion[5:] if len(resultados_con_posicion) > 5 else []
+    cupos = cupos_clasificacion(evaluacion)
+    if cupos and total_participantes >= cupos:
+        ganadores = resultados_de_entradas(ranking.filter(posicion__lte=cupos))
+    
+    # Aplicar filtro de estado y paginar por el índice (evaluacion, posicion)
+    paginator = Paginator(filtrar_ranking(ranking, evaluacion, filtro_estado), 50)  # 50 participantes por página
+    page_obj = paginator.get_page(request.GET.get('page'))
+    resultados_pagina = resultados_de_entradas(page_obj.object_list)
     
     context = {
         'evaluacion': evaluacion,
-        'resultados': resultados_filtrados,
-        'resultados_totales': resultados,  # Guardamos los resultados completos para estadísticas
+        'resultados': resultados_pagina,
+        'page_obj': page_obj,
+        'total_filtrados': paginator.count,
         'total_participantes': total_participantes,
-        'promedio_puntaje': round(promedio_puntos, 3),  # Mostrar como número con 3 decimales
-        'promedio_tiempo': round(promedio_tiempo, 1),   # Mostrar tiempo en minutos con 1 decimal
+        'promedio_puntaje': round(estadisticas['promedio_puntos'], 3),  # Mostrar como número con 3 decimales
+        'promedio_tiempo': round(estadisticas['promedio_tiempo'], 1),   # Mostrar tiempo en minutos con 1 decimal
         'ganadores': ganadores,
         'num_etapas': num_etapas,
         'filtro_estado': filtro_estado
@@ -3680,10 +3311,9 @@ def exportar_resultado_pdf(request, pk):
         participante = Participantes.objects.get(user=request.user)
         
         # Verificar que el participante tenga resultado para esta evaluación
-        resultado = ResultadoEvaluacion.objects.filter(
+        resultado = ResultadoEvaluacion.calificados(
             evaluacion=evaluacion,
-            participante=participante,
-            completada=True
+            participante=participante
         ).first()
         
         if not resultado:
@@ -4550,68 +4180,18 @@ def exportar_ranking_pdf(request, pk):
     # Obtener el filtro de estado desde los parámetros GET
     filtro_estado = request.GET.get('estado', 'todos')
     
-    # Obtener el mejor resultado por participante ordenado por nota (desc) y tiempo en segundos (asc)
-    todos_completados = ResultadoEvaluacion.objects.filter(
-        evaluacion=evaluacion,
-        completada=True
-    ).order_by('-puntos_obtenidos', 'tiempo_utilizado').select_related('participante')
-    
-    resultados = []
-    vistos = set()
-    for r in todos_completados:
-        if r.participante_id not in vistos:
-            vistos.add(r.participante_id)
-            resultados.append(r)
-    
-    # Aplicar filtro de estado y agregar información del colegio
-    from .models import GrupoParticipantes
+    # Entradas del ranking materializado: mejor intento, posición y colegio (ver ranking.py)
+    ranking = leer_ranking(evaluacion)
+    total_general = ranking.count()
     num_etapas = evaluacion.concurso.num_etapas if evaluacion.concurso else 3
     
-    # Pre-cargar información de colegios para optimizar consultas
-    participante_ids = [resultado.participante.id for resultado in resultados]
-    grupos_info = {}
-    grupos_queryset = GrupoParticipantes.objects.filter(
-        participantes__id__in=participante_ids
-    ).select_related('representante').prefetch_related('participantes')
-    
-    for grupo in grupos_queryset:
-        for participante in grupo.participantes.all():
-            if participante.id not in grupos_info:
-                grupos_info[participante.id] = grupo.representante.NombreColegio if grupo.representante else None
-    
-    # Agregar posición real y colegio a cada resultado
-    resultados_con_info = []
-    for i, resultado in enumerate(resultados, 1):
-        resultado.posicion_real = i
-        resultado.participante.colegio_nombre = grupos_info.get(resultado.participante.id, None)
-        resultados_con_info.append(resultado)
-    
     # Aplicar filtro de estado
-    resultados_filtrados = resultados_con_info
+    resultados_filtrados = resultados_de_entradas(filtrar_ranking(ranking, evaluacion, filtro_estado))
     titulo_filtro = "Ranking Completo"
-    
     if filtro_estado == 'clasificados':
         titulo_filtro = "Participantes Clasificados"
-        if evaluacion.etapa == 1:
-            top_n = 15 if num_etapas == 3 else 5
-            resultados_filtrados = resultados_con_info[:top_n]
-        elif evaluacion.etapa == 2:
-            if num_etapas == 3:
-                resultados_filtrados = resultados_con_info[:5]
-        elif evaluacion.etapa == 3:
-            resultados_filtrados = resultados_con_info[:5]
     elif filtro_estado == 'no_clasificados':
         titulo_filtro = "Participantes No Clasificados"
-        if evaluacion.etapa == 1:
-            top_n = 15 if num_etapas == 3 else 5
-            resultados_filtrados = resultados_con_info[top_n:] if len(resultados_con_info) > top_n else []
-        elif evaluacion.etapa == 2:
-            if num_etapas == 3:
-                resultados_filtrados = resultados_con_info[5:] if len(resultados_con_info) > 5 else []
-            else:
-                resultados_filtrados = []
-        elif evaluacion.etapa == 3:
-            resultados_filtrados = resultados_con_info[5:] if len(resultados_con_info) > 5 else []
     
     # Crear el PDF
     response = HttpResponse(content_type='application/pdf')
@@ -4871,7 +4451,6 @@ def exportar_ranking_pdf(request, pk):
         )
         
         total_mostrados = len(resultados_filtrados)
-        total_general = len(resultados_con_info)
         promedio_puntos = sum(r.puntos_obtenidos for r in resultados_filtrados) / total_mostrados
         
         if filtro_estado == 'todos':
@@ -4917,9 +4496,8 @@ def exportar_resultados(request, pk):
             participantes_filtrados = grupo_seleccionado.participantes.all()
             
             # Filtrar resultados por participantes del grupo
-            resultados_completados = ResultadoEvaluacion.objects.filter(
-                evaluacion=evaluacion, 
-                completada=True,
+            resultados_completados = ResultadoEvaluacion.calificados(
+                evaluacion=evaluacion,
                 participante__in=participantes_filtrados
             )
             todos_resultados = ResultadoEvaluacion.objects.filter(
@@ -4928,7 +4506,7 @@ def exportar_resultados(request, pk):
             )
         else:
             # Obtener todos los resultados
-            resultados_completados = ResultadoEvaluacion.objects.filter(evaluacion=evaluacion, completada=True)
+            resultados_completados = ResultadoEvaluacion.calificados(evaluacion=evaluacion)
             todos_resultados = ResultadoEvaluacion.objects.filter(evaluacion=evaluacion)
         
         # Crear un nuevo workbook
@@ -5060,7 +4638,7 @@ def exportar_resultados(request, pk):
             col += 1
             ws_resultados.cell(row=row, column=col, value=resultado.fecha_fin.strftime("%d/%m/%Y %H:%M") if resultado.fecha_fin else "N/A")
             col += 1
-            ws_resultados.cell(row=row, column=col, value="Completado" if resultado.completada else "En progreso")
+            ws_resultados.cell(row=row, column=col, value=resultado.get_estado_exportacion())
             
             # Aplicar bordes
             for col_idx in range(1, len(headers) + 1):
@@ -5079,27 +4657,14 @@ def exportar_resultados(request, pk):
             cell.alignment = Alignment(horizontal='center')
             cell.border = border
         
-        # Datos por pregunta
+        # Datos por pregunta: conteos agregados en la base de datos sobre las respuestas normalizadas
+        estadisticas = estadisticas_preguntas(resultados_completados)
+        sin_datos = {'correctas': 0, 'incorrectas': 0, 'sin_responder': 0}
         for row, pregunta in enumerate(evaluacion.preguntas.all(), 2):
-            correctas = 0
-            incorrectas = 0
-            sin_responder = 0
-            
-            for resultado in resultados_completados:
-                respuestas = resultado.respuestas_guardadas
-                pregunta_id = str(pregunta.id)
-                
-                if pregunta_id in respuestas:
-                    try:
-                        opcion = pregunta.opciones.get(id=respuestas[pregunta_id])
-                        if opcion.is_correct:
-                            correctas += 1
-                        else:
-                            incorrectas += 1
-                    except:
-                        sin_responder += 1
-                else:
-                    sin_responder += 1
+            conteo = estadisticas.get(pregunta.id, sin_datos)
+            correctas = conteo['correctas']
+            incorrectas = conteo['incorrectas']
+            sin_responder = conteo['sin_responder']
             
             total = correctas + incorrectas + sin_responder
             porcentaje = (correctas / total * 100) if total > 0 else 0
@@ -5171,23 +4736,16 @@ def monitoreo_evaluacion(request, pk):
         return redirect('quizzes:dashboard')
     
     evaluacion = get_evaluacion_monitoreable_or_404(request, pk)
-    participantes_autorizados = evaluacion.get_participantes_autorizados()
-    total_participantes = len(participantes_autorizados)
-    
-    resultados = ResultadoEvaluacion.objects.filter(evaluacion=evaluacion).select_related('participante')
-    ultimos_resultados = {}
-    for resultado in resultados.order_by('participante_id', '-numero_intento'):
-        ultimos_resultados.setdefault(resultado.participante_id, resultado)
-    participantes_activos = sum(1 for r in ultimos_resultados.values() if r.esta_activo())
-    participantes_finalizados = sum(1 for r in ultimos_resultados.values() if r.completada)
+    # Los totales del encabezado se leen de la fila de contadores materializados
+    contadores = obtener_contadores(evaluacion)
     
     context = {
         'evaluacion': evaluacion,
-        'resultados': resultados,
-        'total_participantes': total_participantes,
-        'participantes_activos': participantes_activos,
-        'participantes_finalizados': participantes_finalizados,
-        'participantes_pendientes': max(0, total_participantes - participantes_activos - participantes_finalizados),
+        'contadores': contadores,
+        'total_participantes': contadores.inscritos,
+        'participantes_activos': contadores.activos,
+        'participantes_finalizados': contadores.entregados,
+        'participantes_pendientes': contadores.pendientes,
     }
     
     return render(request, 'quizzes/monitoreo_evaluacion.html', context)
@@ -5238,96 +4796,156 @@ def actualizar_monitoreo(request, pk):
 @login_required
 def obtener_estado_monitoreo(request, pk):
     """
-    Endpoint HTTP AJAX Polling para obtener el estado actual del monitoreo en tiempo real
+    Endpoint HTTP AJAX Polling para obtener el estado actual del monitoreo en tiempo real.
+    Retorna una página de la tabla filtrada y ordenada en SQL (estado, min_alertas, q, orden,
+    pagina, limite), servida desde el snapshot compartido entre administradores. Con
+    ?since=<cursor> solo serializa las filas de la página modificadas después del cursor y no
+    recalcula el snapshot si nada cambió; ids_pagina siempre lista la página completa en orden.
     """
     if not (request.user.is_superuser or hasattr(request.user, 'adminprofile')):
         return JsonResponse({'error': 'Sin permisos'}, status=403)
     
+    # El alcance del administrador se valida antes de servir el snapshot de la evaluación
     evaluacion = get_evaluacion_monitoreable_or_404(request, pk)
-    participantes_autorizados = evaluacion.get_participantes_autorizados()
-    datos_monitoreo = []
-    participante_ids = [participante.id for participante in participantes_autorizados]
-    resultados = ResultadoEvaluacion.objects.filter(
-        evaluacion=evaluacion, participante_id__in=participante_ids
-    ).order_by('participante_id', '-numero_intento')
-    configuraciones = {
-        configuracion.participante_id: configuracion.intentos_maximos
-        for configuracion in IntentosParticipante.objects.filter(
-            evaluacion=evaluacion, participante_id__in=participante_ids
-        )
-    }
-    ultimos_resultados = {}
-    intentos_usados_por_participante = {}
-    for resultado in resultados:
-        ultimos_resultados.setdefault(resultado.participante_id, resultado)
-        if resultado.completada:
-            intentos_usados_por_participante[resultado.participante_id] = (
-                intentos_usados_por_participante.get(resultado.participante_id, 0) + 1
-            )
+    parametros = leer_parametros_tabla(request.GET)
+    ahora = timezone.now()
+    cursor = leer_cursor(request.GET.get('since'))
+    
+    # Si la lista de autorizados cambió se responde la página completa
+    if cursor and cursor[1] == evaluacion.version_roster:
+        # Los cambios se buscan desde el snapshot guardado para saber si su orden sigue vigente
+        snapshot = leer_snapshot_monitoreo(evaluacion, parametros)
+        desde = min(cursor[0], fecha_snapshot(snapshot)) if snapshot else cursor[0]
+        modificados = participantes_modificados_desde(evaluacion, desde)
+        if snapshot is None or modificados:
+            snapshot = obtener_snapshot_monitoreo(evaluacion, parametros)
+        ids = [pid for pid in snapshot['ids_pagina'] if pid in modificados]
+        monitoreos = serializar_monitoreos(evaluacion, list(Participantes.objects.filter(pk__in=ids))) if ids else []
+        completo = False
+        generado = ahora
+    else:
+        snapshot = obtener_snapshot_monitoreo(evaluacion, parametros)
+        monitoreos = snapshot['monitoreos']
+        completo = True
+        generado = fecha_snapshot(snapshot)
+    
+    return JsonResponse({
+        'monitoreos': monitoreos,
+        'completo': completo,
+        'ids_pagina': snapshot['ids_pagina'],
+        'pagina': snapshot['pagina'],
+        'paginas': snapshot['paginas'],
+        'limite': snapshot['limite'],
+        'total_filtrado': snapshot['total_filtrado'],
+        'contadores': snapshot['contadores'],
+        'cursor': generar_cursor(evaluacion, generado),
+        'antiguedad_snapshot': round(max(0, (ahora - fecha_snapshot(snapshot)).total_seconds()), 1),
+        'timestamp': generado.isoformat()
+    })
 
-    total_banco_preguntas = evaluacion.preguntas.count()
-    cantidad_configurada = sum(
-        cuota.cantidad_preguntas for cuota in evaluacion.cuotas_unidades.all()
-    ) or evaluacion.preguntas_a_mostrar or 10
-    total_preguntas_mostradas = min(total_banco_preguntas, cantidad_configurada)
-
-    for participante in participantes_autorizados:
-        resultado = ultimos_resultados.get(participante.id)
-        intentos_usados = intentos_usados_por_participante.get(participante.id, 0)
-        intentos_maximos = configuraciones.get(
-            participante.id, participante.intentos_maximos_default
-        )
-        intentos_disponibles = max(0, intentos_maximos - intentos_usados)
-        ha_iniciado = resultado is not None
-        
-        if not resultado:
-            estado = 'pendiente'
-        elif resultado.completada:
-            estado = 'finalizado' if intentos_disponibles == 0 else 'inactivo'
-        elif resultado.esta_activo():
-            estado = 'activo'
+
+@login_required
+def historial_monitoreo(request, pk):
+    """
+    Serie temporal del monitoreo de la evaluación (activos, entregados, guardados y alertas por
+    minuto) para graficar. Acepta ?desde= y ?hasta= en formato ISO 8601.
+    """
+    if not (request.user.is_superuser or hasattr(request.user, 'adminprofile')):
+        return JsonResponse({'error': 'Sin permisos'}, status=403)
+
+    evaluacion = get_evaluacion_monitoreable_or_404(request, pk)
+    rango = {}
+    for parametro in ('desde', 'hasta'):
+        valor = request.GET.get(parametro)
+        if not valor:
+            continue
+        fecha = parse_datetime(valor)
+        if fecha is None:
+            return JsonResponse({'error': f'Fecha inválida en {parametro}'}, status=400)
+        rango[parametro] = fecha if timezone.is_aware(fecha) else timezone.make_aware(fecha)
+
+    return JsonResponse({'serie': serie_monitoreo(evaluacion, **rango)})
+
+
+@login_required
+def acciones_masivas_monitoreo(request, pk):
+    """
+    Endpoint HTTP POST para aplicar una acción administrativa a varios participantes a la vez
+    (finalizar, otorgar intentos, reducir cambios de pestaña o agregar una alerta).
+    Responde el resultado de cada participante y registra una sola entrada de auditoría por lote.
+    """
+    if not (request.user.is_superuser or hasattr(request.user, 'adminprofile')):
+        return JsonResponse({'success': False, 'error': 'Sin permisos'}, status=403)
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+
+    evaluacion = get_evaluacion_monitoreable_or_404(request, pk)
+
+    try:
+        data = json.loads(request.body)
+        accion = data.get('accion')
+        participante_ids = [int(participante_id) for participante_id in data.get('participante_ids') or []]
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return JsonResponse({'success': False, 'error': 'Datos JSON inválidos'}, status=400)
+
+    if accion not in ACCIONES_MASIVAS:
+        return JsonResponse({'success': False, 'error': 'Acción no válida'}, status=400)
+    if not participante_ids:
+        return JsonResponse({'success': False, 'error': 'Seleccione al menos un participante'}, status=400)
+    if len(participante_ids) > LIMITE_ACCION_MASIVA:
+        return JsonResponse({
+            'success': False,
+            'error': f'Se pueden seleccionar como máximo {LIMITE_ACCION_MASIVA} participantes por acción'
+        }, status=400)
+
+    parametros = {}
+    try:
+        if accion == 'finalizar':
+            parametros['motivo'] = (data.get('motivo') or '').strip() or 'Finalización administrativa'
+            detalle = f'Finalización administrativa. Motivo: {parametros["motivo"]}'
+        elif accion == 'otorgar_intentos':
+            parametros['cantidad'] = int(data.get('cantidad', 1))
+            if parametros['cantidad'] < 1 or parametros['cantidad'] > 10:
+                return JsonResponse({'success': False, 'error': 'La cantidad de intentos debe estar entre 1 y 10'}, status=400)
+            detalle = f'{parametros["cantidad"]} intento(s) adicional(es)'
+        elif accion == 'reducir_pestanas':
+            parametros['cantidad'] = int(data.get('cantidad', 1))
+            if parametros['cantidad'] <= 0:
+                return JsonResponse({'success': False, 'error': 'La cantidad de reducción debe ser mayor a 0'}, status=400)
+            detalle = f'Reducción de {parametros["cantidad"]} cambio(s) de pestaña'
         else:
-            estado = 'inactivo'
-            
-        respuestas = obtener_diccionario_respuestas(resultado)
-        preguntas_respondidas = min(total_preguntas_mostradas, sum(
-            1 for clave, respuesta in respuestas.items()
-            if clave.startswith('pregunta_') and respuesta
-        ))
-        porcentaje_avance = round(
-            (preguntas_respondidas / total_preguntas_mostradas * 100), 1
-        ) if total_preguntas_mostradas else 0
-        
-        alertas = resultado.alertas_detectadas if (resultado and resultado.alertas_detectadas) else []
-        
-        datos_monitoreo.append({
-            # La clave visual debe ser estable por participante, no por intento.
-            'id': participante.id,
-            'resultado_id': resultado.id if resultado else None,
-            'participante_id': participante.id,
-            'participante_nombre': participante.NombresCompletos,
-            'participante_cedula': participante.cedula,
-            'estado': estado,
-            'esta_activo': resultado.esta_activo() if resultado else False,
-            'ha_iniciado': ha_iniciado,
-            'preguntas_respondidas': preguntas_respondidas,
-            'preguntas_revisadas': total_preguntas_mostradas,
-            'porcentaje_avance': porcentaje_avance,
-            'ultima_actividad': resultado.ultima_actividad.isoformat() if (resultado and resultado.ultima_actividad) else None,
-            'alertas_count': len(alertas),
-            'alertas_recientes': alertas[-3:],
-            'tiene_resultado_completado': (resultado.completada) if resultado else False,
-            'puntos_obtenidos': float(resultado.puntos_obtenidos) if (resultado and resultado.completada) else None,
-            'puntaje_numerico': resultado.get_puntaje_numerico() if (resultado and resultado.completada) else None,
-            'intentos_disponibles': intentos_disponibles,
-            'intentos_usados': intentos_usados,
-            'cambios_pestana_actuales': resultado.cambios_pestana if resultado else 0,
-            'cambios_pestana_maximo': 4
-        })
-    
+            parametros['tipo'] = (data.get('tipo_alerta') or 'manual').strip()[:50]
+            parametros['descripcion'] = data.get('descripcion', '')
+            parametros['severidad'] = data.get('severidad', 'baja')
+            if parametros['severidad'] not in dict(AlertaIntento.SEVERIDADES):
+                return JsonResponse({'success': False, 'error': 'Severidad no válida'}, status=400)
+            detalle = f'Alerta "{parametros["tipo"]}" ({parametros["severidad"]})'
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'error': 'La cantidad debe ser un número válido'}, status=400)
+
+    try:
+        resultados = aplicar_accion_masiva(evaluacion, request.user, accion, participante_ids, parametros)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+    aplicados = sum(1 for resultado in resultados if resultado['estado'] == 'aplicado')
+    AuditLog.registrar_accion(
+        usuario_ejecutor=request.user,
+        accion='ACCION_MASIVA_MONITOREO',
+        detalles=(
+            f'{detalle} en la evaluación "{evaluacion.title}": {aplicados} de {len(resultados)} participante(s). '
+            f'IDs aplicados: {", ".join(str(r["participante_id"]) for r in resultados if r["estado"] == "aplicado") or "ninguno"}'
+        ),
+        request=request
+    )
+
     return JsonResponse({
-        'monitoreos': datos_monitoreo,
-        'timestamp': timezone.now().isoformat()
+        'success': True,
+        'message': f'Acción aplicada a {aplicados} de {len(resultados)} participante(s)',
+        'aplicados': aplicados,
+        'omitidos': len(resultados) - aplicados,
+        'resultados': resultados,
     })
 
 
@@ -5384,7 +5002,9 @@ def detalle_monitoreo(request, monitoreo_id):
     intentos = ResultadoEvaluacion.objects.filter(
         evaluacion=resultado_seleccionado.evaluacion,
         participante=resultado_seleccionado.participante,
-    ).select_related('finalizado_por_admin').order_by('-numero_intento')
+    ).select_related('finalizado_por_admin').annotate(
+        alertas_count=Count('alertas')
+    ).order_by('-numero_intento')
 
     # El detalle siempre representa el intento más reciente como estado actual,
     # incluso si se llega mediante la URL de un intento histórico.
@@ -5394,7 +5014,7 @@ def detalle_monitoreo(request, monitoreo_id):
         'resultado': resultado,
         'evaluacion': resultado.evaluacion,
         'participante': resultado.participante,
-        'alertas': resultado.alertas_detectadas or [],
+        'alertas': resultado.alertas.all(),
         'intentos': intentos,
         'total_intentos': intentos.count(),
     }
@@ -5900,8 +5520,7 @@ def dar_nuevo_intento_evaluacion(request, pk):
         participante = get_object_or_404(Participantes, id=participante_id)
         
         # Verificar que el participante esté autorizado para esta evaluación
-        participantes_autorizados = evaluacion.get_participantes_autorizados()
-        if participante not in participantes_autorizados:
+        if not evaluacion.is_participante_autorizado(participante.id):
             return JsonResponse({'success': False, 'error': 'Participante no autorizado para esta evaluación'})
         
         # Crear o actualizar el registro de intentos para otorgar uno adicional
@@ -5918,7 +5537,7 @@ def dar_nuevo_intento_evaluacion(request, pk):
         if not created:
             intento_config.intentos_maximos += cantidad_intentos
             intento_config.motivo = f'{cantidad_intentos} intento(s) adicional(es) otorgado(s) por administrador'
-            intento_config.save(update_fields=['intentos_maximos', 'motivo'])
+            intento_config.save(update_fields=['intentos_maximos', 'motivo', 'fecha_actualizacion'])
         
         # Recalcular los intentos disponibles después del otorgamiento
         nuevos_intentos_disponibles = participante.get_intentos_disponibles(evaluacion)
@@ -5966,8 +5585,7 @@ def reducir_cambios_pestana(request, pk):
         participante = get_object_or_404(Participantes, id=participante_id)
         
         # Verificar que el participante esté autorizado para esta evaluación
-        participantes_autorizados = evaluacion.get_participantes_autorizados()
-        if participante not in participantes_autorizados:
+        if not evaluacion.is_participante_autorizado(participante.id):
             return JsonResponse({'success': False, 'error': 'Participante no autorizado para esta evaluación'})
         
         # Obtener el resultado activo (no completado) del participante
@@ -5997,6 +5615,7 @@ def reducir_cambios_pestana(request, pk):
             severidad='baja'
         )
         resultado_activo.save(update_fields=['cambios_pestana'])
+        invalidar_estado_intento(evaluacion.pk, participante.user_id)
         
         return JsonResponse({
             'success': True,
@@ -6431,9 +6050,8 @@ def generar_excel_grupo(evaluacion, grupo):
     participantes_filtrados = grupo.participantes.all()
     
     # Filtrar resultados por participantes del grupo
-    resultados_completados = ResultadoEvaluacion.objects.filter(
-        evaluacion=evaluacion, 
-        completada=True,
+    resultados_completados = ResultadoEvaluacion.calificados(
+        evaluacion=evaluacion,
         participante__in=participantes_filtrados
     )
     todos_resultados = ResultadoEvaluacion.objects.filter(
@@ -6547,7 +6165,7 @@ def generar_excel_grupo(evaluacion, grupo):
         ws_resultados.cell(row=row, column=8, value=resultado.numero_intento)
         ws_resultados.cell(row=row, column=9, value=resultado.fecha_inicio.strftime("%d/%m/%Y %H:%M") if resultado.fecha_inicio else "N/A")
         ws_resultados.cell(row=row, column=10, value=resultado.fecha_fin.strftime("%d/%m/%Y %H:%M") if resultado.fecha_fin else "N/A")
-        ws_resultados.cell(row=row, column=11, value="Completado" if resultado.completada else "En progreso")
+        ws_resultados.cell(row=row, column=11, value=resultado.get_estado_exportacion())
         
         # Aplicar bordes
         for col_idx in range(1, len(headers) + 1):
@@ -6566,62 +6184,14 @@ def generar_excel_grupo(evaluacion, grupo):
         cell.alignment = Alignment(horizontal='center')
         cell.border = border
     
-    # Datos por pregunta
-    # Crear cache de opciones correctas por pregunta
-    preguntas_opciones_correctas = {}
-    for pregunta in evaluacion.preguntas.prefetch_related('opciones'):
-        opciones_correctas = {}
-        for opcion in pregunta.opciones.all():
-            opciones_correctas[opcion.id] = opcion.is_correct
-        preguntas_opciones_correctas[pregunta.id] = opciones_correctas
-    
+    # Datos por pregunta: conteos agregados en la base de datos sobre las respuestas normalizadas
+    estadisticas = estadisticas_preguntas(resultados_completados)
+    sin_datos = {'correctas': 0, 'incorrectas': 0, 'sin_responder': 0}
     for row, pregunta in enumerate(evaluacion.preguntas.all(), 2):
-        correctas = 0
-        incorrectas = 0
-        sin_responder = 0
-        
-        # Obtener las opciones correctas para esta pregunta desde el cache
-        opciones_correctas_pregunta = preguntas_opciones_correctas.get(pregunta.id, {})
-        
-        for resultado in resultados_completados:
-            respuestas = resultado.respuestas_guardadas
-            
-            # Validar que respuestas no sea None o vacío
-            if not respuestas or not isinstance(respuestas, dict):
-                sin_responder += 1
-                continue
-            
-            # Buscar la respuesta para esta pregunta con el formato correcto
-            # Las claves se guardan como "pregunta_407", "pregunta_410", etc.
-            opcion_id = None
-            pregunta_key = f"pregunta_{pregunta.id}"
-            
-            if pregunta_key in respuestas:
-                opcion_id = respuestas[pregunta_key]
-            
-            if opcion_id is not None:
-                try:
-                    # Normalizar opcion_id a entero
-                    if isinstance(opcion_id, str) and opcion_id.isdigit():
-                        opcion_id = int(opcion_id)
-                    elif not isinstance(opcion_id, int):
-                        sin_responder += 1
-                        continue
-                    
-                    # Verificar si la respuesta es correcta usando el cache
-                    if opcion_id in opciones_correctas_pregunta:
-                        if opciones_correctas_pregunta[opcion_id]:
-                            correctas += 1
-                        else:
-                            incorrectas += 1
-                    else:
-                        # La opción no existe, contar como sin responder
-                        sin_responder += 1
-                        
-                except (ValueError, TypeError):
-                    sin_responder += 1
-            else:
-                sin_responder += 1
+        conteo = estadisticas.get(pregunta.id, sin_datos)
+        correctas = conteo['correctas']
+        incorrectas = conteo['incorrectas']
+        sin_responder = conteo['sin_responder']
         
         total_respuestas = correctas + incorrectas  # Solo respuestas dadas (no incluir sin_responder)
         porcentaje = (correctas / total_respuestas * 100) if total_respuestas > 0 else 0
@@ -3,8 +3,27 @@ let autoRefreshInterval;
 let currentMonitoreoId = null;
 let lastMonitoreoData = {};
 let searchTimeout;
-let totalParticipantes = 0;
 let monitoreoRequestInFlight = false;
+let monitoreoSocket = null;
+let monitoreoSocketAbierto = false;
+let socketReintentos = 0;
+let monitoreoCursor = null;
+let contadoresMonitoreo = null;
+
+// Participantes seleccionados para acciones masivas; se conservan entre páginas y recargas
+const seleccionMasiva = new Set();
+let accionMasivaActual = null;
+
+// Filtros, orden y página de la tabla; se resuelven en el servidor
+const filtrosMonitoreo = { estado: '', min_alertas: 0, q: '', orden: 'nombre', pagina: 1, limite: 50 };
+let versionFiltrosMonitoreo = 0;
+let recargaMonitoreoPendiente = false;
+let paginasMonitoreo = 1;
+let totalFiltrado = 0;
+
+// Con WebSocket abierto el sondeo HTTP solo reconcilia el estado cada minuto
+const INTERVALO_SONDEO_MS = 10000;
+const INTERVALO_SONDEO_CON_SOCKET_MS = 60000;
 
 // Función para formatear tiempo en segundos
 function formatTime(seconds) {
@@ -69,6 +88,20 @@ function generarFilaMonitoreo(monitoreo) {
     const cambiosActuales = monitoreo.cambios_pestana_actuales || 0;
     const cambiosMaximo = monitoreo.cambios_pestana_maximo || 4;
 
+    const seleccion = crearElemento('td');
+    const casilla = crearElemento('input', 'form-check-input seleccion-participante');
+    casilla.type = 'checkbox';
+    casilla.value = monitoreo.participante_id;
+    casilla.checked = seleccionMasiva.has(monitoreo.participante_id);
+    casilla.setAttribute('aria-label', `Seleccionar a ${monitoreo.participante_nombre}`);
+    casilla.addEventListener('change', () => {
+        if (casilla.checked) seleccionMasiva.add(monitoreo.participante_id);
+        else seleccionMasiva.delete(monitoreo.participante_id);
+        actualizarBarraMasiva();
+    });
+    seleccion.appendChild(casilla);
+    fila.appendChild(seleccion);
+
     const participante = crearElemento('td');
     participante.appendChild(crearElemento('strong', '', monitoreo.participante_nombre));
     participante.appendChild(document.createElement('br'));
@@ -197,15 +230,21 @@ function hasMonitoreoChanged(current, previous) {
     );
 }
 
+// Los totales provienen de los contadores del servidor; sin ellos se cuentan las filas cargadas
 function actualizarEstadisticas(monitoreos) {
-    const activos = monitoreos.filter(item => item.estado === 'activo').length;
-    const finalizados = monitoreos.filter(item => item.estado === 'finalizado').length;
-    const pendientes = monitoreos.length - activos - finalizados;
+    let activos, finalizados, pendientes, total;
+    if (contadoresMonitoreo) {
+        ({ activos, entregados: finalizados, pendientes, inscritos: total } = contadoresMonitoreo);
+    } else {
+        activos = monitoreos.filter(item => item.estado === 'activo').length;
+        finalizados = monitoreos.filter(item => item.estado === 'finalizado').length;
+        pendientes = monitoreos.length - activos - finalizados;
+        total = monitoreos.length;
+    }
     document.getElementById('stat-activos').textContent = activos;
     document.getElementById('stat-finalizados').textContent = finalizados;
     document.getElementById('stat-pendientes').textContent = pendientes;
-    document.getElementById('stat-total').textContent = monitoreos.length;
-    totalParticipantes = monitoreos.length;
+    document.getElementById('stat-total').textContent = total;
 }
 
 function mostrarErrorMonitoreo() {
@@ -213,22 +252,35 @@ function mostrarErrorMonitoreo() {
     tbody.replaceChildren();
     const fila = document.createElement('tr');
     const celda = crearElemento('td', 'text-center text-danger', 'Error al cargar los datos del monitoreo. Verificando conexión...');
-    celda.colSpan = 8;
+    celda.colSpan = 9;
     fila.appendChild(celda);
     tbody.appendChild(fila);
 }
 
 // Carga y actualiza la tabla de monitoreo sin solapar solicitudes HTTP.
 async function cargarMonitoreo() {
-    if (monitoreoRequestInFlight) return;
+    if (monitoreoRequestInFlight) {
+        recargaMonitoreoPendiente = true;
+        return;
+    }
     monitoreoRequestInFlight = true;
+    const versionFiltros = versionFiltrosMonitoreo;
     try {
-        const response = await fetch(window.monitoreoEstadoUrl, { credentials: 'same-origin' });
+        const response = await fetch(construirUrlMonitoreo(), { credentials: 'same-origin' });
         if (!response.ok) throw new Error(`HTTP ${response.status}: ${response.statusText}`);
         const data = await response.json();
         if (!Array.isArray(data.monitoreos)) throw new Error('Datos de monitoreo inválidos');
+        // Los filtros cambiaron mientras la solicitud estaba en curso: se descarta la respuesta
+        if (versionFiltros !== versionFiltrosMonitoreo) return;
 
         const tbody = document.getElementById('tbody-monitoreo');
+        monitoreoCursor = data.cursor || null;
+        actualizarPaginacion(data);
+        if (data.completo === false) {
+            aplicarCambiosMonitoreo(tbody, data);
+            return;
+        }
+
         const nuevosDatos = {};
         const filasActuales = new Map(
             [...tbody.querySelectorAll('tr[id^="monitoreo-row-"]')].map(fila => [fila.id, fila])
@@ -236,43 +288,203 @@ async function cargarMonitoreo() {
 
         data.monitoreos.forEach(monitoreo => {
             const rowId = `monitoreo-row-${monitoreo.id}`;
-            const filaAnterior = filasActuales.get(rowId);
-            const datosAnteriores = lastMonitoreoData[monitoreo.id];
-            const cambio = hasMonitoreoChanged(monitoreo, datosAnteriores);
-
-            if (!filaAnterior || cambio) {
-                if (datosAnteriores) notificarCambioEstado(monitoreo, datosAnteriores);
-                const nuevaFila = generarFilaMonitoreo(monitoreo);
-                if (filaAnterior) {
-                    nuevaFila.classList.add('fila-actualizada');
-                    nuevaFila.style.background = '#fff3cd';
-                    filaAnterior.replaceWith(nuevaFila);
-                    setTimeout(() => {
-                        nuevaFila.style.background = '';
-                        nuevaFila.classList.remove('fila-actualizada');
-                    }, 1000);
-                } else {
-                    tbody.appendChild(nuevaFila);
-                }
-            }
+            actualizarFilaMonitoreo(tbody, monitoreo, filasActuales.get(rowId));
             filasActuales.delete(rowId);
             nuevosDatos[monitoreo.id] = { ...monitoreo };
         });
 
-        // Elimina filas de participantes que ya no pertenecen a la evaluación.
+        // Elimina filas de participantes que ya no pertenecen a la página.
         filasActuales.forEach(fila => fila.remove());
         lastMonitoreoData = nuevosDatos;
-        actualizarEstadisticas(data.monitoreos);
-        document.getElementById('last-update').textContent = new Date(data.timestamp).toLocaleTimeString();
-        refreshSearch();
-        updateSearchCounter(document.querySelectorAll('#tabla-monitoreo tbody tr[id^="monitoreo-row-"]').length, document.getElementById('search-participantes').value);
+        ordenarFilasPagina(tbody, data.ids_pagina || []);
+        finalizarActualizacionMonitoreo(data.timestamp, data.contadores);
     } catch (error) {
         console.error('Error al cargar monitoreo:', error);
         // Se vacía el cache para que una recuperación reconstruya la tabla completa.
         lastMonitoreoData = {};
+        monitoreoCursor = null;
         mostrarErrorMonitoreo();
     } finally {
         monitoreoRequestInFlight = false;
+        if (recargaMonitoreoPendiente) {
+            recargaMonitoreoPendiente = false;
+            cargarMonitoreo();
+        }
+    }
+}
+
+// Con cursor solo se piden las filas de la página que cambiaron desde la consulta anterior
+function construirUrlMonitoreo() {
+    const params = new URLSearchParams();
+    Object.entries(filtrosMonitoreo).forEach(([clave, valor]) => {
+        if (valor !== '' && valor !== 0) params.set(clave, valor);
+    });
+    if (monitoreoCursor) params.set('since', monitoreoCursor);
+    return `${window.monitoreoEstadoUrl}?${params.toString()}`;
+}
+
+// Aplica nuevos filtros, orden o página y recarga la tabla completa desde el servidor
+function cambiarFiltrosMonitoreo(cambios) {
+    Object.assign(filtrosMonitoreo, { pagina: 1 }, cambios);
+    versionFiltrosMonitoreo += 1;
+    monitoreoCursor = null;
+    cargarMonitoreo();
+}
+
+// Deja en la tabla solo las filas de la página, en el orden que definió el servidor
+function ordenarFilasPagina(tbody, idsPagina) {
+    const enPagina = new Set(idsPagina.map(String));
+    tbody.querySelectorAll('tr[id^="monitoreo-row-"]').forEach(fila => {
+        const participanteId = fila.id.replace('monitoreo-row-', '');
+        if (!enPagina.has(participanteId)) {
+            fila.remove();
+            delete lastMonitoreoData[participanteId];
+        }
+    });
+    idsPagina.forEach(participanteId => {
+        const fila = document.getElementById(`monitoreo-row-${participanteId}`);
+        if (fila) tbody.appendChild(fila);
+    });
+}
+
+function actualizarPaginacion(data) {
+    filtrosMonitoreo.pagina = data.pagina || 1;
+    paginasMonitoreo = data.paginas || 1;
+    totalFiltrado = data.total_filtrado ?? data.monitoreos.length;
+    document.getElementById('pagina-actual').textContent = `Página ${filtrosMonitoreo.pagina} de ${paginasMonitoreo}`;
+    document.getElementById('btn-pagina-anterior').disabled = filtrosMonitoreo.pagina <= 1;
+    document.getElementById('btn-pagina-siguiente').disabled = filtrosMonitoreo.pagina >= paginasMonitoreo;
+}
+
+// Fusiona una respuesta incremental: filas modificadas, orden de la página e inactividad por tiempo
+function aplicarCambiosMonitoreo(tbody, data) {
+    data.monitoreos.forEach(monitoreo => {
+        actualizarFilaMonitoreo(tbody, monitoreo, document.getElementById(`monitoreo-row-${monitoreo.id}`));
+        lastMonitoreoData[monitoreo.id] = { ...monitoreo };
+    });
+    // Entraron a la página participantes sin fila cargada: se pide la página completa
+    if ((data.ids_pagina || []).some(participanteId => !lastMonitoreoData[participanteId])) {
+        monitoreoCursor = null;
+        recargaMonitoreoPendiente = true;
+    }
+    ordenarFilasPagina(tbody, data.ids_pagina || []);
+    marcarInactivos(tbody);
+    finalizarActualizacionMonitoreo(data.timestamp, data.contadores);
+}
+
+// Un participante sin actividad por 5 minutos no genera cambios en el servidor: se detecta aquí
+function marcarInactivos(tbody) {
+    Object.values(lastMonitoreoData).forEach(monitoreo => {
+        if (monitoreo.estado !== 'activo' || !monitoreo.ultima_actividad) return;
+        if (Date.now() - new Date(monitoreo.ultima_actividad).getTime() < 300000) return;
+        const inactivo = { ...monitoreo, estado: 'inactivo', esta_activo: false };
+        actualizarFilaMonitoreo(tbody, inactivo, document.getElementById(`monitoreo-row-${monitoreo.id}`));
+        lastMonitoreoData[monitoreo.id] = inactivo;
+    });
+}
+
+// Reemplaza la fila del participante si su estado cambió respecto al cache anterior
+function actualizarFilaMonitoreo(tbody, monitoreo, filaAnterior) {
+    const datosAnteriores = lastMonitoreoData[monitoreo.id];
+    if (filaAnterior && !hasMonitoreoChanged(monitoreo, datosAnteriores)) return;
+
+    if (datosAnteriores) notificarCambioEstado(monitoreo, datosAnteriores);
+    const nuevaFila = generarFilaMonitoreo(monitoreo);
+    if (filaAnterior) {
+        nuevaFila.classList.add('fila-actualizada');
+        nuevaFila.style.background = '#fff3cd';
+        filaAnterior.replaceWith(nuevaFila);
+        setTimeout(() => {
+            nuevaFila.style.background = '';
+            nuevaFila.classList.remove('fila-actualizada');
+        }, 1000);
+    } else {
+        tbody.appendChild(nuevaFila);
+    }
+}
+
+function finalizarActualizacionMonitoreo(timestamp, contadores) {
+    if (contadores) contadoresMonitoreo = contadores;
+    actualizarBarraMasiva();
+    actualizarEstadisticas(Object.values(lastMonitoreoData));
+    document.getElementById('last-update').textContent = new Date(timestamp).toLocaleTimeString();
+    const visibles = document.querySelectorAll('#tabla-monitoreo tbody tr[id^="monitoreo-row-"]').length;
+    updateSearchCounter(visibles, filtrosMonitoreo.q);
+    handleNoResults(visibles, filtrosMonitoreo.q);
+}
+
+// ==================== ACTUALIZACIONES EN TIEMPO REAL (WEBSOCKET) ====================
+
+// Aplica un mensaje del servidor: fila completa de un participante o solo su avance
+function aplicarMensajeMonitoreo(mensaje) {
+    const tbody = document.getElementById('tbody-monitoreo');
+    let monitoreo = null;
+
+    if (mensaje.tipo === 'participante') {
+        monitoreo = mensaje.monitoreo;
+    } else if (mensaje.tipo === 'avance') {
+        const anterior = lastMonitoreoData[mensaje.participante_id];
+        if (!anterior) return;
+        const total = anterior.preguntas_revisadas || 0;
+        const respondidas = Math.min(total, mensaje.preguntas_respondidas);
+        monitoreo = {
+            ...anterior,
+            estado: 'activo',
+            esta_activo: true,
+            preguntas_respondidas: respondidas,
+            porcentaje_avance: total ? Math.round(respondidas / total * 1000) / 10 : 0,
+            ultima_actividad: mensaje.ultima_actividad
+        };
+    }
+    // Solo se actualizan las filas de la página visible; el sondeo reubica las demás
+    const fila = monitoreo && document.getElementById(`monitoreo-row-${monitoreo.id}`);
+    if (fila) {
+        actualizarFilaMonitoreo(tbody, monitoreo, fila);
+        lastMonitoreoData[monitoreo.id] = { ...monitoreo };
+    }
+    finalizarActualizacionMonitoreo(new Date().toISOString(), mensaje.contadores);
+}
+
+function conectarSocketMonitoreo() {
+    if (!('WebSocket' in window) || !window.monitoreoSocketUrl) return;
+
+    const protocolo = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    monitoreoSocket = new WebSocket(`${protocolo}://${window.location.host}${window.monitoreoSocketUrl}`);
+
+    monitoreoSocket.addEventListener('open', () => {
+        monitoreoSocketAbierto = true;
+        socketReintentos = 0;
+        programarSondeo();
+        // Reconciliar lo ocurrido mientras el socket estuvo cerrado
+        cargarMonitoreo();
+    });
+    monitoreoSocket.addEventListener('message', evento => {
+        try {
+            aplicarMensajeMonitoreo(JSON.parse(evento.data));
+        } catch (error) {
+            console.error('Mensaje de monitoreo inválido:', error);
+        }
+    });
+    monitoreoSocket.addEventListener('close', () => {
+        const estabaAbierto = monitoreoSocketAbierto;
+        monitoreoSocketAbierto = false;
+        monitoreoSocket = null;
+        if (estabaAbierto) programarSondeo();
+        // Reintento con espera creciente; mientras tanto el sondeo HTTP mantiene la tabla al día
+        socketReintentos += 1;
+        setTimeout(conectarSocketMonitoreo, Math.min(60000, 2000 * 2 ** Math.min(socketReintentos, 5)));
+    });
+}
+
+// Programa el sondeo HTTP según el auto-refresh y el estado del WebSocket
+function programarSondeo() {
+    clearInterval(autoRefreshInterval);
+    const autoRefresh = document.getElementById('auto-refresh');
+    if (autoRefresh && autoRefresh.checked && !document.hidden) {
+        autoRefreshInterval = setInterval(
+            cargarMonitoreo,
+            monitoreoSocketAbierto ? INTERVALO_SONDEO_CON_SOCKET_MS : INTERVALO_SONDEO_MS
+        );
     }
 }
 
@@ -297,6 +509,122 @@ function agregarAlerta(monitoreoId) {
     modal.show();
 }
 
+// ==================== ACCIONES MASIVAS ====================
+
+const TITULOS_ACCION_MASIVA = {
+    finalizar: 'Finalizar evaluaciones',
+    otorgar_intentos: 'Otorgar intentos adicionales',
+    reducir_pestanas: 'Reducir cambios de pestañas',
+    alerta: 'Agregar alerta',
+};
+
+// Muestra la barra de acciones y sincroniza la casilla "seleccionar todos" con la página actual
+function actualizarBarraMasiva() {
+    const barra = document.getElementById('barra-acciones-masivas');
+    barra.classList.toggle('d-none', seleccionMasiva.size === 0);
+    barra.classList.toggle('d-flex', seleccionMasiva.size > 0);
+    document.getElementById('contador-seleccionados').textContent = seleccionMasiva.size;
+
+    const casillas = [...document.querySelectorAll('#tbody-monitoreo .seleccion-participante')];
+    const marcadas = casillas.filter(casilla => casilla.checked).length;
+    const todos = document.getElementById('seleccionar-todos');
+    todos.checked = casillas.length > 0 && marcadas === casillas.length;
+    todos.indeterminate = marcadas > 0 && marcadas < casillas.length;
+}
+
+function seleccionarPagina(seleccionar) {
+    document.querySelectorAll('#tbody-monitoreo .seleccion-participante').forEach(casilla => {
+        casilla.checked = seleccionar;
+        const participanteId = Number(casilla.value);
+        if (seleccionar) seleccionMasiva.add(participanteId);
+        else seleccionMasiva.delete(participanteId);
+    });
+    actualizarBarraMasiva();
+}
+
+function limpiarSeleccionMasiva() {
+    seleccionMasiva.clear();
+    document.querySelectorAll('#tbody-monitoreo .seleccion-participante').forEach(casilla => { casilla.checked = false; });
+    actualizarBarraMasiva();
+}
+
+// Abre el modal de la acción masiva mostrando solo los campos que esa acción requiere
+function abrirAccionMasiva(accion) {
+    if (seleccionMasiva.size === 0) return;
+    accionMasivaActual = accion;
+    document.getElementById('titulo-accion-masiva').textContent = TITULOS_ACCION_MASIVA[accion];
+    document.getElementById('cantidad-accion-masiva').textContent = seleccionMasiva.size;
+    document.querySelectorAll('.campos-accion-masiva').forEach(campos => {
+        campos.classList.toggle('d-none', campos.dataset.accion !== accion);
+    });
+    document.getElementById('motivo-masivo').value = '';
+    document.getElementById('descripcion-alerta-masivo').value = '';
+    const el = document.getElementById('modalAccionMasiva');
+    const modal = bootstrap.Modal.getInstance(el) || new bootstrap.Modal(el);
+    modal.show();
+}
+
+function datosAccionMasiva(accion) {
+    const datos = { accion, participante_ids: [...seleccionMasiva] };
+    if (accion === 'finalizar') {
+        datos.motivo = document.getElementById('motivo-masivo').value;
+    } else if (accion === 'otorgar_intentos') {
+        datos.cantidad = document.getElementById('cantidad-intentos-masivo').value;
+    } else if (accion === 'reducir_pestanas') {
+        datos.cantidad = document.getElementById('cantidad-reducir-masivo').value;
+    } else {
+        datos.tipo_alerta = document.getElementById('tipo-alerta-masivo').value;
+        datos.severidad = document.getElementById('severidad-alerta-masivo').value;
+        datos.descripcion = document.getElementById('descripcion-alerta-masivo').value;
+    }
+    return datos;
+}
+
+async function confirmarAccionMasiva() {
+    const datos = datosAccionMasiva(accionMasivaActual);
+    if (datos.accion === 'finalizar' && !datos.motivo.trim()) {
+        showDynamicToast({ type: 'warning', title: 'Advertencia', message: 'Por favor, ingrese un motivo para la finalización.' });
+        return;
+    }
+    if (datos.accion === 'alerta' && !datos.descripcion.trim()) {
+        showDynamicToast({ type: 'warning', title: 'Advertencia', message: 'Por favor, ingrese una descripción para la alerta.' });
+        return;
+    }
+
+    try {
+        const response = await fetch(window.accionesMasivasUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            },
+            body: JSON.stringify(datos)
+        });
+        const data = await response.json();
+        if (!data.success) {
+            showDynamicToast({ type: 'danger', title: 'Error', message: data.error });
+            return;
+        }
+
+        bootstrap.Modal.getInstance(document.getElementById('modalAccionMasiva')).hide();
+        limpiarSeleccionMasiva();
+        cargarMonitoreo();
+        showDynamicToast({ type: data.omitidos ? 'warning' : 'success', title: 'Acción masiva', message: data.message });
+        if (data.omitidos) {
+            // Resume los motivos de omisión: "No tiene una evaluación activa (3)"
+            const motivos = {};
+            data.resultados.filter(r => r.estado !== 'aplicado').forEach(r => {
+                motivos[r.mensaje] = (motivos[r.mensaje] || 0) + 1;
+            });
+            const resumen = Object.entries(motivos).map(([mensaje, cantidad]) => `${mensaje} (${cantidad})`).join('; ');
+            showDynamicToast({ type: 'info', title: `${data.omitidos} omitido(s)`, message: resumen });
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showDynamicToast({ type: 'danger', title: 'Error', message: 'Error al aplicar la acción masiva' });
+    }
+}
+
 // Navega a la página de detalles del monitoreo
 function verDetalles(monitoreoId) {
     window.location.href = window.detalleMonitoreoUrl.replace('/0/', `/${monitoreoId}/`);
@@ -375,33 +703,29 @@ function actualizarNuevoTotalCambios() {
 
 // ==================== FUNCIONALIDAD DE BÚSQUEDA ====================
 
-function normalizeText(text) {
-    return text.toLowerCase().normalize('NFD').replace(/[\u0300-\u036f]/g, '').trim();
-}
-
 function updateSearchCounter(visibleCount, searchTerm) {
     const counter = document.getElementById('search-results-count');
-    const total = totalParticipantes;
     if (searchTerm === '') {
-        counter.textContent = `Mostrando ${total} participante${total !== 1 ? 's' : ''}`;
+        counter.textContent = `Mostrando ${visibleCount} de ${totalFiltrado} participante${totalFiltrado !== 1 ? 's' : ''}`;
         counter.className = 'text-muted';
     } else {
-        counter.textContent = `${visibleCount} de ${total} participante${visibleCount !== 1 ? 's' : ''} encontrado${visibleCount !== 1 ? 's' : ''}`;
-        counter.className = visibleCount > 0 ? 'text-info' : 'text-warning';
+        counter.textContent = `${totalFiltrado} participante${totalFiltrado !== 1 ? 's' : ''} encontrado${totalFiltrado !== 1 ? 's' : ''}`;
+        counter.className = totalFiltrado > 0 ? 'text-info' : 'text-warning';
     }
 }
 
 function handleNoResults(visibleCount, searchTerm) {
     let noResultsMsg = document.getElementById('no-results-message');
-    if (visibleCount === 0 && searchTerm !== '') {
+    const hayFiltros = searchTerm !== '' || filtrosMonitoreo.estado !== '' || filtrosMonitoreo.min_alertas > 0;
+    if (visibleCount === 0 && hayFiltros) {
         if (!noResultsMsg) {
             noResultsMsg = document.createElement('tr');
             noResultsMsg.id = 'no-results-message';
             noResultsMsg.innerHTML = `
-                <td colspan="8" class="text-center py-5 text-muted">
+                <td colspan="9" class="text-center py-5 text-muted">
                     <i class="fas fa-search-minus fa-3x mb-3 d-block"></i>
                     <h5>No se encontraron participantes</h5>
-                    <p class="mb-0">Intenta con otros términos de búsqueda o verifica la ortografía.</p>
+                    <p class="mb-0">Intenta con otros términos de búsqueda o cambia los filtros.</p>
                 </td>`;
             document.querySelector('#tabla-monitoreo tbody')?.appendChild(noResultsMsg);
         }
@@ -411,28 +735,11 @@ function handleNoResults(visibleCount, searchTerm) {
     }
 }
 
+// La búsqueda por nombre o cédula se ejecuta en el servidor
 function searchParticipantes(searchTerm) {
-    const normalizedSearch = normalizeText(searchTerm);
-    let visibleCount = 0;
-
-    document.querySelectorAll('#tabla-monitoreo tbody tr[id^="monitoreo-row-"]').forEach(fila => {
-        const cell = fila.querySelector('td:first-child');
-        if (!cell) return;
-
-        const matches = normalizeText(cell.textContent).includes(normalizedSearch);
-
-        if (matches || searchTerm === '') {
-            fila.style.display = '';
-            fila.classList.remove('search-no-results');
-            visibleCount++;
-        } else {
-            fila.style.display = 'none';
-            fila.classList.add('search-no-results');
-        }
-    });
-
-    updateSearchCounter(visibleCount, searchTerm);
-    handleNoResults(visibleCount, searchTerm);
+    const termino = searchTerm.trim();
+    if (termino === filtrosMonitoreo.q) return;
+    cambiarFiltrosMonitoreo({ q: termino });
 }
 
 function clearSearch() {
@@ -445,13 +752,6 @@ function clearSearch() {
     setTimeout(() => { searchInput.style.transform = 'scale(1)'; }, 150);
 }
 
-function refreshSearch() {
-    const searchInput = document.getElementById('search-participantes');
-    if (searchInput && searchInput.value) {
-        searchParticipantes(searchInput.value);
-    }
-}
-
 // ==================== FIN FUNCIONALIDAD DE BÚSQUEDA ====================
 
 // ==================== INICIALIZACIÓN ====================
@@ -462,24 +762,19 @@ document.addEventListener('DOMContentLoaded', function() {
     // Carga inicial de datos
     cargarMonitoreo();
 
-    // Auto-refresh
+    // Auto-refresh: sondeo HTTP como respaldo del WebSocket
     const autoRefreshCheckbox = document.getElementById('auto-refresh');
-    function toggleAutoRefresh() {
-        clearInterval(autoRefreshInterval);
-        if (autoRefreshCheckbox.checked) {
-            autoRefreshInterval = setInterval(cargarMonitoreo, 10000);
-        }
-    }
-    autoRefreshCheckbox.addEventListener('change', toggleAutoRefresh);
+    autoRefreshCheckbox.addEventListener('change', programarSondeo);
     document.addEventListener('visibilitychange', () => {
         if (document.hidden) {
             clearInterval(autoRefreshInterval);
         } else if (autoRefreshCheckbox.checked) {
             cargarMonitoreo();
-            toggleAutoRefresh();
+            programarSondeo();
         }
     });
-    toggleAutoRefresh();
+    programarSondeo();
+    conectarSocketMonitoreo();
 
     // Actualización dinámica del nuevo total de intentos
     document.getElementById('cantidad-intentos').addEventListener('change', actualizarNuevoTotal);
@@ -632,6 +927,14 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    // Acciones masivas
+    document.getElementById('seleccionar-todos').addEventListener('change', e => seleccionarPagina(e.target.checked));
+    document.getElementById('btn-limpiar-seleccion').addEventListener('click', limpiarSeleccionMasiva);
+    document.querySelectorAll('[data-accion-masiva]').forEach(boton => {
+        boton.addEventListener('click', () => abrirAccionMasiva(boton.dataset.accionMasiva));
+    });
+    document.getElementById('btn-confirmar-accion-masiva').addEventListener('click', confirmarAccionMasiva);
+
     // Búsqueda
     const searchInput = document.getElementById('search-participantes');
     const clearButton = document.getElementById('clear-search');
@@ -642,7 +945,8 @@ document.addEventListener('DOMContentLoaded', function() {
             searchTimeout = setTimeout(() => searchParticipantes(e.target.value), 300);
         });
         searchInput.addEventListener('paste', function(e) {
-            setTimeout(() => searchParticipantes(e.target.value), 100);
+            clearTimeout(searchTimeout);
+            searchTimeout = setTimeout(() => searchParticipantes(e.target.value), 100);
         });
         searchInput.addEventListener('keypress', function(e) {
             if (e.key === 'Enter') {
@@ -660,12 +964,16 @@ document.addEventListener('DOMContentLoaded', function() {
         clearButton.addEventListener('click', clearSearch);
     }
 
-    // Inicializar contador una vez que la tabla tenga datos
-    setTimeout(() => {
-        const filas = document.querySelectorAll('#tabla-monitoreo tbody tr');
-        if (filas.length > 0) {
-            totalParticipantes = filas.length;
-            updateSearchCounter(filas.length, '');
-        }
-    }, 1000);
+    // Filtros, orden y paginación de la tabla
+    document.getElementById('filtro-estado').addEventListener('change', e => cambiarFiltrosMonitoreo({ estado: e.target.value }));
+    document.getElementById('filtro-alertas').addEventListener('change', e => {
+        cambiarFiltrosMonitoreo({ min_alertas: Math.max(0, parseInt(e.target.value, 10) || 0) });
+    });
+    document.getElementById('orden-monitoreo').addEventListener('change', e => cambiarFiltrosMonitoreo({ orden: e.target.value }));
+    document.getElementById('btn-pagina-anterior').addEventListener('click', () => {
+        if (filtrosMonitoreo.pagina > 1) cambiarFiltrosMonitoreo({ pagina: filtrosMonitoreo.pagina - 1 });
+    });
+    document.getElementById('btn-pagina-siguiente').addEventListener('click', () => {
+        if (filtrosMonitoreo.pagina < paginasMonitoreo) cambiarFiltrosMonitoreo({ pagina: filtrosMonitoreo.pagina + 1 });
+    });
 });
@@ -0,0 +1,55 @@
+// Consulta el estado de una entrega asíncrona hasta que el worker publique la nota
+document.addEventListener('DOMContentLoaded', function () {
+    const contenedor = document.getElementById('resultado-calificacion');
+    if (!contenedor || !contenedor.dataset.estadoUrl) return;
+
+    const puntaje = document.getElementById('resultado-puntaje');
+    const INTERVALO_MS = 2000;
+    // Tras unos 5 minutos (o si la entrega agotó sus reintentos) se deja de consultar
+    const MAX_CONSULTAS = 150;
+    let consultas = 0;
+
+    function mostrarDemora(mensaje) {
+        puntaje.textContent = '';
+        const aviso = document.createElement('p');
+        aviso.className = 'text-muted fs-6 mb-0';
+        aviso.textContent = mensaje;
+        puntaje.appendChild(aviso);
+    }
+
+    function claseSegunNota(puntos) {
+        if (puntos >= 8.0) return 'text-success';
+        if (puntos >= 6.0) return 'text-warning';
+        return 'text-danger';
+    }
+
+    function reintentar() {
+        consultas += 1;
+        if (consultas >= MAX_CONSULTAS) {
+            mostrarDemora('La calificación está tardando más de lo normal. Tu entrega quedó registrada; revisa tu nota más tarde en Mis resultados.');
+            return;
+        }
+        setTimeout(consultarEstado, INTERVALO_MS);
+    }
+
+    function consultarEstado() {
+        fetch(contenedor.dataset.estadoUrl, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(data => {
+                if (data.fallida) {
+                    mostrarDemora('Tu entrega quedó registrada, pero no se pudo calificar automáticamente. Un administrador la revisará.');
+                    return;
+                }
+                if (!data.success || data.pendiente) {
+                    reintentar();
+                    return;
+                }
+                puntaje.textContent = data.puntaje;
+                puntaje.classList.remove('text-muted');
+                puntaje.classList.add(claseSegunNota(data.puntos_obtenidos));
+            })
+            .catch(reintentar);
+    }
+
+    setTimeout(consultarEstado, INTERVALO_MS);
+});
@@ -6,6 +6,11 @@ let evaluacionEnviandose = false;
 let evaluacionFinalizadaAdmin = false;
 let verificacionInterval;
 let modalMostrandose = false;
+let etagEstado = null;
+
+// Guardado automático por deltas: solo se envían las respuestas modificadas
+let respuestasPendientes = {};
+let secuenciaGuardado = window.secuenciaGuardado || 0;
 
 // Variables para control de cambios de pestaña
 let cambiosPestana = window.cambiosPestana;
@@ -96,6 +101,7 @@ function iniciarEvaluacion() {
 
 // Función para limpiar todos los intervalos y timers
 function limpiarIntervalos() {
+    cerrarSocketEstudiante();
     if (verificacionInterval) {
         clearInterval(verificacionInterval);
     }
@@ -125,83 +131,178 @@ function inicializarEvaluacion() {
     }
 }
 
+// Con WebSocket abierto el latido HTTP solo reconcilia el estado cada pocos minutos
+const INTERVALO_LATIDO_MS = 15000;
+const INTERVALO_LATIDO_CON_SOCKET_MS = 180000;
+let estudianteSocket = null;
+let estudianteSocketAbierto = false;
+let estudianteSocketCerrado = false;
+let socketReintentos = 0;
+
 // Función para verificar periódicamente si la evaluación fue finalizada administrativamente
 function iniciarVerificacionEstado() {
     verificarEstadoEvaluacion();
-    
+    programarLatido();
+    conectarSocketEstudiante();
+}
+
+// Programa el latido HTTP según el estado del WebSocket
+function programarLatido() {
+    clearInterval(verificacionInterval);
     verificacionInterval = setInterval(function() {
         if (!evaluacionFinalizadaAdmin) {
             verificarEstadoEvaluacion();
         }
-    }, 15000);
+    }, estudianteSocketAbierto ? INTERVALO_LATIDO_CON_SOCKET_MS : INTERVALO_LATIDO_MS);
+}
+
+// Canal push: finalización administrativa, cambios de pestaña y avisos de la evaluación
+function conectarSocketEstudiante() {
+    if (!('WebSocket' in window) || !window.estudianteSocketUrl || estudianteSocketCerrado) return;
+
+    const protocolo = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    estudianteSocket = new WebSocket(`${protocolo}://${window.location.host}${window.estudianteSocketUrl}`);
+
+    estudianteSocket.addEventListener('open', () => {
+        estudianteSocketAbierto = true;
+        socketReintentos = 0;
+        programarLatido();
+        // Reconciliar lo ocurrido mientras el socket estuvo cerrado
+        verificarEstadoEvaluacion();
+    });
+    estudianteSocket.addEventListener('message', evento => {
+        try {
+            aplicarMensajeEstudiante(JSON.parse(evento.data));
+        } catch (error) {
+            console.error('Mensaje de estado inválido:', error);
+        }
+    });
+    estudianteSocket.addEventListener('close', () => {
+        const estabaAbierto = estudianteSocketAbierto;
+        estudianteSocketAbierto = false;
+        estudianteSocket = null;
+        if (estudianteSocketCerrado) return;
+        if (estabaAbierto) programarLatido();
+        // Reintento con espera creciente; mientras tanto el latido HTTP mantiene el estado al día
+        socketReintentos += 1;
+        setTimeout(conectarSocketEstudiante, Math.min(60000, 2000 * 2 ** Math.min(socketReintentos, 5)));
+    });
+}
+
+// Al entregar o finalizar el intento el canal se cierra sin reintentos
+function cerrarSocketEstudiante() {
+    estudianteSocketCerrado = true;
+    if (estudianteSocket) {
+        estudianteSocket.close();
+    }
+}
+
+function aplicarMensajeEstudiante(mensaje) {
+    if (mensaje.tipo === 'estado') {
+        // Mismo cuerpo que el latido: el siguiente latido con este ETag responde 304
+        etagEstado = `W/"${mensaje.version}"`;
+        aplicarEstadoEvaluacion(mensaje);
+    } else if (mensaje.tipo === 'evaluacion') {
+        if (mensaje.aviso) {
+            showAppWideAlert({ icon: 'info', title: 'Aviso de la evaluación', text: mensaje.aviso });
+        }
+        // Se reparte en el tiempo la consulta de todos los estudiantes conectados
+        setTimeout(verificarEstadoEvaluacion, Math.random() * 5000);
+    }
 }
 
-// Verificar estado de la evaluación
+// Verificar estado de la evaluación mediante el latido (304 si el estado no cambió)
 function verificarEstadoEvaluacion() {
-    fetch(window.verificarEstadoUrl)
-        .then(response => response.json())
-        .then(data => {
-            if (data.finalizada_admin && !evaluacionFinalizadaAdmin && !modalMostrandose) {
-                evaluacionFinalizadaAdmin = true;
-                modalMostrandose = true;
-                
-                limpiarIntervalos();
-                evaluacionEnviandose = true;
-                
-                showAppWideAlert({
-                    icon: 'error',
-                    title: 'Evaluación Finalizada',
-                    html: `
-                        <p>Tu evaluación ha sido finalizada administrativamente.</p>
-                        <p><strong>Motivo:</strong> ${data.motivo}</p>
-                        <p><strong>Administrador:</strong> ${data.admin}</p>
-                        <p>Tu puntaje será de 0/10.</p>
-                    `,
-                    confirmButtonText: 'Entendido',
-                    allowOutsideClick: false,
-                    allowEscapeKey: false
-                }).then(() => {
-                    salirPantallaCompleta().finally(() => {
-                        window.location.href = window.quizUrl;
-                    });
-                });
-            } else {
-                if (data.cambios_pestana_actuales !== undefined && data.cambios_pestana_actuales !== cambiosPestana) {
-                    console.log(`DEBUG - Cambios de pestañas actualizados por admin: ${cambiosPestana} → ${data.cambios_pestana_actuales}`);
-                    
-                    const cambiosAnteriores = cambiosPestana;
-                    cambiosPestana = data.cambios_pestana_actuales;
-                    
-                    actualizarContadorCambiosPestana();
-                    
-                    showAppWideAlert({
-                        icon: 'info',
-                        title: 'Cambios de Pestañas Actualizados',
-                        html: `
-                            <div class="text-center">
-                                <p>Un administrador ha reducido tus cambios de pestaña:</p>
-                                <div class="alert alert-info">
-                                    <strong>Anterior:</strong> ${cambiosAnteriores}/4<br>
-                                    <strong>Nuevo:</strong> ${cambiosPestana}/4
-                                </div>
-                                <p class="text-success">
-                                    <i class="bi bi-check-circle"></i>
-                                    Puedes continuar con tu evaluación normalmente.
-                                </p>
-                            </div>
-                        `,
-                        timer: 5000,
-                        showConfirmButton: true,
-                        confirmButtonText: 'Continuar'
-                    });
-                }
+    const headers = {};
+    if (etagEstado) {
+        headers['If-None-Match'] = etagEstado;
+    }
+    fetch(window.heartbeatUrl, { headers: headers, cache: 'no-store' })
+        .then(response => {
+            if (response.status === 304) {
+                return null;
             }
+            etagEstado = response.headers.get('ETag');
+            return response.json();
+        })
+        .then(data => {
+            if (data) aplicarEstadoEvaluacion(data);
         })
         .catch(error => {
             console.error('Error verificando estado de evaluación:', error);
         });
 }
 
+// Aplica el estado del intento recibido por el latido o por el WebSocket
+function aplicarEstadoEvaluacion(data) {
+    sincronizarTiempoRestante(data.tiempo_restante);
+
+    if (data.finalizada_admin && !evaluacionFinalizadaAdmin && !modalMostrandose) {
+        evaluacionFinalizadaAdmin = true;
+        modalMostrandose = true;
+        
+        limpiarIntervalos();
+        evaluacionEnviandose = true;
+        
+        showAppWideAlert({
+            icon: 'error',
+            title: 'Evaluación Finalizada',
+            html: `
+                <p>Tu evaluación ha sido finalizada administrativamente.</p>
+                <p><strong>Motivo:</strong> ${data.motivo}</p>
+                <p><strong>Administrador:</strong> ${data.admin}</p>
+                <p>Tu puntaje será de 0/10.</p>
+            `,
+            confirmButtonText: 'Entendido',
+            allowOutsideClick: false,
+            allowEscapeKey: false
+        }).then(() => {
+            salirPantallaCompleta().finally(() => {
+                window.location.href = window.quizUrl;
+            });
+        });
+    } else {
+        if (data.cambios_pestana_actuales !== undefined && data.cambios_pestana_actuales !== cambiosPestana) {
+            console.log(`DEBUG - Cambios de pestañas actualizados por admin: ${cambiosPestana} → ${data.cambios_pestana_actuales}`);
+            
+            const cambiosAnteriores = cambiosPestana;
+            cambiosPestana = data.cambios_pestana_actuales;
+            
+            actualizarContadorCambiosPestana();
+            
+            showAppWideAlert({
+                icon: 'info',
+                title: 'Cambios de Pestañas Actualizados',
+                html: `
+                    <div class="text-center">
+                        <p>Un administrador ha reducido tus cambios de pestaña:</p>
+                        <div class="alert alert-info">
+                            <strong>Anterior:</strong> ${cambiosAnteriores}/4<br>
+                            <strong>Nuevo:</strong> ${cambiosPestana}/4
+                        </div>
+                        <p class="text-success">
+                            <i class="bi bi-check-circle"></i>
+                            Puedes continuar con tu evaluación normalmente.
+                        </p>
+                    </div>
+                `,
+                timer: 5000,
+                showConfirmButton: true,
+                confirmButtonText: 'Continuar'
+            });
+        }
+    }
+}
+
+// El servidor es la fuente de verdad del tiempo: corregir el reloj local si se desvió
+function sincronizarTiempoRestante(tiempoServidor) {
+    if (typeof tiempoServidor !== 'number' || evaluacionEnviandose) return;
+    if (Math.abs(tiempoServidor - tiempoRestante) > 2) {
+        tiempoRestante = tiempoServidor;
+        actualizarTimer();
+    }
+}
+
 // Activar modo evaluación (ocultar sidebar)
 function activarModoEvaluacion() {
     document.body.classList.add('evaluacion-activa');
@@ -401,6 +502,7 @@ function enviarEvaluacionPorCambiosPestana() {
 function configurarEventos() {
     document.querySelectorAll('input[type="radio"]').forEach(radio => {
         radio.addEventListener('change', function() {
+            respuestasPendientes[this.name] = this.value;
             actualizarProgreso();
             guardarRespuestaAutomatica();
         });
@@ -496,12 +598,10 @@ function iniciarGuardadoAutomatico() {
     }, 30000);
 }
 
-// Guardar respuestas automáticamente
+// Guardar respuestas automáticamente (solo cambios pendientes + número de secuencia)
 function guardarRespuestaAutomatica() {
-    const respuestas = {};
-    document.querySelectorAll('input[type="radio"]:checked').forEach(radio => {
-        respuestas[radio.name] = radio.value;
-    });
+    const cambios = { ...respuestasPendientes };
+    secuenciaGuardado++;
     
     fetch(window.guardarRespuestaAutomaticaUrl, {
         method: 'POST',
@@ -511,14 +611,22 @@ function guardarRespuestaAutomatica() {
             'X-CSRFToken': getCookie('csrftoken')
         },
         body: JSON.stringify({
-            respuestas: respuestas,
-            tiempo_restante: tiempoRestante
+            cambios: cambios,
+            secuencia: secuenciaGuardado
         })
     })
     .then(response => response.json())
     .then(data => {
         if (data.success) {
-            console.log('Progreso guardado automáticamente exitosamente');
+            // Descartar solo los cambios confirmados que no se modificaron durante el envío
+            Object.keys(cambios).forEach(nombre => {
+                if (respuestasPendientes[nombre] === cambios[nombre]) {
+                    delete respuestasPendientes[nombre];
+                }
+            });
+        } else if (data.stale) {
+            // Secuencia antigua: se alinea con el servidor y los cambios se reenvían en el próximo guardado
+            secuenciaGuardado = Math.max(secuenciaGuardado, data.secuencia || 0);
         } else {
             console.error('Error al guardar automáticamente:', data.error);
             if (data.redirect && !evaluacionFinalizadaAdmin && !modalMostrandose) {
@@ -531,7 +639,7 @@ function guardarRespuestaAutomatica() {
                 showAppWideAlert({
                     icon: 'error',
                     title: 'Evaluación Finalizada',
-                    text: 'Tu evaluación ha sido finalizada administrativamente. Tu puntaje será de 0/10.',
+                    text: data.mensaje || 'Tu evaluación ha sido finalizada administrativamente. Tu puntaje será de 0/10.',
                     confirmButtonText: 'Entendido',
                     allowOutsideClick: false,
                     allowEscapeKey: false